@@ -0,0 +1,159 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+
+class Overloaded(Exception):
+    """
+    Raised when a request is shed; ``retry_after`` is in seconds.
+    """
+
+    def __init__(self, reason, retry_after):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = max(1, int(math.ceil(retry_after)))
+
+
+# ─────────────────────────
+# TOKEN BUCKET
+# ─────────────────────────
+class TokenBucket:
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def take(self, now, cost=1):
+        """
+        Returns 0 when ``cost`` tokens were taken, else seconds until they
+        are available. A cost above ``burst`` needs a full bucket and
+        leaves it in debt.
+        """
+        # ``now`` may predate a bucket created after it was read.
+        self.tokens = min(self.burst, self.tokens + max(0.0, now - self.updated) * self.rate)
+        self.updated = max(now, self.updated)
+        needed = min(cost, self.burst)
+        if self.tokens >= needed:
+            self.tokens -= cost
+            return 0.0
+        return (needed - self.tokens) / self.rate
+
+
+# ─────────────────────────
+# ADMISSION CONTROLLER
+# ─────────────────────────
+class AdmissionController:
+    """
+    Decides, before any inference, whether a request can be served in time.
+
+    A request is shed when its client's token bucket is empty, when the
+    in-flight + queued budget is used up, or when the predicted latency
+    (EWMA of recent service times x waves of work ahead of it) exceeds the
+    SLO. Admitted requests must be released; use ``admit()``.
+
+    The SLO check never sheds a request with nothing in flight ahead of
+    it, and lets one probe through every ``probe_interval`` seconds, so
+    the EWMA keeps getting fresh samples and recovers after an outlier.
+    """
+
+    SHED_REASONS = ("rate_limited", "queue_full", "slo")
+
+    def __init__(self, concurrency, max_queue, slo_ms=0, client_rate=0, client_burst=10,
+                 max_clients=10_000, alpha=0.2, probe_interval=1.0):
+        self.concurrency = max(1, int(concurrency))
+        self.capacity = self.concurrency + max(0, int(max_queue))
+        self.slo = slo_ms / 1000.0 if slo_ms else None
+        self.client_rate = client_rate
+        self.client_burst = client_burst
+        self.max_clients = max_clients
+        self.alpha = alpha
+        self.probe_interval = probe_interval
+
+        self._lock = threading.Lock()
+        self._buckets = OrderedDict()
+        self.inflight = 0
+        self.service_ewma = None
+        self._last_probe = float("-inf")
+        self.admitted = 0
+        self.shed = dict.fromkeys(self.SHED_REASONS, 0)
+
+    def _bucket(self, client_id):
+        bucket = self._buckets.get(client_id)
+        if bucket is None:
+            bucket = self._buckets[client_id] = TokenBucket(self.client_rate, self.client_burst)
+            if len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(client_id)
+        return bucket
+
+    def predicted_latency(self, inflight=None):
+        """
+        Seconds a new request would take: one service time per wave of
+        ``concurrency`` requests ahead of it (plus its own).
+        """
+        if self.service_ewma is None:
+            return 0.0
+        inflight = self.inflight if inflight is None else inflight
+        return self.service_ewma * (inflight // self.concurrency + 1)
+
+    def try_admit(self, client_id=None, cost=1):
+        """
+        Admits (counting ``cost`` messages in flight) or raises Overloaded.
+        A batch costs one token and one slot per message it encodes; one
+        larger than the whole capacity is admitted only when idle.
+        """
+        now = time.monotonic()
+        cost = max(1, int(cost))
+        with self._lock:
+            if self.client_rate and client_id is not None:
+                wait = self._bucket(client_id).take(now, cost)
+                if wait:
+                    self.shed["rate_limited"] += 1
+                    raise Overloaded("rate_limited", wait)
+
+            if self.inflight and self.inflight + cost > self.capacity:
+                self.shed["queue_full"] += 1
+                raise Overloaded("queue_full", self.predicted_latency())
+
+            if self.slo is not None and self.inflight and self.predicted_latency() > self.slo:
+                if now - self._last_probe < self.probe_interval:
+                    self.shed["slo"] += 1
+                    raise Overloaded("slo", self.predicted_latency() - self.slo)
+                self._last_probe = now
+
+            self.inflight += cost
+            self.admitted += cost
+
+    def release(self, service_seconds, cost=1):
+        with self._lock:
+            self.inflight -= max(1, int(cost))
+            if self.service_ewma is None:
+                self.service_ewma = service_seconds
+            else:
+                self.service_ewma += self.alpha * (service_seconds - self.service_ewma)
+
+    @contextmanager
+    def admit(self, client_id=None, cost=1):
+        self.try_admit(client_id, cost)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.release(time.perf_counter() - start, cost)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "inflight": self.inflight,
+                "capacity": self.capacity,
+                "admitted": self.admitted,
+                "shed": dict(self.shed),
+                "service_ms_ewma": round(self.service_ewma * 1000, 3) if self.service_ewma else None,
+                "predicted_latency_ms": round(self.predicted_latency() * 1000, 3),
+                "slo_ms": self.slo * 1000 if self.slo else None,
+                "tracked_clients": len(self._buckets),
+            }
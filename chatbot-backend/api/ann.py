@@ -0,0 +1,150 @@
+import numpy as np
+
+from .index import normalize_rows
+
+
+# ─────────────────────────
+# SPHERICAL K-MEANS
+# ─────────────────────────
+def assign_clusters(vectors, centroids, chunk=8192):
+    """
+    Nearest centroid (by cosine) for every row, in bounded-memory chunks.
+    """
+    assign = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), chunk):
+        block = np.asarray(vectors[start:start + chunk], dtype=np.float32)
+        assign[start:start + chunk] = np.argmax(block @ centroids.T, axis=1)
+    return assign
+
+
+def cluster_sums(vectors, assign, k):
+    """
+    Per-cluster vector sums and counts for an assignment.
+    """
+    counts = np.bincount(assign, minlength=k)
+    order = np.argsort(assign, kind="stable")
+    starts = np.searchsorted(assign[order], np.arange(k))
+
+    sums = np.zeros((k, vectors.shape[1]), dtype=np.float32)
+    present = counts > 0
+    sums[present] = np.add.reduceat(vectors[order], starts[present], axis=0)
+    return sums, counts
+
+
+def spherical_kmeans(vectors, k, iters=20, seed=0, sample_size=50_000):
+    """
+    k-means on the unit sphere (cosine), trained on a random sample.
+    Empty clusters are re-seeded from random sample points.
+    """
+    rng = np.random.default_rng(seed)
+    vectors = np.asarray(vectors, dtype=np.float32)
+
+    if len(vectors) > sample_size:
+        vectors = vectors[np.sort(rng.choice(len(vectors), sample_size, replace=False))]
+
+    k = min(k, len(vectors))
+    centroids = vectors[rng.choice(len(vectors), k, replace=False)].copy()
+
+    for _ in range(iters):
+        assign = assign_clusters(vectors, centroids)
+        sums, counts = cluster_sums(vectors, assign, k)
+
+        empty = np.flatnonzero(counts == 0)
+        if len(empty):
+            sums[empty] = vectors[rng.choice(len(vectors), len(empty), replace=False)]
+
+        centroids = normalize_rows(sums)
+
+    return centroids
+
+
+class MiniBatchSphericalKMeans:
+    """
+    Streaming spherical k-means (Sculley's mini-batch update): each
+    ``partial_fit`` batch moves a centroid towards the mean of its rows
+    with a per-centroid rate of 1 / rows seen, then re-normalizes. Memory
+    is O(k * dim) regardless of how many rows are streamed.
+    """
+
+    def __init__(self, centroids):
+        self.centroids = normalize_rows(np.asarray(centroids, dtype=np.float32))
+        self.counts = np.zeros(len(self.centroids), dtype=np.int64)
+
+    @property
+    def k(self):
+        return len(self.centroids)
+
+    def partial_fit(self, batch):
+        batch = np.asarray(batch, dtype=np.float32)
+        assign = assign_clusters(batch, self.centroids)
+        sums, counts = cluster_sums(batch, assign, self.k)
+
+        hit = counts > 0
+        self.counts[hit] += counts[hit]
+        rate = (counts[hit] / self.counts[hit]).astype(np.float32)[:, None]
+        means = sums[hit] / counts[hit][:, None]
+        self.centroids[hit] = normalize_rows((1.0 - rate) * self.centroids[hit] + rate * means)
+        return assign
+
+
+# ─────────────────────────
+# IVF INDEX
+# ─────────────────────────
+class IVFIndex:
+    """
+    Inverted-file ANN index over an IntentIndex matrix.
+
+    Rows are bucketed by their nearest k-means centroid and stored CSR-style:
+    ``list_rows[list_offsets[c]:list_offsets[c + 1]]`` are the rows of
+    cluster ``c``. A query scans only the ``nprobe`` closest clusters.
+    """
+
+    def __init__(self, centroids, list_offsets, list_rows):
+        self.centroids = np.asarray(centroids, dtype=np.float32)
+        self.list_offsets = np.asarray(list_offsets, dtype=np.int64)
+        self.list_rows = np.asarray(list_rows, dtype=np.int64)
+
+    @property
+    def nlist(self):
+        return len(self.centroids)
+
+    @classmethod
+    def build(cls, matrix, nlist=None, iters=20, seed=0):
+        """
+        ``nlist`` defaults to ~4 * sqrt(rows).
+        """
+        nlist = nlist or max(1, int(4 * np.sqrt(len(matrix))))
+        centroids = spherical_kmeans(matrix, nlist, iters=iters, seed=seed)
+
+        assign = assign_clusters(matrix, centroids)
+        list_rows = np.argsort(assign, kind="stable")
+        list_offsets = np.concatenate(
+            [[0], np.cumsum(np.bincount(assign, minlength=len(centroids)))]
+        )
+        return cls(centroids, list_offsets, list_rows)
+
+    def candidates(self, query, nprobe):
+        """
+        Row ids in the ``nprobe`` clusters closest to ``query``.
+        """
+        nprobe = min(max(1, int(nprobe)), self.nlist)
+        centroid_sims = self.centroids @ query
+        probe = np.argpartition(-centroid_sims, nprobe - 1)[:nprobe]
+
+        return np.concatenate([
+            self.list_rows[self.list_offsets[c]:self.list_offsets[c + 1]]
+            for c in probe
+        ])
+
+    def search(self, matrix, query, nprobe):
+        """
+        Returns ``(row, similarity)`` of the best candidate, or (-1, -inf)
+        when every probed list is empty.
+        """
+        rows = self.candidates(query, nprobe)
+        if len(rows) == 0:
+            return -1, float("-inf")
+
+        sims = np.asarray(matrix[rows]) @ query
+        best = int(np.argmax(sims))
+        return int(rows[best]), float(sims[best])
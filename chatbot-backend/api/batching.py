@@ -0,0 +1,143 @@
+import os
+import queue
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import Future
+
+import numpy as np
+
+
+# ─────────────────────────
+# BATCH STATS
+# ─────────────────────────
+class BatchStats:
+    """
+    Batch-size distribution and queueing delay of an EncodeBatcher.
+    Keeps a bounded window of recent delays for percentiles.
+    """
+
+    def __init__(self, window=2048):
+        self._lock = threading.Lock()
+        self.batch_sizes = Counter()
+        self.batches = 0
+        self.items = 0
+        self.errors = 0
+        self.max_delay_ms = 0.0
+        self._delays = deque(maxlen=window)
+
+    def record(self, size, delays_ms):
+        with self._lock:
+            self.batch_sizes[size] += 1
+            self.batches += 1
+            self.items += size
+            self._delays.extend(delays_ms)
+            self.max_delay_ms = max(self.max_delay_ms, max(delays_ms))
+
+    def record_error(self):
+        with self._lock:
+            self.errors += 1
+
+    def snapshot(self):
+        with self._lock:
+            delays = np.fromiter(self._delays, dtype=np.float64)
+            return {
+                "batches": self.batches,
+                "items": self.items,
+                "errors": self.errors,
+                "mean_batch_size": round(self.items / self.batches, 3) if self.batches else 0.0,
+                "batch_size_histogram": dict(sorted(self.batch_sizes.items())),
+                "queue_delay_ms": {
+                    "p50": round(float(np.percentile(delays, 50)), 3) if len(delays) else 0.0,
+                    "p99": round(float(np.percentile(delays, 99)), 3) if len(delays) else 0.0,
+                    "max": round(self.max_delay_ms, 3),
+                },
+            }
+
+
+# ─────────────────────────
+# ENCODE BATCHER
+# ─────────────────────────
+class EncodeBatcher:
+    """
+    Coalesces concurrent single-text encode calls into batched forward passes.
+
+    Callers block on ``encode(text)``. A worker thread takes the first queued
+    text, keeps collecting until ``max_batch`` items or ``max_wait_ms`` after
+    that first item was queued, runs one ``encode_fn(texts)`` and hands each
+    row back to its waiting caller.
+    """
+
+    def __init__(self, encode_fn, max_batch=16, max_wait_ms=2.0):
+        self.encode_fn = encode_fn
+        self.max_batch = max(1, int(max_batch))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self.stats = BatchStats()
+
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+
+    def submit(self, text):
+        """
+        Queues one text and returns a Future resolving to its vector.
+        """
+        self._ensure_worker()
+        future = Future()
+        self._queue.put((text, future, time.perf_counter()))
+        return future
+
+    def encode(self, text):
+        return self.submit(text).result()
+
+    def _ensure_worker(self):
+        # Threads do not survive fork, so gunicorn workers restart their own.
+        if self._thread is not None and self._pid == os.getpid():
+            return
+
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid():
+                self._queue = queue.Queue()
+                self._pid = os.getpid()
+                self._thread = threading.Thread(
+                    target=self._run, name="encode-batcher", daemon=True
+                )
+                self._thread.start()
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = batch[0][2] + self.max_wait
+
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            try:
+                if remaining > 0:
+                    batch.append(self._queue.get(timeout=remaining))
+                else:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            started = time.perf_counter()
+            texts = [text for text, _, _ in batch]
+
+            try:
+                vectors = self.encode_fn(texts)
+            except Exception as e:
+                self.stats.record_error()
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+
+            self.stats.record(
+                len(batch),
+                [(started - queued) * 1000 for _, _, queued in batch],
+            )
+            for row, (_, future, _) in enumerate(batch):
+                future.set_result(vectors[row])
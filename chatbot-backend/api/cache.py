@@ -0,0 +1,130 @@
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+
+def normalize_query(text):
+    """
+    Cache key for a message: lower-cased with whitespace collapsed.
+    """
+    return " ".join(text.lower().split())
+
+
+# ─────────────────────────
+# QUERY CACHE (LRU + single-flight)
+# ─────────────────────────
+class QueryCache:
+    """
+    Bounded, thread-safe LRU of resolved queries keyed by normalized text.
+
+    Concurrent misses for the same key are deduplicated: the first caller
+    computes, the others wait on its future instead of encoding again.
+    """
+
+    def __init__(self, max_size=4096):
+        self.max_size = max(1, int(max_size))
+        self._data = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    def get_or_compute(self, text, compute):
+        """
+        Returns the cached value for ``text`` or ``compute(key)``.
+        """
+        key = normalize_query(text)
+
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            return future.result()
+
+        try:
+            value = compute(key)
+        except BaseException as e:
+            with self._lock:
+                self._inflight.pop(key, None)
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            self._inflight.pop(key, None)
+            self._data[key] = value
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+        future.set_result(value)
+        return value
+
+    def lookup(self, text):
+        """
+        Non-blocking read used by batch paths; None on miss.
+        """
+        key = normalize_query(text)
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return None
+
+    def peek(self, text):
+        """
+        Like ``lookup`` but a miss is not counted, for callers that go on to
+        ``get_or_compute`` the same text (which counts it).
+        """
+        key = normalize_query(text)
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            return None
+
+    def store(self, text, value):
+        key = normalize_query(text)
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def snapshot(self):
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                "size": len(self._data),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+                "hit_rate": round((self.hits + self.coalesced) / lookups, 4) if lookups else 0.0,
+            }
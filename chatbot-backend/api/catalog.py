@@ -0,0 +1,97 @@
+import json
+from pathlib import Path
+
+
+class CatalogError(ValueError):
+    pass
+
+
+# The lexical tier answers crisis phrases with this intent whatever the
+# catalog says, so a catalog must keep it (with a real reply).
+CRISIS_INTENT = "crisis"
+
+
+# ─────────────────────────
+# LOAD / VALIDATE
+# ─────────────────────────
+def load_catalog(path):
+    """
+    Reads an intent catalog from JSON, or YAML (.yaml/.yml, needs PyYAML),
+    with the same shape as engine.INTENTS:
+    ``{intent: {"examples": [...], "responses": [...], "link": str|null}}``.
+    """
+    path = Path(path)
+    with open(path, encoding="utf-8") as fh:
+        if path.suffix in (".yaml", ".yml"):
+            import yaml
+
+            intents = yaml.safe_load(fh)
+        else:
+            intents = json.load(fh)
+
+    validate_catalog(intents)
+    return intents
+
+
+def validate_catalog(intents):
+    """
+    Rejects a catalog the engine cannot serve, before anything is swapped.
+    """
+    if not isinstance(intents, dict) or not intents:
+        raise CatalogError("catalog must be a non-empty mapping of intent -> definition")
+
+    for name, data in intents.items():
+        if name in ("unknown", "warming"):
+            raise CatalogError(f"{name!r} is reserved")
+        if not isinstance(data, dict):
+            raise CatalogError(f"{name}: definition must be a mapping")
+
+        examples = data.get("examples")
+        if not isinstance(examples, list) or not examples or not all(
+            isinstance(e, str) and e.strip() for e in examples
+        ):
+            raise CatalogError(f"{name}: 'examples' must be a non-empty list of strings")
+
+        responses = data.get("responses")
+        if not isinstance(responses, list) or not responses or not all(
+            isinstance(r, str) for r in responses
+        ):
+            raise CatalogError(f"{name}: 'responses' must be a non-empty list of strings")
+
+        if data.get("link") is not None and not isinstance(data["link"], str):
+            raise CatalogError(f"{name}: 'link' must be a string or null")
+
+    crisis = intents.get(CRISIS_INTENT)
+    if crisis is None:
+        raise CatalogError(f"{CRISIS_INTENT!r} intent is required")
+    if not all(r.strip() for r in crisis["responses"]):
+        raise CatalogError(f"{CRISIS_INTENT}: every response must be non-empty")
+
+
+# ─────────────────────────
+# DIFF
+# ─────────────────────────
+def catalog_examples(intents):
+    """
+    Every example in matrix row order.
+    """
+    return [ex for data in intents.values() for ex in data["examples"]]
+
+
+def diff_catalogs(old, new):
+    """
+    What a reload changes: intents added/removed/edited and examples
+    added/removed (texts, since vectors are keyed by text).
+    """
+    old_examples = set(catalog_examples(old)) if old else set()
+    new_examples = set(catalog_examples(new))
+
+    return {
+        "intents_added": sorted(set(new) - set(old or {})),
+        "intents_removed": sorted(set(old or {}) - set(new)),
+        "intents_changed": sorted(
+            name for name in set(new) & set(old or {}) if new[name] != old[name]
+        ),
+        "examples_added": len(new_examples - old_examples),
+        "examples_removed": len(old_examples - new_examples),
+    }
@@ -0,0 +1,196 @@
+import threading
+import time
+from collections import OrderedDict, deque, namedtuple
+
+import numpy as np
+
+# One past message: its float16 embedding (None for lexical answers, which
+# never encode), the resolved intent and when it was seen.
+Turn = namedtuple("Turn", ["embedding", "intent", "at"])
+
+CONVERSATION_BACKENDS = ("memory", "django-cache")
+
+
+def _as_turn_vector(embedding):
+    if embedding is None:
+        return None
+    vector = np.asarray(embedding, dtype=np.float16)
+    vector.setflags(write=False)
+    return vector
+
+
+# ─────────────────────────
+# CONTEXT BLENDING
+# ─────────────────────────
+def context_query(embedding, history, weight=0.35, decay=0.5):
+    """
+    Query vector biased towards recent turns: ``embedding`` plus ``weight``
+    times the decayed sum of the history embeddings (most recent first),
+    L2-normalized. None when no turn has an embedding. History vectors are
+    the stored ones; nothing is re-encoded.
+    """
+    vectors = [t.embedding for t in reversed(history) if t.embedding is not None]
+    if not vectors:
+        return None
+
+    weights = decay ** np.arange(len(vectors), dtype=np.float32)
+    context = (weights[:, None] * np.asarray(vectors, dtype=np.float32)).sum(axis=0)
+    context /= max(float(np.linalg.norm(context)), 1e-9)
+
+    query = np.asarray(embedding, dtype=np.float32) + weight * context
+    return query / max(float(np.linalg.norm(query)), 1e-9)
+
+
+# ─────────────────────────
+# IN-MEMORY STORE (per process)
+# ─────────────────────────
+class InMemoryConversationStore:
+    """
+    Last ``max_turns`` turns per session id, LRU-evicted beyond
+    ``max_sessions`` sessions or ``max_bytes`` of embeddings, and expired
+    after ``ttl`` seconds without a message.
+    """
+
+    backend = "memory"
+
+    def __init__(self, max_sessions=10_000, max_turns=4, ttl=1800, max_bytes=32 * 1024 * 1024):
+        self.max_sessions = max(1, int(max_sessions))
+        self.max_turns = max(1, int(max_turns))
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+
+        self._sessions = OrderedDict()  # id -> deque of Turn, LRU first
+        self._lock = threading.Lock()
+        self.nbytes = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def _turns_bytes(turns):
+        return sum(t.embedding.nbytes for t in turns if t.embedding is not None)
+
+    def _drop(self, session_id):
+        turns = self._sessions.pop(session_id)
+        self.nbytes -= self._turns_bytes(turns)
+
+    def _expire(self, now):
+        # Least recently used first, so expired sessions sit at the front.
+        while self._sessions:
+            session_id, turns = next(iter(self._sessions.items()))
+            if now - turns[-1].at < self.ttl:
+                break
+            self._drop(session_id)
+            self.expirations += 1
+
+    def get(self, session_id):
+        now = time.time()
+        with self._lock:
+            self._expire(now)
+            turns = self._sessions.get(session_id)
+            if turns is None:
+                return []
+            self._sessions.move_to_end(session_id)
+            return list(turns)
+
+    def append(self, session_id, embedding, intent):
+        turn = Turn(_as_turn_vector(embedding), intent, time.time())
+        with self._lock:
+            turns = self._sessions.get(session_id)
+            if turns is None:
+                turns = self._sessions[session_id] = deque(maxlen=self.max_turns)
+            else:
+                self._sessions.move_to_end(session_id)
+
+            if len(turns) == turns.maxlen:
+                self.nbytes -= self._turns_bytes([turns[0]])
+            turns.append(turn)
+            self.nbytes += self._turns_bytes([turn])
+
+            while len(self._sessions) > self.max_sessions or (
+                self.max_bytes and self.nbytes > self.max_bytes and len(self._sessions) > 1
+            ):
+                self._drop(next(iter(self._sessions)))
+                self.evictions += 1
+
+    def clear(self, session_id):
+        with self._lock:
+            if session_id in self._sessions:
+                self._drop(session_id)
+
+    def snapshot(self):
+        with self._lock:
+            self._expire(time.time())
+            return {
+                "backend": self.backend,
+                "sessions": len(self._sessions),
+                "turns": sum(len(t) for t in self._sessions.values()),
+                "bytes": self.nbytes,
+                "max_bytes": self.max_bytes,
+                "max_sessions": self.max_sessions,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+# ─────────────────────────
+# SHARED STORE (Django cache backend)
+# ─────────────────────────
+class DjangoCacheConversationStore:
+    """
+    Keeps turns in a Django cache (e.g. Redis or Memcached) so every worker
+    sees the same conversation. TTL is the cache timeout; size and memory
+    limits are the cache server's.
+    """
+
+    backend = "django-cache"
+
+    def __init__(self, alias="default", max_turns=4, ttl=1800, prefix="chatbot:conv:"):
+        from django.core.cache import caches
+
+        self.cache = caches[alias]
+        self.alias = alias
+        self.max_turns = max(1, int(max_turns))
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def _key(self, session_id):
+        return f"{self.prefix}{session_id}"
+
+    def get(self, session_id):
+        rows = self.cache.get(self._key(session_id)) or []
+        return [
+            Turn(
+                None if raw is None else np.frombuffer(raw, dtype=np.float16),
+                intent,
+                at,
+            )
+            for raw, intent, at in rows
+        ]
+
+    def append(self, session_id, embedding, intent):
+        # Read-modify-write: concurrent messages in one session may drop a
+        # turn, which only weakens the context bias.
+        vector = _as_turn_vector(embedding)
+        rows = self.cache.get(self._key(session_id)) or []
+        rows.append((None if vector is None else vector.tobytes(), intent, time.time()))
+        self.cache.set(self._key(session_id), rows[-self.max_turns:], timeout=self.ttl)
+
+    def clear(self, session_id):
+        self.cache.delete(self._key(session_id))
+
+    def snapshot(self):
+        return {"backend": self.backend, "alias": self.alias, "ttl": self.ttl, "max_turns": self.max_turns}
+
+
+def create_conversation_store(backend, max_sessions, max_turns, ttl, max_bytes, cache_alias="default"):
+    """
+    Builds the store selected by CHATBOT_CONVERSATION_STORE.
+    """
+    if backend == "memory":
+        return InMemoryConversationStore(max_sessions, max_turns, ttl, max_bytes)
+    if backend == "django-cache":
+        return DjangoCacheConversationStore(cache_alias, max_turns, ttl)
+
+    raise ValueError(
+        f"Unknown CHATBOT_CONVERSATION_STORE {backend!r}; expected one of {CONVERSATION_BACKENDS}"
+    )
@@ -0,0 +1,20 @@
+import json
+from pathlib import Path
+
+# Labeled utterances covering every intent, crisis and out-of-scope ("unknown").
+DEFAULT_CORPUS = Path(__file__).resolve().parent / "data" / "labeled_utterances.jsonl"
+
+
+def load_labeled(path=None):
+    """
+    Reads ``{"text": ..., "intent": ...}`` JSON lines into a list of
+    ``(text, intent)`` pairs. Lines without "intent" get None.
+    """
+    rows = []
+    with open(path or DEFAULT_CORPUS, encoding="utf-8") as fh:
+        for line in fh:
+            line = line.strip()
+            if line:
+                row = json.loads(line)
+                rows.append((row["text"], row.get("intent")))
+    return rows
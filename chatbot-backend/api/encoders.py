@@ -0,0 +1,220 @@
+import json
+import os
+import re
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from .index import normalize_rows
+
+ONNX_MODEL_FILE = "model.int8.onnx"
+ONNX_TOKENIZER_FILE = "tokenizer.json"
+STATIC_TABLE_FILE = "embeddings.npy"
+STATIC_TOKENIZER_FILE = "tokenizer.json"
+STATIC_META_FILE = "meta.json"
+
+
+# ─────────────────────────
+# ENCODER INTERFACE
+# ─────────────────────────
+class Encoder:
+    """
+    Turns text into L2-normalized float32 vectors.
+
+    ``encode(str)`` returns a (dim,) vector and ``encode(list)`` a
+    (n, dim) matrix, matching SentenceTransformer.encode.
+    """
+
+    name = "encoder"
+
+    def encode(self, texts):
+        raise NotImplementedError
+
+    def share_weights(self, cache_dir):
+        """
+        Makes weights file-backed and read-only so forked workers share
+        them. Backends that cannot do this leave it as a no-op.
+        """
+        return False
+
+
+class SentenceTransformerEncoder(Encoder):
+    """
+    Default backend: the PyTorch SentenceTransformer model.
+    """
+
+    def __init__(self, model_name, cache_folder=None):
+        from sentence_transformers import SentenceTransformer
+
+        self.name = model_name
+        self.model = SentenceTransformer(model_name, cache_folder=cache_folder)
+
+    def encode(self, texts):
+        return self.model.encode(
+            texts,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+        )
+
+    def share_weights(self, cache_dir):
+        """
+        Re-points every parameter at a memory-mapped copy of the weights
+        (torch.load(mmap=True) + load_state_dict(assign=True)). The pages are
+        file-backed and never written, so every worker process maps the same
+        physical memory, with or without gunicorn --preload.
+        """
+        import torch
+
+        self.model.eval()
+        for param in self.model.parameters():
+            param.requires_grad_(False)
+
+        cache_dir = Path(cache_dir)
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        path = cache_dir / f"weights-{re.sub(r'[^A-Za-z0-9_.-]', '_', self.name)}.pt"
+
+        if not path.exists():
+            fd, tmp = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+            os.close(fd)
+            try:
+                torch.save(self.model.state_dict(), tmp)
+                os.replace(tmp, path)
+            finally:
+                if os.path.exists(tmp):
+                    os.unlink(tmp)
+
+        state = torch.load(path, mmap=True, weights_only=True)
+        self.model.load_state_dict(state, assign=True)
+        return True
+
+
+class OnnxEncoder(Encoder):
+    """
+    int8-quantized ONNX Runtime export of the same transformer.
+    Uses the exported tokenizer.json and the same mean pooling, so vectors
+    stay comparable with SentenceTransformerEncoder.
+    Build the model directory with ``manage.py build_onnx_encoder``.
+    """
+
+    def __init__(self, model_dir, model_name, max_length=256, threads=None):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        model_dir = Path(model_dir)
+        self.name = f"{model_name}-onnx-int8"
+
+        self.tokenizer = Tokenizer.from_file(str(model_dir / ONNX_TOKENIZER_FILE))
+        self.tokenizer.enable_truncation(max_length)
+        self.tokenizer.enable_padding(pad_id=0, pad_token="[PAD]")
+
+        options = ort.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = int(threads)
+        self.session = ort.InferenceSession(
+            str(model_dir / ONNX_MODEL_FILE),
+            sess_options=options,
+            providers=["CPUExecutionProvider"],
+        )
+        self._inputs = {i.name for i in self.session.get_inputs()}
+
+    def encode(self, texts):
+        single = isinstance(texts, str)
+        batch = self.tokenizer.encode_batch([texts] if single else list(texts))
+
+        ids = np.array([e.ids for e in batch], dtype=np.int64)
+        mask = np.array([e.attention_mask for e in batch], dtype=np.int64)
+
+        feeds = {"input_ids": ids, "attention_mask": mask}
+        if "token_type_ids" in self._inputs:
+            feeds["token_type_ids"] = np.zeros_like(ids)
+
+        tokens = self.session.run(None, feeds)[0]
+
+        # Mean pooling over real (non-padding) tokens.
+        weights = mask[..., None].astype(np.float32)
+        pooled = (tokens * weights).sum(axis=1) / np.maximum(weights.sum(axis=1), 1e-9)
+        vectors = normalize_rows(pooled)
+
+        return vectors[0] if single else vectors
+
+
+def static_encoder_digest(model_dir):
+    """
+    Identifies a built static table (changes on every rebuild), or None.
+    """
+    try:
+        with open(Path(model_dir) / STATIC_META_FILE, encoding="utf-8") as fh:
+            return json.load(fh).get("digest")
+    except (OSError, ValueError):
+        return None
+
+
+class StaticEncoder(Encoder):
+    """
+    No transformer at all: a per-token embedding table distilled from the
+    model (``manage.py build_static_encoder``). A message is the sum of its
+    tokens' rows, L2-normalized; the frequency weights are folded into the
+    rows, so this is a weighted mean. The table is memory-mapped.
+    """
+
+    def __init__(self, model_dir, model_name):
+        from tokenizers import Tokenizer
+
+        model_dir = Path(model_dir)
+        with open(model_dir / STATIC_META_FILE, encoding="utf-8") as fh:
+            meta = json.load(fh)
+        if meta.get("model") != model_name:
+            raise ValueError(
+                f"Static encoder in {model_dir} was distilled from {meta.get('model')!r}, not {model_name!r}"
+            )
+
+        self.name = f"{model_name}-static{meta['dim']}"
+        self.table = np.load(model_dir / STATIC_TABLE_FILE, mmap_mode="r")
+        self.tokenizer = Tokenizer.from_file(str(model_dir / STATIC_TOKENIZER_FILE))
+        self.tokenizer.no_padding()
+
+    def encode(self, texts):
+        single = isinstance(texts, str)
+        batch = self.tokenizer.encode_batch([texts] if single else list(texts), add_special_tokens=False)
+
+        lengths = np.array([len(e.ids) for e in batch])
+        ids = np.fromiter((i for e in batch for i in e.ids), dtype=np.int64, count=int(lengths.sum()))
+
+        vectors = np.zeros((len(batch), self.table.shape[1]), dtype=np.float32)
+        present = lengths > 0
+        if present.any():
+            starts = np.cumsum(lengths) - lengths
+            rows = np.asarray(self.table[ids], dtype=np.float32)
+            vectors[present] = np.add.reduceat(rows, starts[present], axis=0)
+
+        vectors = normalize_rows(vectors)
+        return vectors[0] if single else vectors
+
+
+# ─────────────────────────
+# FACTORY
+# ─────────────────────────
+ENCODER_BACKENDS = ("sentence-transformers", "onnx", "static", "remote")
+
+
+def create_encoder(backend, model_name, cache_folder=None, onnx_dir=None, threads=None, remote=None,
+                   static_dir=None):
+    """
+    Builds the encoder selected by CHATBOT_ENCODER. ``remote`` holds the
+    RemoteEncoder options (socket_path, name, pool_size, timeout).
+    """
+    if backend == "sentence-transformers":
+        return SentenceTransformerEncoder(model_name, cache_folder=cache_folder)
+    if backend == "onnx":
+        return OnnxEncoder(onnx_dir, model_name, threads=threads)
+    if backend == "static":
+        return StaticEncoder(static_dir, model_name)
+    if backend == "remote":
+        from .inference_server import RemoteEncoder
+
+        return RemoteEncoder(**(remote or {}))
+
+    raise ValueError(
+        f"Unknown CHATBOT_ENCODER {backend!r}; expected one of {ENCODER_BACKENDS}"
+    )
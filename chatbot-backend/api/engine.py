@@ -1,9 +1,33 @@
 import os
+import time
+import signal
+import hashlib
+import logging
 import datetime
 import numpy as np
 import threading
-import torch
-from sentence_transformers import SentenceTransformer, util
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from django.conf import settings
+
+from .admission import AdmissionController
+from .ann import IVFIndex
+from .batching import EncodeBatcher
+from .cache import QueryCache
+from .catalog import CatalogError, catalog_examples, diff_catalogs, load_catalog
+from .conversation import context_query, create_conversation_store
+from .encoders import create_encoder, static_encoder_digest
+from .index import IntentIndex
+from .lexical import LexicalCascade, TierStats
+from .metrics import REGISTRY, SIZE_BUCKETS
+from .precision import reduce_index
+from .prototypes import compress_index
+from .retrieval import PassageIndex
+from .store import catalog_hash, load_ann, load_index, save_ann, save_index
+from .transcripts import create_transcript_log
+
+logger = logging.getLogger(__name__)
 
 # Set HuggingFace cache environment variables
 os.environ.setdefault("HF_HOME", "/app/.hf_cache")
@@ -14,16 +38,73 @@ os.environ.setdefault("TRANSFORMERS_CACHE", "/app/.hf_cache")
 # ─────────────────────────
 _model = None
 _intent_embeddings = None
-_lock = threading.Lock()
+_raw_index = None  # uncompressed example vectors, reused on catalog reload
+_batcher = None
+_query_cache = None
+_lexical = None
+_admission = None
+_conversations = None
+_faq_index = None
+_faq_loaded = False
+_transcripts = None
+_executor = None
+_executor_pid = None
+_tier_stats = TierStats()
+_lock = threading.RLock()  # re-entrant: index build loads the model
 
 MODEL_NAME = "all-MiniLM-L6-v2"
+SCORE_THRESHOLD = 0.35  # tuned threshold
+
+# ─────────────────────────
+# METRICS (exported on /api/metrics/)
+# ─────────────────────────
+STARTUP_BUCKETS = (0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+_model_load_seconds = REGISTRY.histogram(
+    "chatbot_model_load_seconds", "Encoder load time.", ["backend"], buckets=STARTUP_BUCKETS,
+)
+_index_load_seconds = REGISTRY.histogram(
+    "chatbot_intent_index_load_seconds", "Intent matrix load/build time.", buckets=STARTUP_BUCKETS,
+)
+_encode_seconds = REGISTRY.histogram(
+    "chatbot_encode_seconds", "Encoder call time, single query or batch.", ["call"],
+)
+_encode_batch_size = REGISTRY.histogram(
+    "chatbot_encode_batch_size", "Texts per encoder call.", buckets=SIZE_BUCKETS,
+)
+_scoring_seconds = REGISTRY.histogram(
+    "chatbot_scoring_seconds", "Intent scoring time per call.", ["call"],
+)
+_resolved_total = REGISTRY.counter(
+    "chatbot_resolved_total", "Messages resolved, by cascade tier and intent.", ["tier", "intent"],
+)
 
 # ─────────────────────────
 # MODEL LOADER (Singleton)
 # ─────────────────────────
+def get_encoder_backend():
+    return getattr(settings, "CHATBOT_ENCODER", "sentence-transformers")
+
+
+def get_encoder_key():
+    """
+    Identifies the vectors an encoder produces (model + backend), so each
+    backend gets its own cached intent matrix. A remote encoder produces
+    whatever its inference server runs.
+    """
+    backend = get_encoder_backend()
+    if backend == "remote":
+        backend = getattr(settings, "CHATBOT_INFERENCE_ENCODER", "sentence-transformers")
+    if backend == "static":
+        # A rebuilt table is a different encoder.
+        digest = static_encoder_digest(getattr(settings, "CHATBOT_STATIC_MODEL_DIR", ""))
+        return f"{MODEL_NAME}:static:{(digest or 'missing')[:12]}"
+    return f"{MODEL_NAME}:{backend}"
+
+
 def get_model():
     """
-    Loads SentenceTransformer only once per process.
+    Loads the configured encoder (see api/encoders.py) only once per process.
     Thread-safe for Gunicorn workers.
     """
     global _model
@@ -31,13 +112,115 @@ def get_model():
     if _model is None:
         with _lock:
             if _model is None:
-                print("🔹 Loading SentenceTransformer model...")
-                _model = SentenceTransformer(MODEL_NAME, cache_folder=os.environ.get("HF_HOME"))
-                print("✅ Model loaded")
+                backend = get_encoder_backend()
+                configure_torch_threads()
+                logger.info("🔹 Loading %s encoder...", backend)
+                start = time.perf_counter()
+                _model = create_encoder(
+                    backend,
+                    MODEL_NAME,
+                    cache_folder=os.environ.get("HF_HOME"),
+                    onnx_dir=getattr(settings, "CHATBOT_ONNX_MODEL_DIR", None),
+                    threads=intra_op_threads(),
+                    static_dir=getattr(settings, "CHATBOT_STATIC_MODEL_DIR", None),
+                    remote={
+                        "socket_path": getattr(settings, "CHATBOT_INFERENCE_SOCKET", None),
+                        "name": get_encoder_key(),
+                        "pool_size": getattr(settings, "CHATBOT_INFERENCE_POOL_SIZE", 4),
+                        "timeout": getattr(settings, "CHATBOT_INFERENCE_TIMEOUT", 30.0),
+                    },
+                )
+                _share_weights(_model)
+                _model_load_seconds.observe(time.perf_counter() - start, backend)
+                logger.info("✅ Model loaded")
 
     return _model
 
 
+# ─────────────────────────
+# INFERENCE EXECUTOR & THREADS
+# ─────────────────────────
+def get_executor_size():
+    return max(1, getattr(settings, "CHATBOT_INFERENCE_WORKERS", 2))
+
+
+def get_executor():
+    """
+    Bounded thread pool that async views offload inference to. At most
+    CHATBOT_INFERENCE_WORKERS encodes run at once per process.
+    """
+    global _executor, _executor_pid
+
+    if _executor is None or _executor_pid != os.getpid():
+        with _lock:
+            if _executor is None or _executor_pid != os.getpid():
+                _executor = ThreadPoolExecutor(
+                    max_workers=get_executor_size(),
+                    thread_name_prefix="chatbot-infer",
+                )
+                _executor_pid = os.getpid()
+
+    return _executor
+
+
+def intra_op_threads():
+    """
+    Intra-op threads per inference call: this worker's share of the cores
+    (cpu_count / WEB_CONCURRENCY) split across the executor threads, unless
+    CHATBOT_TORCH_INTRA_THREADS overrides it. Used for torch and ONNX Runtime.
+    """
+    override = getattr(settings, "CHATBOT_TORCH_INTRA_THREADS", 0)
+    if override:
+        return override
+
+    web_workers = max(1, int(os.environ.get("WEB_CONCURRENCY", "1")))
+    cores = max(1, (os.cpu_count() or 1) // web_workers)
+    return max(1, cores // get_executor_size())
+
+
+def configure_torch_threads():
+    """
+    Sizes torch intra-op threads so (web workers x executor threads x
+    intra-op threads) does not exceed the CPU count, and uses a single
+    inter-op thread. CHATBOT_TORCH_INTRA_THREADS / _INTER_THREADS override.
+    Returns the (intra, inter) applied, or None when torch is not in use.
+    """
+    if get_encoder_backend() != "sentence-transformers":
+        return None  # onnx/static/remote workers never import torch
+
+    try:
+        import torch
+    except ImportError:
+        return None
+
+    intra = intra_op_threads()
+    inter = getattr(settings, "CHATBOT_TORCH_INTER_THREADS", 0) or 1
+
+    torch.set_num_threads(intra)
+    try:
+        torch.set_num_interop_threads(inter)
+    except RuntimeError:
+        pass  # already fixed once parallel work ran (e.g. in a --preload master)
+
+    return torch.get_num_threads(), torch.get_num_interop_threads()
+
+
+def _share_weights(model):
+    """
+    Memory-maps encoder weights from CHATBOT_EMBEDDING_CACHE_DIR so N gunicorn
+    workers cost about one model's RSS (CHATBOT_SHARED_WEIGHTS).
+    """
+    cache_dir = getattr(settings, "CHATBOT_EMBEDDING_CACHE_DIR", None)
+    if not cache_dir or not getattr(settings, "CHATBOT_SHARED_WEIGHTS", True):
+        return
+
+    try:
+        if model.share_weights(cache_dir):
+            logger.info("🔹 Encoder weights memory-mapped (shared across workers)")
+    except Exception as e:
+        logger.warning("⚠️ Weights not shared, keeping private copy: %s", e)
+
+
 # ─────────────────────────
 # INTENT DEFINITIONS
 # ─────────────────────────
@@ -380,70 +563,926 @@ INTENTS = {
     },
 }
 
+# ─────────────────────────
+# EXTERNAL CATALOG (CHATBOT_INTENTS_FILE)
+# ─────────────────────────
+# The literal above is the built-in catalog; a JSON/YAML file with the same
+# shape replaces it and can be reloaded without a restart.
+_reload_lock = threading.Lock()
+_catalog_mtime = None
+_catalog_checked = 0.0
+
+
+def get_catalog_path():
+    return getattr(settings, "CHATBOT_INTENTS_FILE", "") or None
+
+
+def _load_initial_catalog():
+    global INTENTS, _catalog_mtime
+
+    path = get_catalog_path()
+    if path:
+        _catalog_mtime = os.stat(path).st_mtime_ns
+        INTENTS = load_catalog(path)
+        logger.info("🔹 Intent catalog loaded from %s (%d intents)", path, len(INTENTS))
+
+
+_load_initial_catalog()
+
+
 
 # ─────────────────────────
 # PRELOAD MODEL & EMBEDDINGS (Cold-start optimization)
 # ─────────────────────────
-try:
-    _model = SentenceTransformer(MODEL_NAME, cache_folder=os.environ.get("HF_HOME"))
-    _intent_embeddings = {
-        intent: _model.encode(data["examples"], convert_to_tensor=True)
-        for intent, data in INTENTS.items()
+def encode_texts(model, texts):
+    """
+    Encodes texts into L2-normalized float32 vectors.
+    """
+    single = isinstance(texts, str)
+    _encode_batch_size.observe(1 if single else len(texts))
+    with _encode_seconds.time("single" if single else "batch"):
+        return model.encode(texts)
+
+
+def build_intent_index(model, intents=None, known=None):
+    """
+    Encodes every intent example in one pass and stacks them into an
+    IntentIndex (one contiguous matrix + per-intent row offsets).
+    ``known`` maps example text -> vector; only the other examples are
+    encoded.
+    """
+    intents = INTENTS if intents is None else intents
+    known = known or {}
+
+    todo = list(dict.fromkeys(ex for ex in catalog_examples(intents) if ex not in known))
+    fresh = dict(zip(todo, encode_texts(model or get_model(), todo))) if todo else {}
+
+    embeddings = {
+        intent: np.stack([known[ex] if ex in known else fresh[ex] for ex in data["examples"]])
+        for intent, data in intents.items()
     }
-    print("🚀 Chatbot model and embeddings preloaded")
-except Exception as e:
-    print("⚠️ Preload skipped:", e)
+    return IntentIndex.from_embeddings(embeddings)
+
+
+def load_or_build_raw_index(intents, model=None, rebuild=False, known=None):
+    """
+    Loads the full-precision intent matrix from the on-disk cache when its
+    key (examples + encoder key) matches; otherwise encodes (see
+    build_intent_index) and saves it. Returns ``(index, digest)``.
+    """
+    cache_dir = getattr(settings, "CHATBOT_EMBEDDING_CACHE_DIR", None)
+    digest = catalog_hash(intents, get_encoder_key())
+
+    index = None
+    if cache_dir and not rebuild:
+        index = load_index(cache_dir, digest)
+
+    if index is None:
+        index = build_intent_index(model, intents, known=known)
+
+        if cache_dir:
+            try:
+                save_index(cache_dir, digest, index, get_encoder_key())
+            except OSError as e:
+                logger.warning("⚠️ Embedding cache not written: %s", e)
+
+    return index, digest
+
+
+def load_or_build_intent_index(model=None, rebuild=False):
+    """
+    The serving index for INTENTS: the cached/built matrix after the
+    opt-in prototype, precision and ANN stages.
+    """
+    index, digest = load_or_build_raw_index(INTENTS, model, rebuild=rebuild)
+    return finalize_index(index, digest, rebuild=rebuild)
+
+
+def finalize_index(index, digest, rebuild=False):
+    """
+    Applies prototype compression, reduced precision and the ANN index.
+    """
+    cache_dir = getattr(settings, "CHATBOT_EMBEDDING_CACHE_DIR", None)
+
+    index, prototypes = compress_prototypes(index)
+    index, precision = reduce_precision(index)
+    if prototypes or precision:
+        variant = f"{digest}:{prototypes}:{precision}"
+        digest = hashlib.sha256(variant.encode("utf-8")).hexdigest()
+
+    attach_ann_index(index, cache_dir, digest, rebuild=rebuild)
+    return index
+
+
+def compress_prototypes(index):
+    """
+    Opt-in: replaces each intent's examples with k prototypes
+    (CHATBOT_PROTOTYPES_K, overridable per intent). Returns the index and
+    a string identifying the compression ("" when off).
+    """
+    k_default = getattr(settings, "CHATBOT_PROTOTYPES_K", 0)
+    k_per_intent = getattr(settings, "CHATBOT_PROTOTYPES_K_PER_INTENT", {})
+    if k_default <= 0 and not k_per_intent:
+        return index, ""
+
+    method = getattr(settings, "CHATBOT_PROTOTYPE_METHOD", "medoids")
+    compressed = compress_index(index, k_default, k_per_intent, method=method)
+    logger.info(
+        "🔹 Intent prototypes: %d examples -> %d rows (%s)",
+        len(index), len(compressed), method,
+    )
+
+    variant = f"{method}:{k_default}:{sorted(k_per_intent.items())}"
+    return compressed, variant
+
+
+def reduce_precision(index):
+    """
+    Opt-in: stores the matrix as float16/int8 (CHATBOT_MATRIX_DTYPE) and/or
+    PCA-projected to CHATBOT_MATRIX_DIM dims. Returns the index and a string
+    identifying the reduction ("" when off).
+    """
+    dtype = getattr(settings, "CHATBOT_MATRIX_DTYPE", "float32")
+    dim = getattr(settings, "CHATBOT_MATRIX_DIM", 0)
+    if dtype == "float32" and not dim:
+        return index, ""
+
+    reduced = reduce_index(index, dtype=dtype, dim=dim)
+    logger.info(
+        "🔹 Intent matrix: %.1f KB -> %.1f KB (%s, %d dims)",
+        index.nbytes / 1024, reduced.nbytes / 1024, dtype, reduced.dim,
+    )
+    return reduced, f"{dtype}:{dim}"
+
+
+def attach_ann_index(index, cache_dir, digest, rebuild=False):
+    """
+    Attaches an IVF index when CHATBOT_ANN_ENABLED is on and the catalog
+    has at least CHATBOT_ANN_MIN_ROWS examples; smaller catalogs are
+    faster with exact search.
+    """
+    if not getattr(settings, "CHATBOT_ANN_ENABLED", False):
+        return
+    if len(index) < getattr(settings, "CHATBOT_ANN_MIN_ROWS", 5000):
+        return
+
+    nlist = getattr(settings, "CHATBOT_ANN_NLIST", 0) or None
+    ann = None if rebuild or not cache_dir else load_ann(cache_dir, digest, nlist)
+
+    if ann is None:
+        ann = IVFIndex.build(index.dense(), nlist=nlist)
+        if cache_dir:
+            try:
+                save_ann(cache_dir, digest, nlist, ann)
+            except OSError as e:
+                logger.warning("⚠️ ANN index not written: %s", e)
+
+    index.attach_ann(ann, getattr(settings, "CHATBOT_ANN_NPROBE", 8))
+
 
 # ─────────────────────────
 # INTENT EMBEDDINGS CACHE
 # ─────────────────────────
 def get_intent_embeddings():
     """
-    Computes and caches embeddings for all intent examples.
+    Loads (or computes) and caches the stacked intent example matrix.
     """
-    global _intent_embeddings
+    global _intent_embeddings, _raw_index
 
     if _intent_embeddings is None:
         with _lock:
             if _intent_embeddings is None:
-                model = get_model()
-                _intent_embeddings = {
-                    intent: model.encode(
-                        data["examples"],
-                        convert_to_tensor=True,
-                    )
-                    for intent, data in INTENTS.items()
-                }
+                with _index_load_seconds.time():
+                    _raw_index, digest = load_or_build_raw_index(INTENTS)
+                    _intent_embeddings = finalize_index(_raw_index, digest)
 
     return _intent_embeddings
 
 
+# ─────────────────────────
+# CATALOG RELOAD
+# ─────────────────────────
+def reload_catalog(path=None):
+    """
+    Re-reads the catalog file and swaps it in. Only examples whose text is
+    new are encoded; the rest reuse their current vectors. The new index
+    and lexical tier are built off-lock, then swapped in together, so
+    in-flight requests finish on the old ones and are never blocked.
+    Returns a summary of what changed.
+    """
+    global INTENTS, _intent_embeddings, _raw_index, _lexical, _query_cache, _catalog_mtime
+
+    path = path or get_catalog_path()
+    if not path:
+        raise CatalogError("CHATBOT_INTENTS_FILE is not set")
+
+    with _reload_lock:
+        start = time.perf_counter()
+        _catalog_mtime = os.stat(path).st_mtime_ns  # a bad file is not retried until edited
+        intents = load_catalog(path)
+        old, raw = INTENTS, _raw_index
+
+        summary = {"path": str(path), "changed": intents != old, **diff_catalogs(old, intents)}
+        if not summary["changed"]:
+            return summary
+
+        lexical = LexicalCascade(
+            intents,
+            tfidf_threshold=getattr(settings, "CHATBOT_LEXICAL_TFIDF_THRESHOLD", 0.8),
+        )
+
+        index = new_raw = None
+        if _intent_embeddings is not None:
+            # Warm: build now. Cold: the first request builds it lazily.
+            known = dict(zip(catalog_examples(old), raw.matrix)) if raw is not None else {}
+            summary["examples_reused"] = len(set(catalog_examples(intents)) & known.keys())
+            new_raw, digest = load_or_build_raw_index(intents, known=known)
+            index = finalize_index(new_raw, digest)
+
+        with _lock:
+            INTENTS = intents
+            _lexical = lexical
+            _raw_index = new_raw
+            _intent_embeddings = index
+            if _query_cache is not None:
+                # In-flight requests still write to the old cache object.
+                _query_cache = QueryCache(max_size=_query_cache.max_size)
+
+        summary["reload_s"] = round(time.perf_counter() - start, 3)
+        logger.info("🔄 Intent catalog reloaded: %s", summary)
+        return summary
+
+
+def _reload_quietly():
+    try:
+        reload_catalog()
+    except Exception:
+        logger.exception("⚠️ Intent catalog reload failed; keeping the current catalog")
+
+
+def _reload_in_background():
+    if not _reload_lock.locked():
+        threading.Thread(target=_reload_quietly, name="chatbot-catalog-reload", daemon=True).start()
+
+
+def check_catalog(force=False):
+    """
+    Reloads in the background when the catalog file changed. Cheap enough
+    for the request path: stats the file at most every
+    CHATBOT_CATALOG_WATCH_S seconds (0 disables watching).
+    """
+    global _catalog_checked
+
+    path = get_catalog_path()
+    interval = getattr(settings, "CHATBOT_CATALOG_WATCH_S", 0)
+    if not path or (interval <= 0 and not force):
+        return
+
+    now = time.monotonic()
+    if not force and now - _catalog_checked < interval:
+        return
+    _catalog_checked = now
+
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return
+    if mtime != _catalog_mtime:
+        _reload_in_background()
+
+
+def install_reload_signal():
+    """
+    SIGHUP reloads the catalog in this process. Call from a worker's main
+    thread (gunicorn's post_worker_init); never in the gunicorn master,
+    which uses SIGHUP itself.
+    """
+    if get_catalog_path():
+        signal.signal(signal.SIGHUP, lambda signum, frame: _reload_in_background())
+
+
+# ─────────────────────────
+# STARTUP & READINESS
+# ─────────────────────────
+STARTUP_MODES = ("eager", "background", "lazy")
+
+_warm_lock = threading.Lock()
+_status = {
+    "state": "cold",  # cold -> loading -> ready | failed
+    "mode": None,
+    "model_load_s": None,
+    "embedding_build_s": None,
+    "warmup_s": None,
+    "started_at": None,
+    "ready_at": None,
+    "error": None,
+}
+_failed_at = None  # monotonic time of the last failed warm-up
+
+
+def _now():
+    return datetime.datetime.now(datetime.timezone.utc).isoformat()
+
+
+def warm_up():
+    """
+    Loads the model, builds the intent matrix and runs a warm-up encode,
+    recording how long each step took. Failures are logged, not raised.
+    """
+    global _failed_at
+    _status.update(state="loading", started_at=_now(), error=None)
+
+    try:
+        t = time.perf_counter()
+        model = get_model()
+        _status["model_load_s"] = round(time.perf_counter() - t, 3)
+
+        t = time.perf_counter()
+        get_intent_embeddings()
+        _status["embedding_build_s"] = round(time.perf_counter() - t, 3)
+
+        t = time.perf_counter()
+        encode_texts(model, ["hello"])  # first forward pass allocates buffers
+        _status["warmup_s"] = round(time.perf_counter() - t, 3)
+    except Exception as e:
+        logger.exception("⚠️ Chatbot warm-up failed")
+        _failed_at = time.monotonic()
+        _status.update(state="failed", error=f"{type(e).__name__}: {e}")
+        return False
+
+    _status.update(state="ready", ready_at=_now())
+    logger.info("🚀 Chatbot model and embeddings ready")
+    return True
+
+
+def ensure_warm():
+    """
+    Blocks until warm. Used by lazy mode and direct (non-HTTP) callers.
+    """
+    if _status["state"] == "ready":
+        return
+    with _warm_lock:
+        if _status["state"] != "ready":
+            warm_up()
+
+
+def _start_background_warmup():
+    threading.Thread(target=ensure_warm, name="chatbot-warmup", daemon=True).start()
+
+
+def _retry_failed_warmup():
+    """
+    Eager/background modes warm once at boot: after a failure, retry in
+    the background at most every CHATBOT_WARMUP_RETRY_S seconds.
+    """
+    interval = getattr(settings, "CHATBOT_WARMUP_RETRY_S", 30)
+    if _failed_at is None or time.monotonic() - _failed_at < interval:
+        return
+    if not _warm_lock.acquire(blocking=False):
+        return  # a warm-up is already running
+    try:
+        if _status["state"] != "failed":
+            return
+        _status["state"] = "loading"
+    finally:
+        _warm_lock.release()
+    _start_background_warmup()
+
+
+def _after_fork_in_child():
+    # A thread of a --preload master (warm-up, catalog reload) may have held
+    # these locks at fork; its copy in the child would never be released.
+    global _warm_lock, _lock, _reload_lock
+    _warm_lock = threading.Lock()
+    _lock = threading.RLock()
+    _reload_lock = threading.Lock()
+    if _status["mode"] == "background" and _status["state"] == "loading":
+        _status["state"] = "cold"
+        _start_background_warmup()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+def start(mode=None):
+    """
+    Starts the engine according to CHATBOT_STARTUP_MODE:
+    - eager: block until the model is loaded and warm
+    - background: warm in a thread; requests get a "warming" reply meanwhile
+    - lazy: warm on the first request
+    """
+    mode = mode or getattr(settings, "CHATBOT_STARTUP_MODE", "eager")
+    if mode not in STARTUP_MODES:
+        raise ValueError(
+            f"Unknown CHATBOT_STARTUP_MODE {mode!r}; expected one of {STARTUP_MODES}"
+        )
+
+    _status["mode"] = mode
+
+    # Lexical tier (incl. crisis phrases) needs no model: ready immediately.
+    get_lexical_cascade()
+
+    if mode == "eager":
+        ensure_warm()
+    elif mode == "background":
+        _start_background_warmup()
+
+
+def is_ready():
+    return _status["state"] == "ready"
+
+
+def can_serve():
+    """
+    Whether a request should run inference now. Lazy mode warms on demand;
+    the other modes serve a "warming" reply until ready.
+    """
+    if _status["state"] == "failed" and _status["mode"] in ("eager", "background"):
+        _retry_failed_warmup()
+    return is_ready() or _status["mode"] in ("lazy", None)
+
+
+def get_status():
+    return dict(_status, encoder=get_encoder_key())
+
+
+# ─────────────────────────
+# QUERY ENCODING (Micro-batched)
+# ─────────────────────────
+def get_batcher():
+    """
+    Shared EncodeBatcher that coalesces concurrent single-query encodes.
+    """
+    global _batcher
+
+    if _batcher is None:
+        with _lock:
+            if _batcher is None:
+                _batcher = EncodeBatcher(
+                    lambda texts: encode_texts(get_model(), texts),
+                    max_batch=getattr(settings, "CHATBOT_BATCH_MAX_SIZE", 16),
+                    max_wait_ms=getattr(settings, "CHATBOT_BATCH_MAX_WAIT_MS", 2.0),
+                )
+
+    return _batcher
+
+
+def encode_query(user_query: str):
+    """
+    Encodes one query, through the micro-batcher when enabled.
+    """
+    if getattr(settings, "CHATBOT_BATCHING_ENABLED", True):
+        return get_batcher().encode(user_query)
+    return encode_texts(get_model(), user_query)
+
+
+def get_query_cache():
+    """
+    Shared LRU of resolved queries; None when CHATBOT_QUERY_CACHE_SIZE is 0.
+    """
+    global _query_cache
+
+    size = getattr(settings, "CHATBOT_QUERY_CACHE_SIZE", 4096)
+    if size <= 0:
+        return None
+
+    if _query_cache is None:
+        with _lock:
+            if _query_cache is None:
+                _query_cache = QueryCache(max_size=size)
+
+    return _query_cache
+
+
+def get_lexical_cascade():
+    """
+    First-tier lexical matcher built from INTENTS (no model needed).
+    """
+    global _lexical
+
+    if _lexical is None:
+        with _lock:
+            if _lexical is None:
+                _lexical = LexicalCascade(
+                    INTENTS,
+                    tfidf_threshold=getattr(settings, "CHATBOT_LEXICAL_TFIDF_THRESHOLD", 0.8),
+                )
+
+    return _lexical
+
+
+def match_lexical(user_query: str):
+    """
+    Runs the lexical tier. Crisis phrases are always checked; exact and
+    TF-IDF matching only when CHATBOT_LEXICAL_CASCADE is on.
+    """
+    cascade = get_lexical_cascade()
+    if getattr(settings, "CHATBOT_LEXICAL_CASCADE", True):
+        return cascade.match(user_query)
+    return cascade.match_crisis(user_query)
+
+
+# ─────────────────────────
+# ADMISSION CONTROL
+# ─────────────────────────
+def get_admission():
+    """
+    Shared AdmissionController; None when CHATBOT_ADMISSION_ENABLED is off.
+    The concurrency it plans for is the inference executor size.
+    """
+    global _admission
+
+    if not getattr(settings, "CHATBOT_ADMISSION_ENABLED", True):
+        return None
+
+    if _admission is None:
+        with _lock:
+            if _admission is None:
+                _admission = AdmissionController(
+                    concurrency=get_executor_size(),
+                    max_queue=getattr(settings, "CHATBOT_ADMISSION_MAX_QUEUE", 16),
+                    slo_ms=getattr(settings, "CHATBOT_LATENCY_SLO_MS", 2000),
+                    client_rate=getattr(settings, "CHATBOT_CLIENT_RATE", 2.0),
+                    client_burst=getattr(settings, "CHATBOT_CLIENT_BURST", 10),
+                )
+
+    return _admission
+
+
+def admit(client_id=None, cost=1):
+    """
+    Context manager around a model-bound request of ``cost`` messages;
+    raises Overloaded when the request should be shed. Only encodes are
+    admitted: lexical and cached answers (crisis phrases included) never
+    wait or get shed. A crisis message the phrase tier misses can be, so
+    every shed reply carries the crisis resources (views.shed_reply).
+    """
+    admission = get_admission()
+    if admission is None:
+        return nullcontext()
+    return admission.admit(client_id, cost)
+
+
+# ─────────────────────────
+# CONVERSATION CONTEXT
+# ─────────────────────────
+def get_conversation_store():
+    """
+    Shared store of recent turns per session; None when
+    CHATBOT_CONVERSATION_TURNS is 0.
+    """
+    global _conversations
+
+    turns = getattr(settings, "CHATBOT_CONVERSATION_TURNS", 4)
+    if turns <= 0:
+        return None
+
+    if _conversations is None:
+        with _lock:
+            if _conversations is None:
+                _conversations = create_conversation_store(
+                    getattr(settings, "CHATBOT_CONVERSATION_STORE", "memory"),
+                    max_sessions=getattr(settings, "CHATBOT_CONVERSATION_MAX_SESSIONS", 10_000),
+                    max_turns=turns,
+                    ttl=getattr(settings, "CHATBOT_CONVERSATION_TTL_S", 1800),
+                    max_bytes=getattr(settings, "CHATBOT_CONVERSATION_MAX_BYTES", 32 * 1024 * 1024),
+                    cache_alias=getattr(settings, "CHATBOT_CONVERSATION_CACHE_ALIAS", "default"),
+                )
+
+    return _conversations
+
+
+def contextualize(result, session_id):
+    """
+    Follow-ups: a message that matched nothing on its own ("how much?") is
+    rescored with its embedding biased towards the session's recent turns,
+    using their stored vectors. Then records the turn. Stateless when
+    there is no session id.
+    """
+    store = get_conversation_store()
+    if store is None or not session_id or result.intent == "warming":
+        return result
+
+    history = store.get(session_id)
+
+    if result.intent == "unknown" and result.embedding is not None and history:
+        query = context_query(
+            result.embedding,
+            history,
+            weight=getattr(settings, "CHATBOT_CONTEXT_WEIGHT", 0.35),
+            decay=getattr(settings, "CHATBOT_CONTEXT_DECAY", 0.5),
+        )
+        if query is not None:
+            with _scoring_seconds.time("context"):
+                intent, score = get_intent_embeddings().best(query, SCORE_THRESHOLD)
+            if intent != "unknown":
+                result = QueryResult(result.embedding, intent, score, "context")
+                _resolved_total.inc("context", intent)
+
+    store.append(session_id, result.embedding, result.intent)
+    return result
+
+
+def get_faq_index():
+    """
+    Memory-mapped FAQ passage index (build_faq_index); None when
+    CHATBOT_FAQ_ENABLED is off, nothing is built, or it was built with a
+    different encoder than the one serving queries.
+    """
+    global _faq_index, _faq_loaded
+
+    if not getattr(settings, "CHATBOT_FAQ_ENABLED", True):
+        return None
+
+    if not _faq_loaded:
+        with _lock:
+            if not _faq_loaded:
+                directory = getattr(settings, "CHATBOT_FAQ_DIR", None)
+                try:
+                    index = PassageIndex.load(directory, nprobe=getattr(settings, "CHATBOT_ANN_NPROBE", 8))
+                except (OSError, ValueError, KeyError, TypeError) as e:
+                    logger.info("ℹ️ No FAQ index at %s (%s); run build_faq_index", directory, e)
+                    index = None
+
+                if index is not None and index.encoder_key != get_encoder_key():
+                    logger.warning(
+                        "⚠️ FAQ index built with %s, serving %s; rebuild it with build_faq_index",
+                        index.encoder_key, get_encoder_key(),
+                    )
+                    index = None
+                elif index is not None:
+                    logger.info("✅ FAQ index: %d passages (mmap)", len(index))
+
+                _faq_index = index
+                _faq_loaded = True
+
+    return _faq_index
+
+
+def retrieve_passages(result, k=None):
+    """
+    FAQ passages for a message that matched no intent, scored with the
+    embedding already computed for intent matching (never re-encoded).
+    Empty for matched, lexical or warming results.
+    """
+    if result.intent != "unknown" or result.embedding is None:
+        return []
+
+    index = get_faq_index()
+    if index is None:
+        return []
+
+    with _scoring_seconds.time("faq"):
+        return index.search(
+            result.embedding,
+            k=k or getattr(settings, "CHATBOT_FAQ_TOP_K", 3),
+            min_score=getattr(settings, "CHATBOT_FAQ_MIN_SCORE", 0.45),
+        )
+
+
+def get_transcript_log():
+    """
+    Asynchronous JSONL transcript log; None unless
+    CHATBOT_TRANSCRIPTS_ENABLED is on.
+    """
+    global _transcripts
+
+    if not getattr(settings, "CHATBOT_TRANSCRIPTS_ENABLED", False):
+        return None
+
+    if _transcripts is None:
+        with _lock:
+            if _transcripts is None:
+                _transcripts = create_transcript_log(
+                    getattr(settings, "CHATBOT_TRANSCRIPTS_DIR", "transcripts"),
+                    max_queue=getattr(settings, "CHATBOT_TRANSCRIPTS_QUEUE", 10_000),
+                    flush_interval=getattr(settings, "CHATBOT_TRANSCRIPTS_FLUSH_S", 1.0),
+                    segment_bytes=getattr(settings, "CHATBOT_TRANSCRIPTS_SEGMENT_MB", 64) * 1024 * 1024,
+                    max_segments=getattr(settings, "CHATBOT_TRANSCRIPTS_MAX_SEGMENTS", 50),
+                )
+
+    return _transcripts
+
+
+def log_transcript(entry):
+    """
+    Queues a transcript entry; never blocks (dropped and counted when the
+    writer falls behind).
+    """
+    log = get_transcript_log()
+    if log is not None:
+        log.record(entry)
+
+
+def close_transcripts():
+    if _transcripts is not None:
+        _transcripts.close()
+
+
+def get_stats():
+    """
+    Runtime stats for the engine's shared components.
+    """
+    return {
+        "tiers": _tier_stats.snapshot(),
+        "batcher": _batcher.stats.snapshot() if _batcher is not None else None,
+        "query_cache": _query_cache.snapshot() if _query_cache is not None else None,
+        "admission": _admission.snapshot() if _admission is not None else None,
+        "conversations": _conversations.snapshot() if _conversations is not None else None,
+        "faq": _faq_index.snapshot() if _faq_index is not None else None,
+        "transcripts": _transcripts.snapshot() if _transcripts is not None else None,
+    }
+
+
+def _numeric_stats(snapshot, prefix=""):
+    """
+    Flattens a stats snapshot to ``{(stat,): number}`` for a gauge,
+    e.g. {"queue_delay_ms": {"p99": 3}} -> {("queue_delay_ms_p99",): 3}.
+    """
+    values = {}
+    for key, value in (snapshot or {}).items():
+        if isinstance(value, dict):
+            values.update(_numeric_stats(value, f"{prefix}{key}_"))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            values[(f"{prefix}{key}",)] = value
+    return values
+
+
+REGISTRY.gauge(
+    "chatbot_query_cache", "Query cache size and counters.", ["stat"],
+    collect=lambda: _numeric_stats(_query_cache and _query_cache.snapshot()),
+)
+REGISTRY.gauge(
+    "chatbot_batcher", "Micro-batcher counters and queueing delay.", ["stat"],
+    collect=lambda: _numeric_stats(_batcher and _batcher.stats.snapshot()),
+)
+REGISTRY.gauge(
+    "chatbot_admission", "Admission control in-flight, admitted and shed counts.", ["stat"],
+    collect=lambda: _numeric_stats(_admission and _admission.snapshot()),
+)
+REGISTRY.gauge(
+    "chatbot_transcripts", "Transcript log queued, written and dropped entries.", ["stat"],
+    collect=lambda: _numeric_stats(_transcripts and _transcripts.snapshot()),
+)
+REGISTRY.gauge(
+    "chatbot_ready", "1 once the model is loaded and warm.",
+    collect=lambda: {(): int(is_ready())},
+)
+
+
 # ─────────────────────────
 # INTENT MATCHING LOGIC
 # ─────────────────────────
-def get_best_intent(user_query: str) -> str:
+# A resolved message: its normalized embedding (None when a lexical tier
+# answered without encoding), the matched intent and the tier that matched.
+QueryResult = namedtuple("QueryResult", ["embedding", "intent", "score", "tier"])
+
+WARMING = QueryResult(None, "warming", 0.0, "warming")
+
+
+def _resolve(embedding, index):
+    embedding = np.array(embedding, dtype=np.float32)  # detach from the batch
+    embedding.setflags(write=False)  # shared via the cache; never mutate
+    with _scoring_seconds.time("single"):
+        intent, score = index.best(embedding, SCORE_THRESHOLD)
+    return QueryResult(embedding, intent, score, "transformer")
+
+
+def resolve_fast(user_query: str):
     """
-    Returns best intent based on cosine similarity.
+    Answers without the model when possible: lexical tier (crisis, exact,
+    TF-IDF), the warming reply, or a query-cache hit. None otherwise.
     """
-    model = get_model()
-    intent_embeddings = get_intent_embeddings()
+    start = time.perf_counter()
+    check_catalog()
 
-    query_embedding = model.encode(
-        user_query,
-        convert_to_tensor=True,
-    )
+    hit = match_lexical(user_query)
+    if hit is not None:
+        _tier_stats.record(hit.tier, time.perf_counter() - start)
+        _resolved_total.inc(hit.tier, hit.intent)
+        return QueryResult(None, hit.intent, hit.score, hit.tier)
+
+    if not can_serve():
+        return WARMING
+
+    cache = get_query_cache()
+    if cache is not None:
+        result = cache.peek(user_query)
+        if result is not None:
+            _tier_stats.record("transformer", time.perf_counter() - start)
+            _resolved_total.inc("cache", result.intent)
+            return result
 
-    best_intent = "unknown"
-    highest_score = 0.35  # tuned threshold
+    return None
 
-    for intent, embeddings in intent_embeddings.items():
-        cos_scores = util.cos_sim(query_embedding, embeddings)[0]
-        score = torch.max(cos_scores).item()
 
-        if score > highest_score:
-            highest_score = score
-            best_intent = intent
+def resolve_encoded(user_query: str) -> QueryResult:
+    """
+    Encodes and scores one message. Concurrent identical messages share a
+    single encode through the query cache.
+    """
+    start = time.perf_counter()
+
+    ensure_warm()
+    index = get_intent_embeddings()
+    cache = get_query_cache()
+
+    if cache is None:
+        result = _resolve(encode_query(user_query), index)
+    else:
+        result = cache.get_or_compute(
+            user_query,
+            lambda key: _resolve(encode_query(key), index),
+        )
+
+    _tier_stats.record("transformer", time.perf_counter() - start)
+    _resolved_total.inc("transformer", result.intent)
+    return result
+
+
+def resolve_query(user_query: str, client_id=None, session_id=None) -> QueryResult:
+    """
+    Cascade: resolve_fast, otherwise an admitted encode, then conversation
+    context for unmatched follow-ups. Raises Overloaded when admission
+    control sheds the request.
+    """
+    result = resolve_fast(user_query)
+    if result is None:
+        ensure_warm()  # a lazy first load is not service time
+        with admit(client_id):
+            result = resolve_encoded(user_query)
+
+    return contextualize(result, session_id)
 
+
+def classify(user_query: str, client_id=None, session_id=None):
+    """
+    Returns ``(intent, score)`` for a single message.
+    One dot product against all examples, then a max per intent.
+    """
+    result = resolve_query(user_query, client_id, session_id)
+    return result.intent, result.score
+
+
+def classify_batch(user_queries, client_id=None):
+    """
+    Returns ``[(intent, score), ...]`` for many messages. Lexical hits and
+    cache hits skip the model; the rest are encoded in a single batched
+    forward pass and scored with one matmul, admitted as one request.
+    """
+    if not user_queries:
+        return []
+
+    results = []
+    cached = set()
+    for q in user_queries:
+        hit = match_lexical(q)
+        results.append(None if hit is None else QueryResult(None, hit.intent, hit.score, hit.tier))
+
+    pending = [i for i, r in enumerate(results) if r is None]
+    if pending and not can_serve():
+        for i in pending:
+            results[i] = WARMING
+        pending = []
+
+    if pending:
+        ensure_warm()
+        index = get_intent_embeddings()
+        cache = get_query_cache()
+
+        if cache is not None:
+            for i in pending:
+                results[i] = cache.lookup(user_queries[i])
+
+        missing = [i for i in pending if results[i] is None]
+        cached = set(pending) - set(missing)
+        if missing:
+            with admit(client_id, cost=len(missing)):
+                embeddings = encode_texts(get_model(), [user_queries[i] for i in missing])
+                with _scoring_seconds.time("batch"):
+                    scored = index.best_batch(embeddings, SCORE_THRESHOLD)
+
+            for i, embedding, (intent, score) in zip(missing, embeddings, scored):
+                embedding = np.array(embedding, dtype=np.float32)
+                embedding.setflags(write=False)
+                results[i] = QueryResult(embedding, intent, score, "transformer")
+                if cache is not None:
+                    cache.store(user_queries[i], results[i])
+
+    # Same labels as resolve_fast/resolve_encoded: cache hits as "cache",
+    # warming replies not counted.
+    for i, r in enumerate(results):
+        if r.tier != "warming":
+            _resolved_total.inc("cache" if i in cached else r.tier, r.intent)
+    return [(r.intent, r.score) for r in results]
+
+
+def get_best_intent(user_query: str, client_id=None, session_id=None) -> str:
+    """
+    Returns best intent based on cosine similarity.
+    """
+    best_intent, _ = classify(user_query, client_id, session_id)
     return best_intent
 
 
@@ -0,0 +1,154 @@
+import numpy as np
+
+
+# ─────────────────────────
+# HELPERS
+# ─────────────────────────
+def normalize_rows(vectors):
+    """
+    L2-normalizes a (dim,) vector or (n, dim) matrix as float32.
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+# ─────────────────────────
+# INTENT INDEX
+# ─────────────────────────
+class IntentIndex:
+    """
+    Every intent example stacked into one contiguous, L2-normalized matrix.
+
+    Rows are grouped by intent: ``offsets[i]`` is the first row of
+    ``names[i]`` and ``segments[row]`` maps a row back to its intent id.
+    A query is scored with a single matmul followed by a segmented max,
+    or, when an ANN index is attached, against its probed candidates only.
+    """
+
+    def __init__(self, names, matrix, offsets):
+        self.names = list(names)
+        self.matrix = matrix
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.ann = None
+        self.nprobe = None
+
+        counts = np.diff(np.append(self.offsets, matrix.shape[0]))
+        self.segments = np.repeat(
+            np.arange(len(self.names), dtype=np.int32), counts
+        )
+
+    @classmethod
+    def from_embeddings(cls, embeddings):
+        """
+        Builds an index from ``{intent: (n_examples, dim) array}``.
+        Intents without examples can never match and are skipped.
+        """
+        names, blocks, offsets = [], [], []
+        row = 0
+
+        for intent, block in embeddings.items():
+            block = np.asarray(block, dtype=np.float32)
+            if len(block) == 0:
+                continue
+
+            names.append(intent)
+            offsets.append(row)
+            blocks.append(block)
+            row += len(block)
+
+        return cls(names, normalize_rows(np.vstack(blocks)), offsets)
+
+    @property
+    def dim(self):
+        return self.matrix.shape[1]
+
+    @property
+    def nbytes(self):
+        return self.matrix.nbytes
+
+    def __len__(self):
+        return self.matrix.shape[0]
+
+    def dense(self):
+        """
+        Float32 matrix in the scoring space (used to train ANN indexes).
+        """
+        return np.asarray(self.matrix, dtype=np.float32)
+
+    def attach_ann(self, ann, nprobe):
+        """
+        Routes ``best``/``best_batch`` through an approximate index
+        (see api/ann.py). ``intent_scores`` stays exact.
+        """
+        self.ann = ann
+        self.nprobe = nprobe
+
+    def prepare(self, queries):
+        """
+        Maps encoder output into this index's scoring space
+        (identity here; see api/precision.py for projected storage).
+        """
+        return queries
+
+    def similarities(self, queries):
+        """
+        Cosine similarity of prepared queries against every row.
+        """
+        return np.dot(queries, self.matrix.T)
+
+    def row_similarities(self, rows, query):
+        """
+        Cosine similarity of one prepared query against selected rows.
+        """
+        return np.asarray(self.matrix[rows]) @ query
+
+    def intent_scores(self, queries):
+        """
+        Best cosine similarity per intent.
+        Accepts one normalized (dim,) query or a (n, dim) batch.
+        """
+        sims = self.similarities(self.prepare(queries))
+        return np.maximum.reduceat(sims, self.offsets, axis=-1)
+
+    def best(self, query, threshold):
+        """
+        Returns ``(intent, score)``; intent is "unknown" when the best
+        score does not clear the threshold.
+        """
+        if self.ann is not None:
+            query = self.prepare(query)
+            rows = self.ann.candidates(query, self.nprobe)
+            if len(rows) == 0:
+                return "unknown", float("-inf")
+
+            sims = self.row_similarities(rows, query)
+            best = int(np.argmax(sims))
+            score = float(sims[best])
+            if score > threshold:
+                return self.names[self.segments[rows[best]]], score
+            return "unknown", score
+
+        scores = self.intent_scores(query)
+        idx = int(np.argmax(scores))
+        score = float(scores[idx])
+
+        if score > threshold:
+            return self.names[idx], score
+        return "unknown", score
+
+    def best_batch(self, queries, threshold):
+        """
+        Vectorized ``best`` over a (n, dim) batch of queries.
+        """
+        if self.ann is not None:
+            return [self.best(q, threshold) for q in queries]
+
+        scores = self.intent_scores(queries)
+        idx = np.argmax(scores, axis=1)
+        top = scores[np.arange(len(idx)), idx]
+
+        return [
+            (self.names[i] if s > threshold else "unknown", float(s))
+            for i, s in zip(idx.tolist(), top.tolist())
+        ]
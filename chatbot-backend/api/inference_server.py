@@ -0,0 +1,214 @@
+import logging
+import os
+import queue
+import socket
+import socketserver
+import struct
+import threading
+import time
+
+import numpy as np
+
+from .batching import EncodeBatcher
+from .encoders import Encoder
+
+logger = logging.getLogger(__name__)
+
+# ─────────────────────────
+# WIRE PROTOCOL
+# ─────────────────────────
+# Every frame: !I payload length, then the payload.
+#   request  payload: !H text count, then per text !I byte length + UTF-8 bytes
+#   response payload: !B status; OK -> !II rows, dim + rows*dim little-endian
+#                     float32; ERROR -> UTF-8 message
+STATUS_OK = 0
+STATUS_ERROR = 1
+
+_LEN = struct.Struct("!I")
+_COUNT = struct.Struct("!H")
+_STATUS = struct.Struct("!B")
+_SHAPE = struct.Struct("!II")
+
+MAX_FRAME = 64 * 1024 * 1024
+
+
+class ProtocolError(Exception):
+    pass
+
+
+def _recv_exact(sock, size):
+    buf = bytearray(size)
+    view = memoryview(buf)
+    while size:
+        read = sock.recv_into(view, size)
+        if not read:
+            raise ConnectionError("connection closed")
+        view = view[read:]
+        size -= read
+    return bytes(buf)
+
+
+def recv_frame(sock):
+    (length,) = _LEN.unpack(_recv_exact(sock, _LEN.size))
+    if length > MAX_FRAME:
+        raise ProtocolError(f"frame of {length} bytes exceeds {MAX_FRAME}")
+    return _recv_exact(sock, length)
+
+
+def send_frame(sock, payload):
+    sock.sendall(_LEN.pack(len(payload)) + payload)
+
+
+def encode_request(texts):
+    parts = [_COUNT.pack(len(texts))]
+    for text in texts:
+        raw = text.encode("utf-8")
+        parts.append(_LEN.pack(len(raw)))
+        parts.append(raw)
+    return b"".join(parts)
+
+
+def decode_request(payload):
+    (count,) = _COUNT.unpack_from(payload, 0)
+    offset = _COUNT.size
+    texts = []
+    for _ in range(count):
+        (length,) = _LEN.unpack_from(payload, offset)
+        offset += _LEN.size
+        texts.append(payload[offset:offset + length].decode("utf-8"))
+        offset += length
+    return texts
+
+
+def encode_response(vectors):
+    vectors = np.ascontiguousarray(vectors, dtype="<f4")
+    return _STATUS.pack(STATUS_OK) + _SHAPE.pack(*vectors.shape) + vectors.tobytes()
+
+
+def decode_response(payload):
+    (code,) = _STATUS.unpack_from(payload, 0)
+    if code != STATUS_OK:
+        raise RuntimeError(f"inference server error: {payload[_STATUS.size:].decode('utf-8')}")
+    rows, dim = _SHAPE.unpack_from(payload, _STATUS.size)
+    start = _STATUS.size + _SHAPE.size
+    return np.frombuffer(payload, dtype="<f4", count=rows * dim, offset=start).reshape(rows, dim)
+
+
+# ─────────────────────────
+# SERVER
+# ─────────────────────────
+class _Handler(socketserver.BaseRequestHandler):
+    def handle(self):
+        server = self.server
+        while True:
+            try:
+                texts = decode_request(recv_frame(self.request))
+            except (ConnectionError, OSError):
+                return
+            except (ProtocolError, struct.error, UnicodeDecodeError) as e:
+                send_frame(self.request, _STATUS.pack(STATUS_ERROR) + str(e).encode("utf-8"))
+                return
+
+            try:
+                if len(texts) == 1:
+                    # Single queries from every web worker coalesce here.
+                    vectors = server.batcher.encode(texts[0])[None, :]
+                else:
+                    vectors = server.encoder.encode(texts)
+                send_frame(self.request, encode_response(vectors))
+            except Exception as e:
+                logger.exception("⚠️ Inference request failed")
+                send_frame(self.request, _STATUS.pack(STATUS_ERROR) + str(e).encode("utf-8"))
+
+
+class InferenceServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    Long-lived process that owns the encoder. Web workers connect over a
+    Unix socket; single-text requests from all connections are coalesced
+    into batched encodes by an EncodeBatcher.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, socket_path, encoder, max_batch=16, max_wait_ms=2.0):
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        super().__init__(socket_path, _Handler)
+        os.chmod(socket_path, 0o660)
+
+        self.encoder = encoder
+        self.batcher = EncodeBatcher(encoder.encode, max_batch=max_batch, max_wait_ms=max_wait_ms)
+
+
+# ─────────────────────────
+# CLIENT
+# ─────────────────────────
+class RemoteEncoder(Encoder):
+    """
+    Encoder backed by the inference server. Keeps up to ``pool_size``
+    persistent connections per process; callers beyond that wait for a
+    free connection. Connections are never shared across a fork.
+    """
+
+    def __init__(self, socket_path, name, pool_size=4, timeout=30.0, connect_timeout=60.0):
+        self.socket_path = socket_path
+        self.name = name
+        self.pool_size = max(1, int(pool_size))
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self._reset_pool()
+
+    def _reset_pool(self):
+        self._pid = os.getpid()
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(self.pool_size)
+
+    def _connect(self):
+        deadline = time.monotonic() + self.connect_timeout
+        while True:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            try:
+                sock.connect(self.socket_path)
+                return sock
+            except OSError:
+                sock.close()
+                if time.monotonic() >= deadline:
+                    raise
+                time.sleep(0.25)  # server may still be starting
+
+    def _roundtrip(self, sock, payload):
+        send_frame(sock, payload)
+        return decode_response(recv_frame(sock))
+
+    def encode(self, texts):
+        if self._pid != os.getpid():
+            self._reset_pool()
+
+        single = isinstance(texts, str)
+        payload = encode_request([texts] if single else list(texts))
+
+        with self._slots:
+            try:
+                sock = self._idle.get_nowait()
+            except queue.Empty:
+                sock = self._connect()
+
+            try:
+                vectors = self._roundtrip(sock, payload)
+            except (ConnectionError, OSError):
+                # Stale connection (server restarted): retry once on a fresh one.
+                sock.close()
+                sock = self._connect()
+                try:
+                    vectors = self._roundtrip(sock, payload)
+                except BaseException:
+                    sock.close()
+                    raise
+            except BaseException:
+                sock.close()
+                raise
+
+            self._idle.put(sock)
+
+        return vectors[0] if single else vectors
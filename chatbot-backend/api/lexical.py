@@ -0,0 +1,257 @@
+import re
+import threading
+from collections import deque, namedtuple
+
+import numpy as np
+
+# Crisis phrases matched anywhere in a message, on top of the catalog's own
+# crisis examples (which are matched the same way). Tokens are stemmed on
+# both sides, so "hurting myself" matches "hurt myself". Safety first: a
+# false positive only shows crisis resources, a miss can cost far more.
+CRISIS_PHRASES = [
+    "suicide", "suicidal", "kill myself", "killing myself", "end my life",
+    "end it all", "take my own life", "want to die", "wanna die",
+    "don't want to live", "no reason to live", "better off dead",
+    "better off without me", "better off if i was gone", "better off if i were gone",
+    "harm myself", "hurt myself", "self harm", "self-harm", "cutting myself",
+    "overdose", "jump off", "hang myself", "not worth living",
+    "never wake up", "my partner is hitting me", "i was raped",
+    "sexual assault", "domestic violence", "taking all my pills",
+    "going to jump", "feeling unsafe at home", "can't go on", "cant go on",
+    "abusing me", "abused me", "hitting me",
+]
+
+_TOKEN_RE = re.compile(r"[a-z0-9']+")
+
+# A resolved lexical match: which tier answered and how confidently.
+LexicalMatch = namedtuple("LexicalMatch", ["intent", "score", "tier"])
+
+
+def tokenize(text):
+    """
+    Lower-cased word tokens; curly apostrophes folded to ASCII.
+    """
+    return _TOKEN_RE.findall(text.lower().replace("’", "'"))
+
+
+def stem(token):
+    """
+    Crude suffix stripping, enough to fold inflections of the same verb:
+    hurt/hurts/hurting, abuse/abused/abusing, cut/cutting -> one form.
+    """
+    for suffix in ("ing", "ed", "es", "s"):
+        if token.endswith(suffix) and len(token) - len(suffix) >= 3:
+            token = token[:-len(suffix)]
+            if len(token) > 3 and token[-1] == token[-2] and token[-1] not in "lsz":
+                token = token[:-1]  # cutting -> cutt -> cut
+            break
+    if len(token) > 3 and token.endswith("e"):
+        token = token[:-1]
+    return token
+
+
+# ─────────────────────────
+# PHRASE MATCHER (Aho-Corasick over tokens)
+# ─────────────────────────
+class PhraseMatcher:
+    """
+    Aho-Corasick automaton over word tokens: finds every phrase occurring
+    anywhere in a message in one left-to-right pass, independent of the
+    number of phrases. Tokens of phrases and messages both go through
+    ``normalize`` (e.g. ``stem``).
+    """
+
+    def __init__(self, phrases, normalize=None):
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+        self.normalize = normalize
+
+        for phrase, label in phrases:
+            self._add(tuple(self._tokens(tokenize(phrase))), label)
+        self._link()
+
+    def _tokens(self, tokens):
+        return tokens if self.normalize is None else [self.normalize(t) for t in tokens]
+
+    def _add(self, tokens, label):
+        if not tokens:
+            return
+        state = 0
+        for token in tokens:
+            nxt = self._goto[state].get(token)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][token] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append((label, " ".join(tokens)))
+
+    def _link(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and token not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(token, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def find(self, tokens):
+        """
+        Returns ``[(label, phrase), ...]`` for every match in ``tokens``.
+        """
+        found = []
+        state = 0
+        for token in self._tokens(tokens):
+            while state and token not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(token, 0)
+            found.extend(self._out[state])
+        return found
+
+
+# ─────────────────────────
+# CHAR N-GRAM TF-IDF
+# ─────────────────────────
+class NgramClassifier:
+    """
+    Character n-gram TF-IDF nearest-example classifier built from the
+    intent examples. Only near-verbatim matches clear its threshold.
+    """
+
+    def __init__(self, intents, threshold=0.8, margin=0.15):
+        from sklearn.feature_extraction.text import TfidfVectorizer
+
+        self.threshold = threshold
+        self.margin = margin
+        self.names = [name for name, data in intents.items() if data["examples"]]
+
+        examples, offsets = [], []
+        for name in self.names:
+            offsets.append(len(examples))
+            examples.extend(intents[name]["examples"])
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+
+        self.vectorizer = TfidfVectorizer(
+            analyzer="char_wb",
+            ngram_range=(3, 5),
+            lowercase=True,
+            sublinear_tf=True,
+        )
+        self.matrix = self.vectorizer.fit_transform(examples).T.tocsr()
+
+    def predict(self, text):
+        """
+        Returns ``(intent, score)`` when confident, else None.
+        """
+        query = self.vectorizer.transform([text])
+        if query.nnz == 0:
+            return None
+
+        sims = (query @ self.matrix).toarray()[0]
+        per_intent = np.maximum.reduceat(sims, self.offsets)
+        order = np.argsort(per_intent)[::-1]
+        best = per_intent[order[0]]
+        runner_up = per_intent[order[1]] if len(order) > 1 else 0.0
+
+        if best >= self.threshold and best - runner_up >= self.margin:
+            return self.names[order[0]], float(best)
+        return None
+
+
+# ─────────────────────────
+# CASCADE
+# ─────────────────────────
+class LexicalCascade:
+    """
+    First-tier matcher run before the transformer:
+    1. crisis phrases and crisis examples anywhere in the message
+    2. exact match of the whole normalized message against an example
+    3. char n-gram TF-IDF with a high confidence threshold
+    Returns None when unsure so the caller falls through to the encoder.
+    """
+
+    def __init__(self, intents, crisis_intent="crisis", tfidf_threshold=0.8, tfidf_margin=0.15):
+        self.crisis_intent = crisis_intent
+
+        crisis_examples = intents.get(crisis_intent, {}).get("examples", [])
+        self.crisis = PhraseMatcher(
+            [(phrase, crisis_intent) for phrase in [*CRISIS_PHRASES, *crisis_examples]],
+            normalize=stem,
+        )
+
+        exact = {}
+        for name, data in intents.items():
+            for ex in data["examples"]:
+                key = " ".join(tokenize(ex))
+                # Examples shared by two intents are ambiguous; leave them to the model.
+                exact[key] = name if exact.get(key, name) == name else None
+        self.exact = {k: v for k, v in exact.items() if v}
+
+        try:
+            self.ngrams = NgramClassifier(intents, tfidf_threshold, tfidf_margin)
+        except ImportError:
+            self.ngrams = None
+
+    def match_crisis(self, text, tokens=None):
+        tokens = tokenize(text) if tokens is None else tokens
+        if self.crisis.find(tokens):
+            return LexicalMatch(self.crisis_intent, 1.0, "crisis")
+        return None
+
+    def match(self, text):
+        tokens = tokenize(text)
+
+        hit = self.match_crisis(text, tokens)
+        if hit is not None:
+            return hit
+
+        intent = self.exact.get(" ".join(tokens))
+        if intent is not None:
+            return LexicalMatch(intent, 1.0, "exact")
+
+        if self.ngrams is not None:
+            predicted = self.ngrams.predict(text)
+            if predicted is not None:
+                return LexicalMatch(predicted[0], predicted[1], "tfidf")
+
+        return None
+
+
+# ─────────────────────────
+# TIER STATS
+# ─────────────────────────
+class TierStats:
+    """
+    How many queries each tier resolved and how long it took.
+    """
+
+    def __init__(self, window=2048):
+        self._lock = threading.Lock()
+        self._counts = {}
+        self._latencies = {}
+        self._window = window
+
+    def record(self, tier, seconds):
+        with self._lock:
+            self._counts[tier] = self._counts.get(tier, 0) + 1
+            self._latencies.setdefault(tier, deque(maxlen=self._window)).append(seconds * 1000)
+
+    def snapshot(self):
+        with self._lock:
+            total = sum(self._counts.values())
+            report = {}
+            for tier, count in self._counts.items():
+                latencies = np.fromiter(self._latencies[tier], dtype=np.float64)
+                report[tier] = {
+                    "count": count,
+                    "fraction": round(count / total, 4),
+                    "latency_ms_p50": round(float(np.percentile(latencies, 50)), 4),
+                    "latency_ms_p99": round(float(np.percentile(latencies, 99)), 4),
+                }
+            return report
@@ -0,0 +1,66 @@
+import json
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+
+# ─────────────────────────
+# HTTP LOAD GENERATOR (benchmarks only)
+# ─────────────────────────
+def post_json(url, payload, timeout=60):
+    request = urllib.request.Request(
+        url,
+        data=json.dumps(payload).encode("utf-8"),
+        headers={"Content-Type": "application/json"},
+        method="POST",
+    )
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return response.status, json.loads(response.read() or b"{}")
+
+
+def wait_until_ready(url, timeout=300):
+    """
+    Polls a readiness URL until it answers 200.
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=5) as response:
+                if response.status == 200:
+                    return True
+        except OSError:
+            pass
+        time.sleep(0.5)
+    return False
+
+
+def run_load(url, payloads, concurrency):
+    """
+    POSTs every payload with ``concurrency`` closed-loop clients.
+    Returns throughput and latency percentiles (ms).
+    """
+    def one(payload):
+        start = time.perf_counter()
+        try:
+            status, _ = post_json(url, payload)
+        except OSError:
+            status = None
+        return (time.perf_counter() - start) * 1000, status
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(one, payloads))
+    elapsed = time.perf_counter() - start
+
+    latencies = np.array([ms for ms, _ in results])
+    errors = sum(1 for _, status in results if status != 200)
+    return {
+        "requests": len(results),
+        "concurrency": concurrency,
+        "errors": errors,
+        "throughput_rps": round(len(results) / elapsed, 1),
+        "latency_ms_p50": round(float(np.percentile(latencies, 50)), 2),
+        "latency_ms_p99": round(float(np.percentile(latencies, 99)), 2),
+    }
@@ -0,0 +1,62 @@
+import json
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from api import engine
+from api.corpus import load_labeled
+
+
+class Command(BaseCommand):
+    help = "Fraction of traffic each cascade tier resolves, with per-tier latency and accuracy"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--corpus", help="JSONL of {text, intent}; defaults to the labeled set")
+        parser.add_argument(
+            "--lexical-only",
+            action="store_true",
+            help="Skip the transformer tier (no model load)",
+        )
+
+    def handle(self, *args, **options):
+        rows = load_labeled(options["corpus"])
+        cascade = engine.get_lexical_cascade()
+        tiers = {}
+
+        if not options["lexical_only"]:
+            engine.ensure_warm()
+            model = engine.get_model()
+            index = engine.get_intent_embeddings()
+
+        for text, label in rows:
+            start = time.perf_counter()
+            hit = cascade.match(text)
+
+            if hit is not None:
+                tier, intent = hit.tier, hit.intent
+            elif options["lexical_only"]:
+                tier, intent = "unresolved", None
+            else:
+                tier = "transformer"
+                intent, _ = index.best(engine.encode_texts(model, text), engine.SCORE_THRESHOLD)
+
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            entry = tiers.setdefault(tier, {"latencies": [], "correct": 0, "labeled": 0})
+            entry["latencies"].append(elapsed_ms)
+            if label is not None and intent is not None:
+                entry["labeled"] += 1
+                entry["correct"] += int(intent == label)
+
+        report = {"rows": len(rows), "tiers": {}}
+        for tier, entry in tiers.items():
+            latencies = np.asarray(entry["latencies"])
+            report["tiers"][tier] = {
+                "count": len(latencies),
+                "fraction": round(len(latencies) / len(rows), 4),
+                "latency_ms_p50": round(float(np.percentile(latencies, 50)), 4),
+                "latency_ms_p99": round(float(np.percentile(latencies, 99)), 4),
+                "accuracy": round(entry["correct"] / entry["labeled"], 4) if entry["labeled"] else None,
+            }
+
+        self.stdout.write(json.dumps(report, indent=2))
@@ -0,0 +1,189 @@
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api.corpus import DEFAULT_CORPUS, load_labeled
+from api.encoders import ENCODER_BACKENDS
+
+# metric -> (direction, tolerance, kind). "higher" metrics regress when they
+# drop, "lower" ones when they grow; "abs" tolerances are absolute, "rel"
+# ones a fraction of the baseline.
+REGRESSION_RULES = {
+    "accuracy": ("higher", 0.01, "abs"),
+    "crisis_recall": ("higher", 0.0, "abs"),
+    "out_of_scope_rejection": ("higher", 0.05, "abs"),
+    "cold_start_s": ("lower", 0.25, "rel"),
+    "latency_ms_p50": ("lower", 0.25, "rel"),
+    "latency_ms_p95": ("lower", 0.25, "rel"),
+    "latency_ms_p99": ("lower", 0.5, "rel"),
+    "batch_rows_per_s": ("higher", 0.2, "rel"),
+    "peak_rss_mb": ("lower", 0.1, "rel"),
+}
+
+
+def _percentiles(values):
+    values = np.asarray(values)
+    return {
+        f"latency_ms_p{p}": round(float(np.percentile(values, p)), 3)
+        for p in (50, 90, 95, 99)
+    } | {"latency_ms_max": round(float(values.max()), 3)}
+
+
+def compare(report, baseline, scale=1.0):
+    """
+    Per-metric diff against a baseline report. ``scale`` multiplies every
+    tolerance (e.g. 2.0 on noisy CI machines).
+    """
+    result = {}
+    for metric, (direction, tolerance, kind) in REGRESSION_RULES.items():
+        new, old = report.get(metric), baseline.get(metric)
+        if new is None or old is None:
+            continue
+
+        allowed = tolerance * scale * (abs(old) if kind == "rel" else 1.0)
+        delta = new - old
+        regressed = delta < -allowed if direction == "higher" else delta > allowed
+
+        result[metric] = {
+            "baseline": old,
+            "current": new,
+            "delta": round(delta, 4),
+            "regressed": bool(regressed),
+        }
+    return result
+
+
+class Command(BaseCommand):
+    help = (
+        "Accuracy, crisis recall, cold start, latency percentiles, batch throughput "
+        "and peak RSS of the chatbot as JSON, optionally compared to a baseline"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--corpus", default=str(DEFAULT_CORPUS), help="JSONL of {text, intent}")
+        parser.add_argument("--encoder", choices=ENCODER_BACKENDS, help="Defaults to CHATBOT_ENCODER")
+        parser.add_argument("--queries", type=int, default=500, help="Single-query latency samples")
+        parser.add_argument("--batch-size", type=int, default=32)
+        parser.add_argument("--output", help="Also write the report to this file (e.g. a new baseline)")
+        parser.add_argument("--baseline", help="Report to compare against; exits 1 on regression")
+        parser.add_argument("--tolerance-scale", type=float, default=1.0)
+        parser.add_argument("--probe", action="store_true", help="(internal) measure in this process")
+
+    def handle(self, *args, **options):
+        if options["probe"]:
+            return self._probe(options)
+
+        report = self._spawn_probe(options)
+
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as fh:
+                json.dump(report, fh, indent=2)
+
+        regressions = []
+        if options["baseline"]:
+            with open(options["baseline"], encoding="utf-8") as fh:
+                baseline = json.load(fh)
+            report["comparison"] = compare(report, baseline, options["tolerance_scale"])
+            regressions = [m for m, c in report["comparison"].items() if c["regressed"]]
+
+        self.stdout.write(json.dumps(report, indent=2))
+
+        if regressions:
+            raise CommandError(f"Regression against baseline: {', '.join(regressions)}")
+
+    def _spawn_probe(self, options):
+        """
+        Runs the measurement in a fresh process so cold start and peak RSS
+        are not flattered by anything this process already loaded.
+        """
+        env = {
+            **os.environ,
+            # Measure the model on every query, and never shed.
+            "CHATBOT_QUERY_CACHE_SIZE": "0",
+            "CHATBOT_ADMISSION_ENABLED": "0",
+        }
+        if options["encoder"]:
+            env["CHATBOT_ENCODER"] = options["encoder"]
+
+        result = subprocess.run(
+            [
+                sys.executable, str(settings.BASE_DIR / "manage.py"), "bench_chatbot", "--probe",
+                "--corpus", options["corpus"],
+                "--queries", str(options["queries"]),
+                "--batch-size", str(options["batch_size"]),
+            ],
+            env=env, capture_output=True, text=True,
+        )
+        if result.returncode:
+            raise CommandError(f"Benchmark process failed:\n{result.stderr[-2000:]}")
+        return json.loads(result.stdout)
+
+    def _probe(self, options):
+        start = time.perf_counter()
+
+        from api import engine
+
+        engine.get_lexical_cascade()
+        if not engine.warm_up():
+            raise CommandError(f"Warm-up failed: {engine.get_status()['error']}")
+        cold_start = time.perf_counter() - start
+
+        rows = load_labeled(options["corpus"])
+        texts = [text for text, _ in rows]
+
+        # Accuracy through the full serving cascade.
+        predicted = [intent for intent, _ in engine.classify_batch(texts)]
+        misses, per_intent = [], {}
+        for (text, label), intent in zip(rows, predicted):
+            label = label or "unknown"
+            entry = per_intent.setdefault(label, {"total": 0, "correct": 0})
+            entry["total"] += 1
+            if intent == label:
+                entry["correct"] += 1
+            else:
+                misses.append({"text": text, "expected": label, "predicted": intent})
+
+        def rate(name):
+            entry = per_intent.get(name)
+            return round(entry["correct"] / entry["total"], 4) if entry else None
+
+        # Per-query latency: the corpus cycled to --queries samples.
+        latencies = []
+        for i in range(options["queries"]):
+            t = time.perf_counter()
+            engine.classify(texts[i % len(texts)])
+            latencies.append((time.perf_counter() - t) * 1000)
+
+        # Batch throughput over whole corpus passes.
+        size = max(1, options["batch_size"])
+        t = time.perf_counter()
+        for i in range(0, len(texts), size):
+            engine.classify_batch(texts[i:i + size])
+        batch_s = time.perf_counter() - t
+
+        report = {
+            "encoder": engine.get_encoder_key(),
+            "corpus_rows": len(rows),
+            "intents": len(engine.INTENTS),
+            "threshold": engine.SCORE_THRESHOLD,
+            "accuracy": round(sum(e["correct"] for e in per_intent.values()) / len(rows), 4),
+            "crisis_recall": rate("crisis"),
+            "out_of_scope_rejection": rate("unknown"),
+            "cold_start_s": round(cold_start, 3),
+            "model_load_s": engine.get_status()["model_load_s"],
+            **_percentiles(latencies),
+            "batch_size": size,
+            "batch_rows_per_s": round(len(texts) / batch_s, 1),
+            "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+            "tiers": engine.get_stats()["tiers"],
+            "per_intent_accuracy": {name: rate(name) for name in sorted(per_intent)},
+            "misses": misses,
+        }
+        self.stdout.write(json.dumps(report))
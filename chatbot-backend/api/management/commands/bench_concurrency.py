@@ -0,0 +1,74 @@
+import json
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from api.loadgen import run_load, wait_until_ready
+
+SERVERS = {
+    # Sync DRF view behind gunicorn's threaded WSGI workers.
+    "sync": (
+        ["-m", "gunicorn", "-c", "gunicorn.conf.py", "core.wsgi:application"],
+        "/api/chat/",
+    ),
+    # Async view behind uvicorn (ASGI), inference on the bounded executor.
+    "async": (
+        ["-m", "uvicorn", "core.asgi:application", "--host", "127.0.0.1", "--port", "{port}"],
+        "/api/chat/async/",
+    ),
+}
+
+
+class Command(BaseCommand):
+    help = "p50/p99 chat latency at 1, 8 and 64 concurrent clients for the sync and async paths"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--paths", nargs="+", choices=list(SERVERS), default=list(SERVERS))
+        parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 64])
+        parser.add_argument("--requests", type=int, default=320)
+        parser.add_argument("--port", type=int, default=8766)
+
+    def handle(self, *args, **options):
+        port = options["port"]
+        report = {}
+
+        for name in options["paths"]:
+            argv, path = SERVERS[name]
+            env = {
+                **os.environ,
+                "PORT": str(port),
+                # Every request reaches the model, and none is shed: a shed
+                # fallback reply is a 200 and would pass as a fast success.
+                "CHATBOT_QUERY_CACHE_SIZE": "0",
+                "CHATBOT_LEXICAL_CASCADE": "0",
+                "CHATBOT_ADMISSION_ENABLED": "0",
+            }
+            server = subprocess.Popen(
+                [sys.executable] + [a.format(port=port) for a in argv],
+                cwd=settings.BASE_DIR,
+                env=env,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+
+            try:
+                base = f"http://127.0.0.1:{port}"
+                if not wait_until_ready(f"{base}/api/health/ready/"):
+                    self.stderr.write(f"⚠️ {name} server never became ready")
+                    continue
+
+                report[name] = {}
+                for clients in options["concurrency"]:
+                    payloads = [
+                        {"message": f"I keep worrying about work, day {clients}-{i}"}
+                        for i in range(max(options["requests"], clients * 4))
+                    ]
+                    report[name][clients] = run_load(base + path, payloads, clients)
+            finally:
+                server.terminate()
+                server.wait(timeout=30)
+
+        self.stdout.write(json.dumps(report, indent=2))
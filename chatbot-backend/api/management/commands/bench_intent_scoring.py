@@ -0,0 +1,83 @@
+import time
+
+import numpy as np
+import torch
+from django.core.management.base import BaseCommand
+from sentence_transformers import util
+
+from api.index import IntentIndex, normalize_rows
+
+
+def _legacy_best(query, embeddings, threshold):
+    """
+    The original per-intent loop: one cos_sim + max + .item() per intent.
+    """
+    best_intent = "unknown"
+    highest_score = threshold
+
+    for intent, block in embeddings.items():
+        score = torch.max(util.cos_sim(query, block)[0]).item()
+        if score > highest_score:
+            highest_score = score
+            best_intent = intent
+
+    return best_intent
+
+
+class Command(BaseCommand):
+    help = "Micro-benchmark per-query intent scoring: per-intent loop vs single matmul"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--intents", type=int, nargs="+", default=[25, 250, 2500])
+        parser.add_argument("--examples", type=int, default=30, help="Examples per intent")
+        parser.add_argument("--dim", type=int, default=384)
+        parser.add_argument("--queries", type=int, default=200)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = np.random.default_rng(options["seed"])
+        dim = options["dim"]
+
+        self.stdout.write(
+            f"{'intents':>8} {'rows':>8} {'loop ms/q':>10} {'matmul ms/q':>12} {'speedup':>8}"
+        )
+
+        for n_intents in options["intents"]:
+            blocks = {
+                f"intent_{i}": normalize_rows(
+                    rng.standard_normal((options["examples"], dim))
+                )
+                for i in range(n_intents)
+            }
+            queries = normalize_rows(rng.standard_normal((options["queries"], dim)))
+
+            index = IntentIndex.from_embeddings(blocks)
+            tensors = {k: torch.from_numpy(v) for k, v in blocks.items()}
+            query_tensors = torch.from_numpy(queries)
+
+            # Fewer loop iterations for big catalogs; it is the slow path.
+            loop_queries = max(10, options["queries"] * 25 // n_intents)
+
+            # One untimed call per path: first-call dispatch and allocation
+            # are not part of the per-query cost.
+            _legacy_best(query_tensors[0], tensors, 0.35)
+            index.best(queries[0], 0.35)
+
+            start = time.perf_counter()
+            legacy = [
+                _legacy_best(query_tensors[i], tensors, 0.35)
+                for i in range(min(loop_queries, len(queries)))
+            ]
+            loop_ms = (time.perf_counter() - start) * 1000 / len(legacy)
+
+            start = time.perf_counter()
+            fast = [index.best(q, 0.35)[0] for q in queries]
+            matmul_ms = (time.perf_counter() - start) * 1000 / len(fast)
+
+            if fast[:len(legacy)] != legacy:
+                self.stderr.write(f"⚠️ Result mismatch at {n_intents} intents")
+
+            self.stdout.write(
+                f"{n_intents:>8} {len(index):>8} {loop_ms:>10.3f} "
+                f"{matmul_ms:>12.3f} {loop_ms / matmul_ms:>7.1f}x"
+            )
@@ -0,0 +1,106 @@
+import json
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Runs in a fresh interpreter per settings module: times Django setup up to
+# a ready WSGI handler + URLconf, then the per-request framework cost of
+# POST /api/chat/ with an empty message (answered without the engine).
+PROBE = r"""
+import json, os, resource, sys, time
+from io import BytesIO
+
+start = time.perf_counter()
+from django.core.wsgi import get_wsgi_application
+application = get_wsgi_application()
+from django.urls import get_resolver
+get_resolver().url_patterns
+setup_s = time.perf_counter() - start
+
+body = b'{"message": ""}'
+statuses = []
+
+def call():
+    environ = {
+        "REQUEST_METHOD": "POST",
+        "PATH_INFO": "/api/chat/",
+        "SERVER_NAME": "localhost",
+        "SERVER_PORT": "80",
+        "SERVER_PROTOCOL": "HTTP/1.1",
+        "HTTP_HOST": "localhost",
+        "CONTENT_TYPE": "application/json",
+        "CONTENT_LENGTH": str(len(body)),
+        "wsgi.input": BytesIO(body),
+        "wsgi.errors": sys.stderr,
+        "wsgi.url_scheme": "http",
+    }
+    b"".join(application(environ, lambda status, headers: statuses.append(status)))
+
+requests = int(sys.argv[1])
+for _ in range(min(200, requests)):
+    call()
+
+latencies = []
+for _ in range(requests):
+    t = time.perf_counter()
+    call()
+    latencies.append((time.perf_counter() - t) * 1e6)
+latencies.sort()
+
+def pct(p):
+    return round(latencies[min(len(latencies) - 1, int(p / 100 * len(latencies)))], 1)
+
+print(json.dumps({
+    "setup_ms": round(setup_s * 1000, 1),
+    "modules": len(sys.modules),
+    "rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    "request_us_mean": round(sum(latencies) / len(latencies), 1),
+    "request_us_p50": pct(50),
+    "request_us_p99": pct(99),
+    "status": statuses[-1],
+}))
+"""
+
+COMPARED = ("setup_ms", "modules", "rss_mb", "request_us_mean", "request_us_p50", "request_us_p99")
+
+
+class Command(BaseCommand):
+    help = "Import/setup time and per-request framework overhead of the full vs slim settings"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--profiles", nargs="+", default=["core.settings", "core.settings_slim"],
+            help="Settings modules; the first is the baseline",
+        )
+        parser.add_argument("--requests", type=int, default=5000)
+        parser.add_argument("--runs", type=int, default=3, help="Fresh processes per profile (best kept)")
+
+    def handle(self, *args, **options):
+        report = {}
+
+        for profile in options["profiles"]:
+            runs = [self._probe(profile, options["requests"]) for _ in range(max(1, options["runs"]))]
+            report[profile] = {key: min(run[key] for run in runs) for key in COMPARED}
+            report[profile]["status"] = runs[-1]["status"]
+
+        base = report[options["profiles"][0]]
+        for profile in options["profiles"][1:]:
+            report[profile]["vs_baseline"] = {
+                key: round(report[profile][key] / base[key], 3) if base[key] else None
+                for key in COMPARED
+            }
+
+        self.stdout.write(json.dumps(report, indent=2))
+
+    def _probe(self, profile, requests):
+        env = {**os.environ, "DJANGO_SETTINGS_MODULE": profile}
+        result = subprocess.run(
+            [sys.executable, "-c", PROBE, str(requests)],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+        )
+        if result.returncode:
+            raise CommandError(f"{profile} probe failed:\n{result.stderr[-2000:]}")
+        return json.loads(result.stdout.strip().splitlines()[-1])
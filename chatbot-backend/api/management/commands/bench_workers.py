@@ -0,0 +1,96 @@
+import json
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from api.loadgen import run_load, wait_until_ready
+
+SMAPS_FIELDS = ("Rss", "Pss", "Shared_Clean", "Shared_Dirty", "Private_Clean", "Private_Dirty")
+
+
+def _children(pid):
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as fh:
+            return [int(p) for p in fh.read().split()]
+    except OSError:
+        return []
+
+
+def _smaps_mb(pid):
+    """
+    Memory of one process from /proc/<pid>/smaps_rollup, in MB.
+    PSS splits shared pages between the processes mapping them.
+    """
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as fh:
+        for line in fh:
+            key, _, rest = line.partition(":")
+            if key in SMAPS_FIELDS:
+                values[key.lower()] = round(int(rest.split()[0]) / 1024, 1)
+    return values
+
+
+class Command(BaseCommand):
+    help = "RSS/PSS per gunicorn worker and throughput scaling from 1 to N workers"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+        parser.add_argument("--threads", type=int, default=2)
+        parser.add_argument("--requests", type=int, default=400)
+        parser.add_argument("--concurrency", type=int, default=16)
+        parser.add_argument("--port", type=int, default=8765)
+
+    def handle(self, *args, **options):
+        base = f"http://127.0.0.1:{options['port']}/api"
+        # Unique messages with caches and lexical tier off: every request encodes.
+        payloads = [
+            {"message": f"I have been feeling anxious about situation number {i}"}
+            for i in range(options["requests"])
+        ]
+        report = []
+
+        for workers in options["workers"]:
+            env = {
+                **os.environ,
+                "PORT": str(options["port"]),
+                "WEB_CONCURRENCY": str(workers),
+                "GUNICORN_THREADS": str(options["threads"]),
+                # Every request reaches the model, and none is shed: a shed
+                # fallback reply is a 200 and would pass as a fast success.
+                "CHATBOT_QUERY_CACHE_SIZE": "0",
+                "CHATBOT_LEXICAL_CASCADE": "0",
+                "CHATBOT_ADMISSION_ENABLED": "0",
+            }
+            server = subprocess.Popen(
+                [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "core.wsgi:application"],
+                cwd=settings.BASE_DIR,
+                env=env,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+
+            try:
+                if not wait_until_ready(f"{base}/health/ready/"):
+                    self.stderr.write(f"⚠️ {workers} worker(s) never became ready")
+                    continue
+
+                load = run_load(f"{base}/chat/", payloads, options["concurrency"])
+                worker_mem = [_smaps_mb(pid) for pid in _children(server.pid)]
+
+                report.append({
+                    "workers": workers,
+                    **load,
+                    "master_mb": _smaps_mb(server.pid),
+                    "worker_mb": worker_mem,
+                    "total_pss_mb": round(
+                        _smaps_mb(server.pid).get("pss", 0) + sum(m.get("pss", 0) for m in worker_mem), 1
+                    ),
+                })
+            finally:
+                server.terminate()
+                server.wait(timeout=30)
+
+        self.stdout.write(json.dumps(report, indent=2))
@@ -0,0 +1,53 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api import engine
+from api.retrieval import DEFAULT_FAQ_SOURCES, embedding_text, load_passages, write_passage_index
+
+
+class Command(BaseCommand):
+    help = "Chunk and embed the FAQ/policy documents into a memory-mapped passage index"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--source", default=str(DEFAULT_FAQ_SOURCES),
+            help="Markdown file or directory of *.md documents",
+        )
+        parser.add_argument("--output", default=settings.CHATBOT_FAQ_DIR)
+        parser.add_argument("--max-chars", type=int, default=600, help="Passage length cap")
+        parser.add_argument("--dtype", choices=["float32", "float16"], default="float16")
+        parser.add_argument("--batch-size", type=int, default=256)
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+
+        passages = load_passages(options["source"], options["max_chars"])
+        if not passages:
+            raise CommandError(f"No passages found in {options['source']}")
+
+        model = engine.get_model()
+        texts = [embedding_text(p) for p in passages]
+        batch = max(1, options["batch_size"])
+        embeddings = [
+            row
+            for i in range(0, len(texts), batch)
+            for row in engine.encode_texts(model, texts[i:i + batch])
+        ]
+
+        meta = write_passage_index(
+            options["output"],
+            passages,
+            embeddings,
+            engine.get_encoder_key(),
+            dtype=options["dtype"],
+            ann_min_rows=getattr(settings, "CHATBOT_ANN_MIN_ROWS", 5000),
+            nlist=getattr(settings, "CHATBOT_ANN_NLIST", 0) or None,
+        )
+        elapsed = time.perf_counter() - start
+
+        self.stdout.write(
+            f"✅ FAQ index written to {options['output']}: {meta['count']} passages x "
+            f"{meta['dim']} dims{' + IVF' if meta['ann'] else ''} ({elapsed:.2f}s)"
+        )
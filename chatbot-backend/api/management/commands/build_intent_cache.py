@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from api import engine
+
+
+class Command(BaseCommand):
+    help = "Prebuild the on-disk intent embedding cache (run at image build time)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Re-encode even if a matching cache file exists",
+        )
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        # Loading the model also writes the memory-mapped weights file.
+        model = engine.get_model()
+        index = engine.load_or_build_intent_index(model=model, rebuild=options["force"])
+        elapsed = time.perf_counter() - start
+
+        self.stdout.write(
+            f"✅ Intent cache ready: {len(index)} examples x {index.dim} dims, "
+            f"{len(index.names)} intents ({elapsed:.2f}s)"
+        )
@@ -0,0 +1,61 @@
+import os
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from api import engine
+from api.encoders import ONNX_MODEL_FILE
+
+
+class Command(BaseCommand):
+    help = "Export the chatbot transformer to ONNX and quantize it to int8"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--output", default=settings.CHATBOT_ONNX_MODEL_DIR)
+        parser.add_argument("--opset", type=int, default=14)
+        parser.add_argument(
+            "--keep-fp32",
+            action="store_true",
+            help="Keep the unquantized export next to the int8 model",
+        )
+
+    def handle(self, *args, **options):
+        import torch
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        from sentence_transformers import SentenceTransformer
+
+        out = Path(options["output"])
+        out.mkdir(parents=True, exist_ok=True)
+
+        st = SentenceTransformer(engine.MODEL_NAME, cache_folder=os.environ.get("HF_HOME"))
+        transformer = st[0].auto_model.eval()
+        tokenizer = st.tokenizer
+
+        sample = tokenizer(["hello world"], return_tensors="pt")
+        input_names = ["input_ids", "attention_mask", "token_type_ids"]
+        dynamic = {name: {0: "batch", 1: "sequence"} for name in input_names}
+        dynamic["last_hidden_state"] = {0: "batch", 1: "sequence"}
+
+        fp32_path = out / "model.fp32.onnx"
+        with torch.no_grad():
+            torch.onnx.export(
+                transformer,
+                tuple(sample[name] for name in input_names),
+                str(fp32_path),
+                input_names=input_names,
+                output_names=["last_hidden_state", "pooler_output"],
+                dynamic_axes=dynamic,
+                opset_version=options["opset"],
+                do_constant_folding=True,
+            )
+
+        int8_path = out / ONNX_MODEL_FILE
+        quantize_dynamic(str(fp32_path), str(int8_path), weight_type=QuantType.QInt8)
+        tokenizer.save_pretrained(str(out))
+
+        if not options["keep_fp32"]:
+            fp32_path.unlink()
+
+        size_mb = int8_path.stat().st_size / 1e6
+        self.stdout.write(f"✅ int8 ONNX encoder written to {out} ({size_mb:.1f} MB)")
@@ -0,0 +1,96 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from api import engine
+from api.encoders import STATIC_META_FILE, STATIC_TABLE_FILE, STATIC_TOKENIZER_FILE
+from api.precision import fit_projection
+
+
+def distill_token_table(transformer, tokenizer, batch_size=512):
+    """
+    (vocab, dim) table: every vocabulary token run through the transformer
+    on its own as [CLS] token [SEP], mean-pooled over the three positions.
+    """
+    import torch
+
+    vocab_size = len(tokenizer)
+    cls_id, sep_id = tokenizer.cls_token_id, tokenizer.sep_token_id
+    dim = transformer.config.hidden_size
+    table = np.zeros((vocab_size, dim), dtype=np.float32)
+
+    with torch.no_grad():
+        for start in range(0, vocab_size, batch_size):
+            ids = torch.arange(start, min(start + batch_size, vocab_size))
+            input_ids = torch.stack(
+                [torch.full_like(ids, cls_id), ids, torch.full_like(ids, sep_id)], dim=1
+            )
+            hidden = transformer(
+                input_ids=input_ids,
+                attention_mask=torch.ones_like(input_ids),
+            ).last_hidden_state
+            table[start:start + len(ids)] = hidden.mean(dim=1).numpy()
+
+    return table
+
+
+class Command(BaseCommand):
+    help = "Distill MODEL_NAME into a static per-token embedding table (CHATBOT_ENCODER=static)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--output", default=settings.CHATBOT_STATIC_MODEL_DIR)
+        parser.add_argument("--dim", type=int, default=256, help="PCA dims (0 keeps the model's)")
+        parser.add_argument("--dtype", choices=["float32", "float16"], default="float16")
+        parser.add_argument(
+            "--no-zipf",
+            action="store_true",
+            help="Skip the log-rank token weighting (frequent tokens count less)",
+        )
+        parser.add_argument("--batch-size", type=int, default=512)
+
+    def handle(self, *args, **options):
+        from sentence_transformers import SentenceTransformer
+
+        out = Path(options["output"])
+        out.mkdir(parents=True, exist_ok=True)
+
+        st = SentenceTransformer(engine.MODEL_NAME, cache_folder=os.environ.get("HF_HOME"))
+        transformer = st[0].auto_model.eval()
+        tokenizer = st.tokenizer
+
+        table = distill_token_table(transformer, tokenizer, options["batch_size"])
+
+        if options["dim"] and options["dim"] < table.shape[1]:
+            table = table @ fit_projection(table, options["dim"])
+
+        if not options["no_zipf"]:
+            # WordPiece ids are roughly frequency-ranked: weight by log rank.
+            table *= np.log1p(np.arange(len(table), dtype=np.float32))[:, None]
+
+        for token_id in tokenizer.all_special_ids:
+            table[token_id] = 0.0
+
+        table = np.ascontiguousarray(table, dtype=options["dtype"])
+        np.save(out / STATIC_TABLE_FILE, table)
+        tokenizer.backend_tokenizer.save(str(out / STATIC_TOKENIZER_FILE))
+
+        meta = {
+            "model": engine.MODEL_NAME,
+            "vocab": int(table.shape[0]),
+            "dim": int(table.shape[1]),
+            "dtype": options["dtype"],
+            "zipf": not options["no_zipf"],
+            "digest": hashlib.sha256(table.tobytes()).hexdigest(),
+        }
+        with open(out / STATIC_META_FILE, "w", encoding="utf-8") as fh:
+            json.dump(meta, fh, indent=2)
+
+        size_mb = table.nbytes / 1e6
+        self.stdout.write(
+            f"✅ Static encoder written to {out}: {meta['vocab']} tokens x {meta['dim']} dims ({size_mb:.1f} MB)"
+        )
@@ -0,0 +1,251 @@
+import csv
+import io
+import json
+import os
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from multiprocessing import get_context
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api import engine
+
+OUTPUT_FIELDS = ("intent", "score", "tier")
+
+
+def classify_texts(texts):
+    """
+    ``[(intent, score, tier), ...]`` against the current INTENTS: lexical
+    tier first, the rest in one batched encode + matmul. Offline, so no
+    admission control or query cache. Empty texts get (None, None, None).
+    """
+    results = [None] * len(texts)
+    pending = []
+    for i, text in enumerate(texts):
+        if not text:
+            results[i] = (None, None, None)
+            continue
+        hit = engine.match_lexical(text)
+        if hit is None:
+            pending.append(i)
+        else:
+            results[i] = (hit.intent, round(float(hit.score), 4), hit.tier)
+
+    if pending:
+        embeddings = engine.encode_texts(engine.get_model(), [texts[i] for i in pending])
+        scored = engine.get_intent_embeddings().best_batch(embeddings, engine.SCORE_THRESHOLD)
+        for i, (intent, score) in zip(pending, scored):
+            results[i] = (intent, round(score, 4), "transformer")
+
+    return results
+
+
+def _init_worker(workers):
+    # One model per process; split the cores between them.
+    os.environ["WEB_CONCURRENCY"] = str(workers)
+    import django
+
+    django.setup()
+    engine.configure_torch_threads()
+    engine.ensure_warm()
+
+
+# ─────────────────────────
+# INPUT / OUTPUT
+# ─────────────────────────
+def _detect_format(path, fmt):
+    if fmt != "auto":
+        return fmt
+    return "csv" if Path(path).suffix.lower() in (".csv", ".tsv") else "jsonl"
+
+
+def _read_rows(path, fmt, text_field):
+    """
+    Yields ``(row, text)``: the input record (dict) and its message.
+    """
+    with open(path, encoding="utf-8", newline="") as fh:
+        if fmt == "csv":
+            delimiter = "\t" if Path(path).suffix.lower() == ".tsv" else ","
+            reader = csv.DictReader(fh, delimiter=delimiter)
+            if text_field not in (reader.fieldnames or []):
+                raise CommandError(f"No {text_field!r} column in {path} (columns: {reader.fieldnames})")
+            for row in reader:
+                yield row, (row.get(text_field) or "").strip()
+        else:
+            for line in fh:
+                if not line.strip():
+                    continue
+                row = json.loads(line)
+                if isinstance(row, str):
+                    row = {text_field: row}
+                yield row, str(row.get(text_field) or "").strip()
+
+
+def _csv_fieldnames(path):
+    with open(path, encoding="utf-8", newline="") as fh:
+        delimiter = "\t" if Path(path).suffix.lower() == ".tsv" else ","
+        fields = next(csv.reader(fh, delimiter=delimiter), [])
+    return fields + [f for f in OUTPUT_FIELDS if f not in fields], delimiter
+
+
+class Command(BaseCommand):
+    help = (
+        "Label a JSONL/CSV utterance file against the current INTENTS in fixed-size "
+        "batches, optionally across processes, with resumable checkpoints"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("input")
+        parser.add_argument("output", help="Input rows + intent, score, tier (same format as the input)")
+        parser.add_argument("--format", choices=["auto", "jsonl", "csv"], default="auto")
+        parser.add_argument("--text-field", default="text")
+        parser.add_argument("--batch-size", type=int, default=256)
+        parser.add_argument(
+            "--workers", type=int, default=0,
+            help="Worker processes, each loading its own model (0 = this process)",
+        )
+        parser.add_argument(
+            "--checkpoint-every", type=int, default=10_000,
+            help="Rows between checkpoints (output flushed + progress saved)",
+        )
+        parser.add_argument("--resume", action="store_true", help="Continue from OUTPUT.checkpoint")
+        parser.add_argument("--report-every", type=float, default=10.0, help="Seconds between progress lines")
+
+    def handle(self, *args, **options):
+        source, output = Path(options["input"]), Path(options["output"])
+        if not source.is_file():
+            raise CommandError(f"{source} not found")
+
+        fmt = _detect_format(source, options["format"])
+        checkpoint_path = output.with_name(output.name + ".checkpoint")
+        fingerprint = {"input": str(source.resolve()), "size": source.stat().st_size, "format": fmt}
+
+        done, offset = 0, 0
+        if options["resume"] and checkpoint_path.exists():
+            with open(checkpoint_path, encoding="utf-8") as fh:
+                checkpoint = json.load(fh)
+            if checkpoint["source"] != fingerprint:
+                raise CommandError(f"{checkpoint_path} is for a different input: {checkpoint['source']}")
+            done, offset = checkpoint["rows"], checkpoint["bytes"]
+            self.stdout.write(f"↩️ Resuming after {done} rows")
+
+        out = open(output, "r+b" if offset else "wb")
+        out.truncate(offset)  # drop anything written after the checkpoint
+        out.seek(offset)
+
+        writer = self._writer(out, fmt, source, header=not offset)
+        rows = islice(_read_rows(source, fmt, options["text_field"]), done, None)
+
+        self.started = self.last_report = time.perf_counter()
+        self.counts = Counter()
+        self.processed = 0
+        since_checkpoint = 0
+        committed = out.tell()
+
+        def save_checkpoint():
+            out.flush()
+            os.fsync(out.fileno())
+            tmp = checkpoint_path.with_name(checkpoint_path.name + ".tmp")
+            with open(tmp, "w", encoding="utf-8") as fh:
+                json.dump({"source": fingerprint, "rows": done, "bytes": committed}, fh)
+            os.replace(tmp, checkpoint_path)
+
+        try:
+            for batch, labels in self._classified(rows, options):
+                for (row, _), label in zip(batch, labels):
+                    writer(row, label)
+                    self.counts[label[0]] += 1
+                done += len(batch)
+                committed = out.tell()
+                self.processed += len(batch)
+                since_checkpoint += len(batch)
+
+                if since_checkpoint >= options["checkpoint_every"]:
+                    save_checkpoint()
+                    since_checkpoint = 0
+                self._report(done, options["report_every"])
+        finally:
+            save_checkpoint()
+            out.close()
+
+        elapsed = time.perf_counter() - self.started
+        checkpoint_path.unlink()
+        self.stdout.write(json.dumps({
+            "rows": done,
+            "processed": self.processed,
+            "seconds": round(elapsed, 2),
+            "rows_per_s": round(self.processed / elapsed, 1) if elapsed else None,
+            "intents": dict(self.counts.most_common()),
+        }, indent=2))
+
+    def _batches(self, rows, size):
+        rows = iter(rows)
+        while True:
+            batch = list(islice(rows, max(1, size)))
+            if not batch:
+                return
+            yield batch
+
+    def _classified(self, rows, options):
+        """
+        Yields ``(batch, labels)`` in input order; with workers, keeps up
+        to two batches per process in flight.
+        """
+        batches = self._batches(rows, options["batch_size"])
+
+        if options["workers"] <= 0:
+            engine.ensure_warm()
+            for batch in batches:
+                yield batch, classify_texts([text for _, text in batch])
+            return
+
+        with ProcessPoolExecutor(
+            max_workers=options["workers"],
+            mp_context=get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(options["workers"],),
+        ) as pool:
+            in_flight = deque()
+            for batch in batches:
+                in_flight.append((batch, pool.submit(classify_texts, [text for _, text in batch])))
+                if len(in_flight) >= 2 * options["workers"]:
+                    batch, future = in_flight.popleft()
+                    yield batch, future.result()
+            while in_flight:
+                batch, future = in_flight.popleft()
+                yield batch, future.result()
+
+    def _writer(self, out, fmt, source, header):
+        if fmt == "csv":
+            fieldnames, delimiter = _csv_fieldnames(source)
+            buffer = io.StringIO()
+            csv_writer = csv.DictWriter(buffer, fieldnames=fieldnames, delimiter=delimiter, extrasaction="ignore")
+
+            def write(row, label):
+                csv_writer.writerow({**row, **dict(zip(OUTPUT_FIELDS, label))})
+                out.write(buffer.getvalue().encode("utf-8"))
+                buffer.seek(0)
+                buffer.truncate()
+
+            if header:
+                csv_writer.writeheader()
+                out.write(buffer.getvalue().encode("utf-8"))
+                buffer.seek(0)
+                buffer.truncate()
+        else:
+            def write(row, label):
+                line = json.dumps({**row, **dict(zip(OUTPUT_FIELDS, label))}, ensure_ascii=False)
+                out.write(line.encode("utf-8") + b"\n")
+
+        return write
+
+    def _report(self, done, every):
+        now = time.perf_counter()
+        if now - self.last_report < every:
+            return
+        self.last_report = now
+        rate = self.processed / max(now - self.started, 1e-9)
+        self.stderr.write(f"… {done} rows ({rate:.0f} rows/s)")
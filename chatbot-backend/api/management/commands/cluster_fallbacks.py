@@ -0,0 +1,214 @@
+import json
+import tempfile
+import time
+from itertools import islice
+from pathlib import Path
+
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api import engine
+from api.ann import MiniBatchSphericalKMeans, assign_clusters, spherical_kmeans
+from api.transcripts import read_transcripts
+
+
+class Command(BaseCommand):
+    help = (
+        "Cluster logged fallback messages (CHATBOT_TRANSCRIPTS_*) into candidate "
+        "intents, largest first, with representative messages and the nearest intent"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--transcripts", default=settings.CHATBOT_TRANSCRIPTS_DIR)
+        parser.add_argument(
+            "--intents", nargs="+", default=["fallback"],
+            help="Reply intents to cluster (e.g. fallback faq)",
+        )
+        parser.add_argument("--clusters", type=int, default=0, help="k (0 = ~sqrt(rows / 2), at most 200)")
+        parser.add_argument("--batch-size", type=int, default=512, help="Rows per encode / k-means step")
+        parser.add_argument("--epochs", type=int, default=3, help="Mini-batch passes over the spilled vectors")
+        parser.add_argument("--examples", type=int, default=5, help="Representative messages per cluster")
+        parser.add_argument("--min-size", type=int, default=2)
+        parser.add_argument(
+            "--dedupe", type=int, default=100_000,
+            help="Distinct texts remembered to skip re-encoding repeats (bounds memory)",
+        )
+        parser.add_argument("--limit", type=int, default=0, help="Only the first N matching rows")
+        parser.add_argument("--work-dir", default=None, help="Where to spill embeddings (default: temp dir)")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--output", default=None, help="Write the JSON report here instead of stdout")
+
+    def _snapshot(self, options, path):
+        """
+        Copies the matching messages to ``path`` in one pass over the
+        segments, so the later passes see a fixed set of rows even while
+        workers keep appending to (and pruning) the log. Returns the count.
+        """
+        entries = read_transcripts(options["transcripts"], set(options["intents"]))
+        if options["limit"]:
+            entries = islice(entries, options["limit"])
+
+        n = 0
+        with open(path, "w", encoding="utf-8") as fh:
+            for entry in entries:
+                fh.write(json.dumps(entry.get("text") or "", ensure_ascii=False) + "\n")
+                n += 1
+        return n
+
+    def _rows(self, path, n):
+        with open(path, encoding="utf-8") as fh:
+            for line in islice(fh, n):
+                yield json.loads(line)
+
+    def handle(self, *args, **options):
+        if not Path(options["transcripts"]).is_dir():
+            raise CommandError(f"No transcripts in {options['transcripts']} (CHATBOT_TRANSCRIPTS_ENABLED)")
+
+        start = time.perf_counter()
+        with tempfile.TemporaryDirectory(dir=options["work_dir"]) as work:
+            texts_path = Path(work) / "texts.jsonl"
+            n = self._snapshot(options, texts_path)
+            if n == 0:
+                raise CommandError(f"No {'/'.join(options['intents'])} messages logged yet")
+
+            vectors, encoded = self._embed(options, self._rows(texts_path, n), n, Path(work) / "vectors.npy")
+            embed_s = time.perf_counter() - start
+
+            k = options["clusters"] or min(200, max(2, int(np.sqrt(n / 2))))
+            assign, sims, centroids = self._cluster(vectors, k, options)
+            del vectors
+
+            report = self._report(options, self._rows(texts_path, n), assign, sims, centroids)
+
+        report.update({
+            "rows": n,
+            "encoded": encoded,
+            "clusters_k": int(len(centroids)),
+            "embed_s": round(embed_s, 2),
+            "total_s": round(time.perf_counter() - start, 2),
+        })
+
+        text = json.dumps(report, indent=2, ensure_ascii=False)
+        if options["output"]:
+            Path(options["output"]).write_text(text, encoding="utf-8")
+            self.stdout.write(
+                f"✅ {len(report['clusters'])} clusters from {n} messages written to {options['output']}"
+            )
+        else:
+            self.stdout.write(text)
+
+    def _embed(self, options, rows_iter, n, path):
+        """
+        Encodes every row in batches into an on-disk float16 (n, dim)
+        memmap. Repeats of a remembered text copy its row instead.
+        """
+        model = engine.get_model()
+        batch_size = max(1, options["batch_size"])
+        seen = {}  # text -> first row, at most --dedupe entries
+        vectors = None
+        encoded = 0
+
+        pending, rows, copies = [], [], []
+
+        def flush():
+            nonlocal vectors, encoded
+            if pending:
+                block = np.asarray(engine.encode_texts(model, pending), dtype=np.float32)
+                if vectors is None:
+                    vectors = np.lib.format.open_memmap(
+                        path, mode="w+", dtype=np.float16, shape=(n, block.shape[1])
+                    )
+                vectors[rows] = block
+                encoded += len(pending)
+            for row, source in copies:
+                vectors[row] = vectors[source]
+            pending.clear(), rows.clear(), copies.clear()
+
+        for row, text in enumerate(rows_iter):
+            source = seen.get(text)
+            if source is not None:
+                copies.append((row, source))
+                continue
+            if len(seen) < options["dedupe"]:
+                seen[text] = row
+            pending.append(text)
+            rows.append(row)
+            if len(pending) >= batch_size:
+                flush()
+        flush()
+
+        vectors.flush()
+        return vectors, encoded
+
+    def _cluster(self, vectors, k, options):
+        """
+        Seeds centroids with k-means on a sample, refines them with
+        mini-batch passes over the memmap, then assigns every row.
+        """
+        rng = np.random.default_rng(options["seed"])
+        batch_size = max(1, options["batch_size"])
+
+        sample = np.sort(rng.choice(len(vectors), min(len(vectors), 50_000), replace=False))
+        sample = np.asarray(vectors[sample], dtype=np.float32)
+        kmeans = MiniBatchSphericalKMeans(spherical_kmeans(sample, k, seed=options["seed"]))
+        starts = np.arange(0, len(vectors), batch_size)
+        for _ in range(max(0, options["epochs"])):
+            for start in rng.permutation(starts):
+                kmeans.partial_fit(vectors[start:start + batch_size])
+
+        centroids = kmeans.centroids
+        assign = assign_clusters(vectors, centroids)
+        sims = np.empty(len(vectors), dtype=np.float32)
+        for start in range(0, len(vectors), 8192):
+            block = np.asarray(vectors[start:start + 8192], dtype=np.float32)
+            sims[start:start + len(block)] = np.einsum(
+                "ij,ij->i", block, centroids[assign[start:start + len(block)]]
+            )
+        return assign, sims, centroids
+
+    def _report(self, options, rows_iter, assign, sims, centroids):
+        sizes = np.bincount(assign, minlength=len(centroids))
+        ranked = [c for c in np.argsort(-sizes, kind="stable") if sizes[c] >= options["min_size"]]
+
+        # Rows closest to their centroid first, per cluster. Repeated texts
+        # share a vector (and so a similarity): keep one row per value.
+        order = np.lexsort((-sims, assign))
+        cluster_starts = np.searchsorted(assign[order], np.arange(len(centroids)))
+        candidates = {}
+        for c in ranked:
+            members = order[cluster_starts[c]:cluster_starts[c] + sizes[c]]
+            _, first = np.unique(-sims[members], return_index=True)
+            candidates[c] = members[np.sort(first)[:2 * options["examples"]]]
+        wanted = {int(row) for rows in candidates.values() for row in rows}
+
+        texts = {}
+        for row, text in enumerate(rows_iter):
+            if row in wanted:
+                texts[row] = text
+
+        index = engine.get_intent_embeddings()
+        nearest = index.best_batch(centroids[ranked], float("-inf")) if ranked else []
+
+        clusters = []
+        for rank, (c, (intent, score)) in enumerate(zip(ranked, nearest), 1):
+            members = order[cluster_starts[c]:cluster_starts[c] + sizes[c]]
+            examples = []
+            for row in candidates[c]:
+                text = texts[int(row)]
+                if text not in examples:
+                    examples.append(text)
+                if len(examples) == options["examples"]:
+                    break
+
+            clusters.append({
+                "rank": rank,
+                "size": int(sizes[c]),
+                "share": round(float(sizes[c]) / len(assign), 4),
+                "cohesion": round(float(sims[members].mean()), 4),
+                "examples": examples,
+                "nearest_intent": intent,
+                "nearest_score": round(score, 4),
+            })
+
+        return {"clusters": clusters}
@@ -0,0 +1,171 @@
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+from importlib import metadata
+
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from api.encoders import ENCODER_BACKENDS, create_encoder
+
+# Installed packages each backend needs at serving time (image-size proxy).
+BACKEND_PACKAGES = {
+    "sentence-transformers": [
+        "torch", "transformers", "sentence-transformers", "tokenizers",
+        "safetensors", "huggingface-hub",
+    ],
+    "onnx": ["onnxruntime", "tokenizers"],
+    "static": ["tokenizers"],
+}
+
+
+def _package_mb(names):
+    total = 0
+    for name in names:
+        try:
+            files = metadata.distribution(name).files or []
+        except metadata.PackageNotFoundError:
+            continue
+        for f in files:
+            path = f.locate()
+            if os.path.isfile(path):
+                total += os.path.getsize(path)
+    return round(total / 1e6, 1)
+
+
+def _rss_mb():
+    with open("/proc/self/statm") as fh:
+        pages = int(fh.read().split()[1])
+    return round(pages * os.sysconf("SC_PAGE_SIZE") / 1e6, 1)
+
+
+def _leave_one_out(vectors, offsets):
+    """
+    Classifies every example against all *other* examples.
+    Returns (predicted intent ids, true intent ids).
+    """
+    counts = np.diff(np.append(offsets, len(vectors)))
+    labels = np.repeat(np.arange(len(offsets)), counts)
+
+    sims = vectors @ vectors.T
+    np.fill_diagonal(sims, -np.inf)
+    per_intent = np.maximum.reduceat(sims, offsets, axis=1)
+    return per_intent.argmax(axis=1), labels
+
+
+class Command(BaseCommand):
+    help = "Accuracy parity, latency, RSS and footprint of the encoder backends"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--backends", nargs="+",
+            default=[b for b in ENCODER_BACKENDS if b != "remote"],
+            help="The first backend is the reference for the 'relative' figures",
+        )
+        parser.add_argument("--queries", type=int, default=200)
+        parser.add_argument("--probe", help="(internal) measure one backend in this process")
+
+    def handle(self, *args, **options):
+        if options["probe"]:
+            return self._probe(options["queries"])
+
+        from api.engine import INTENTS, MODEL_NAME
+
+        examples = [ex for data in INTENTS.values() for ex in data["examples"]]
+        counts = [len(data["examples"]) for data in INTENTS.values()]
+        offsets = np.cumsum([0] + counts[:-1])
+
+        report = {"examples": len(examples), "backends": {}}
+        vectors = {}
+
+        for backend in options["backends"]:
+            encoder = create_encoder(
+                backend,
+                MODEL_NAME,
+                cache_folder=os.environ.get("HF_HOME"),
+                onnx_dir=settings.CHATBOT_ONNX_MODEL_DIR,
+                static_dir=settings.CHATBOT_STATIC_MODEL_DIR,
+            )
+            vectors[backend] = encoder.encode(examples)
+            predicted, labels = _leave_one_out(vectors[backend], offsets)
+
+            report["backends"][backend] = {
+                "loo_accuracy": round(float((predicted == labels).mean()), 4),
+                "dependency_mb": _package_mb(BACKEND_PACKAGES.get(backend, [])),
+                **self._spawn_probe(backend, options["queries"]),
+            }
+            vectors[backend + ":pred"] = predicted
+
+        reference = report["backends"][options["backends"][0]]
+        for backend in options["backends"][1:]:
+            entry = report["backends"][backend]
+            entry["relative"] = {
+                "loo_accuracy_delta": round(entry["loo_accuracy"] - reference["loo_accuracy"], 4),
+                "latency_p50_speedup": round(reference["latency_ms_p50"] / entry["latency_ms_p50"], 2),
+                "batch_speedup": round(entry["batch_per_s"] / reference["batch_per_s"], 2),
+                "cold_start_ratio": round(entry["cold_start_s"] / reference["cold_start_s"], 3),
+            }
+
+        if len(options["backends"]) >= 2:
+            base, other = options["backends"][:2]
+            cosine = (vectors[base] * vectors[other]).sum(axis=1)
+            report["parity"] = {
+                "pair": [base, other],
+                "mean_cosine": round(float(cosine.mean()), 4),
+                "min_cosine": round(float(cosine.min()), 4),
+                "loo_agreement": round(float(
+                    (vectors[base + ":pred"] == vectors[other + ":pred"]).mean()
+                ), 4),
+            }
+
+        self.stdout.write(json.dumps(report, indent=2))
+
+    def _spawn_probe(self, backend, queries):
+        """
+        Measures cold start and RSS in a fresh process so backends do not
+        share each other's allocations.
+        """
+        env = {**os.environ, "CHATBOT_ENCODER": backend}
+        result = subprocess.run(
+            [
+                sys.executable, str(settings.BASE_DIR / "manage.py"),
+                "compare_encoders", "--probe", backend, "--queries", str(queries),
+            ],
+            env=env, capture_output=True, text=True, check=True,
+        )
+        return json.loads(result.stdout.strip().splitlines()[-1])
+
+    def _probe(self, queries):
+        rss_before = _rss_mb()
+        start = time.perf_counter()
+
+        from api import engine
+
+        model = engine.get_model()
+        engine.get_intent_embeddings()
+        cold_start = time.perf_counter() - start
+
+        texts = [ex for data in engine.INTENTS.values() for ex in data["examples"]][:queries]
+        latencies = []
+        for text in texts:
+            t = time.perf_counter()
+            model.encode(text)
+            latencies.append((time.perf_counter() - t) * 1000)
+
+        t = time.perf_counter()
+        model.encode(texts)
+        batch_s = time.perf_counter() - t
+
+        self.stdout.write(json.dumps({
+            "cold_start_s": round(cold_start, 3),
+            "rss_baseline_mb": rss_before,
+            "rss_mb": _rss_mb(),
+            "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+            "latency_ms_p50": round(float(np.percentile(latencies, 50)), 3),
+            "latency_ms_p95": round(float(np.percentile(latencies, 95)), 3),
+            "batch_per_s": round(len(texts) / batch_s, 1),
+        }))
@@ -0,0 +1,94 @@
+import json
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from api.ann import IVFIndex
+from api.index import IntentIndex, normalize_rows
+
+
+def _synthetic_catalog(rows, dim, examples_per_intent, rng):
+    """
+    Clustered unit vectors: one centre per intent, examples scattered around it.
+    """
+    n_intents = max(1, rows // examples_per_intent)
+    centres = normalize_rows(rng.standard_normal((n_intents, dim)))
+    blocks = {
+        f"intent_{i}": normalize_rows(
+            centres[i] + 0.05 * rng.standard_normal((examples_per_intent, dim))
+        )
+        for i in range(n_intents)
+    }
+    return IntentIndex.from_embeddings(blocks)
+
+
+class Command(BaseCommand):
+    help = "Recall@1 and latency of the IVF index against exact search"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--synthetic",
+            type=int,
+            default=0,
+            help="Rows in a synthetic catalog (0 = use the real intent matrix + corpus)",
+        )
+        parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+        parser.add_argument("--nlist", type=int, default=0)
+        parser.add_argument("--queries", type=int, default=500)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = np.random.default_rng(options["seed"])
+
+        if options["synthetic"]:
+            index = _synthetic_catalog(options["synthetic"], 384, 30, rng)
+            picks = rng.choice(len(index), options["queries"])
+            queries = normalize_rows(
+                index.matrix[picks] + 0.04 * rng.standard_normal((len(picks), index.dim))
+            )
+        else:
+            from api import engine
+            from api.corpus import load_labeled
+
+            engine.ensure_warm()
+            index = engine.get_intent_embeddings()
+            texts = [text for text, _ in load_labeled()][:options["queries"]]
+            queries = engine.encode_texts(engine.get_model(), texts)
+
+        matrix = np.asarray(index.matrix)
+
+        start = time.perf_counter()
+        exact_rows = [int(np.argmax(matrix @ q)) for q in queries]
+        exact_ms = (time.perf_counter() - start) * 1000 / len(queries)
+
+        start = time.perf_counter()
+        ann = IVFIndex.build(matrix, nlist=options["nlist"] or None, seed=options["seed"])
+        build_s = time.perf_counter() - start
+
+        report = {
+            "rows": len(index),
+            "nlist": ann.nlist,
+            "build_s": round(build_s, 3),
+            "exact_ms_per_query": round(exact_ms, 4),
+            "nprobe": {},
+        }
+
+        for nprobe in options["nprobe"]:
+            start = time.perf_counter()
+            found = [ann.search(matrix, q, nprobe)[0] for q in queries]
+            ann_ms = (time.perf_counter() - start) * 1000 / len(queries)
+
+            row_recall = np.mean([a == e for a, e in zip(found, exact_rows)])
+            intent_recall = np.mean([
+                a >= 0 and index.segments[a] == index.segments[e]
+                for a, e in zip(found, exact_rows)
+            ])
+            report["nprobe"][nprobe] = {
+                "recall_at_1": round(float(row_recall), 4),
+                "intent_recall_at_1": round(float(intent_recall), 4),
+                "ms_per_query": round(ann_ms, 4),
+                "speedup": round(exact_ms / ann_ms, 2),
+            }
+
+        self.stdout.write(json.dumps(report, indent=2))
@@ -0,0 +1,71 @@
+import json
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from api import engine
+from api.corpus import load_labeled
+from api.precision import MATRIX_DTYPES, reduce_index
+
+
+class Command(BaseCommand):
+    help = "Accuracy and memory of reduced-precision / PCA intent matrices vs float32"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--corpus", help="JSONL of {text, intent}; defaults to the labeled set")
+        parser.add_argument("--dtypes", nargs="+", choices=MATRIX_DTYPES, default=list(MATRIX_DTYPES))
+        parser.add_argument("--dims", type=int, nargs="+", default=[0, 256, 128, 64])
+
+    def handle(self, *args, **options):
+        rows = [(t, label) for t, label in load_labeled(options["corpus"]) if label]
+        labels = np.array([label for _, label in rows])
+
+        engine.ensure_warm()
+        model = engine.get_model()
+        baseline = engine.build_intent_index(model)
+        queries = engine.encode_texts(model, [t for t, _ in rows])
+
+        def evaluate(index):
+            start = time.perf_counter()
+            scored = index.best_batch(queries, engine.SCORE_THRESHOLD)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            predicted = np.array([intent for intent, _ in scored])
+            scores = np.array([score for _, score in scored])
+            return predicted, scores, elapsed_ms
+
+        base_pred, base_scores, base_ms = evaluate(baseline)
+        base_accuracy = float((base_pred == labels).mean())
+
+        report = {
+            "utterances": len(rows),
+            "baseline": {
+                "dtype": "float32",
+                "dims": baseline.dim,
+                "matrix_kb": round(baseline.nbytes / 1024, 1),
+                "accuracy": round(base_accuracy, 4),
+                "batch_ms": round(base_ms, 3),
+            },
+            "settings": [],
+        }
+
+        for dtype in options["dtypes"]:
+            for dim in options["dims"]:
+                if dtype == "float32" and not dim:
+                    continue
+                reduced = reduce_index(baseline, dtype=dtype, dim=dim)
+                pred, scores, ms = evaluate(reduced)
+                accuracy = float((pred == labels).mean())
+
+                report["settings"].append({
+                    "dtype": dtype,
+                    "dims": reduced.dim,
+                    "matrix_kb": round(reduced.nbytes / 1024, 1),
+                    "accuracy": round(accuracy, 4),
+                    "accuracy_delta": round(accuracy - base_accuracy, 4),
+                    "agreement": round(float((pred == base_pred).mean()), 4),
+                    "max_score_error": round(float(np.abs(scores - base_scores).max()), 4),
+                    "batch_ms": round(ms, 3),
+                })
+
+        self.stdout.write(json.dumps(report, indent=2))
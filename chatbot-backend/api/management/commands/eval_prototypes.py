@@ -0,0 +1,65 @@
+import json
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from api import engine
+from api.corpus import load_labeled
+from api.prototypes import PROTOTYPE_METHODS, compress_index
+
+
+class Command(BaseCommand):
+    help = "Accuracy of k-prototype intent scoring vs full-example scoring on a labeled set"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--corpus", help="JSONL of {text, intent}; defaults to the labeled set")
+        parser.add_argument("--k", type=int, nargs="+", default=[1, 2, 3, 5, 8])
+        parser.add_argument("--method", choices=PROTOTYPE_METHODS, default="medoids")
+
+    def handle(self, *args, **options):
+        rows = [(t, label) for t, label in load_labeled(options["corpus"]) if label]
+        labels = [label for _, label in rows]
+
+        engine.ensure_warm()
+        full = engine.build_intent_index(engine.get_model())
+        queries = engine.encode_texts(engine.get_model(), [t for t, _ in rows])
+
+        def evaluate(index):
+            predicted = [i for i, _ in index.best_batch(queries, engine.SCORE_THRESHOLD)]
+            per_intent = {}
+            for p, label in zip(predicted, labels):
+                hits, total = per_intent.get(label, (0, 0))
+                per_intent[label] = (hits + int(p == label), total + 1)
+            accuracy = float(np.mean([p == label for p, label in zip(predicted, labels)]))
+            return accuracy, {k: round(h / t, 4) for k, (h, t) in per_intent.items()}
+
+        full_accuracy, full_per_intent = evaluate(full)
+        report = {
+            "utterances": len(rows),
+            "full": {"rows": len(full), "accuracy": round(full_accuracy, 4)},
+            "k": {},
+            "suggested_k_per_intent": {},
+        }
+
+        for k in options["k"]:
+            compressed = compress_index(full, k, method=options["method"])
+            accuracy, per_intent = evaluate(compressed)
+            report["k"][k] = {
+                "rows": len(compressed),
+                "accuracy": round(accuracy, 4),
+                "delta": round(accuracy - full_accuracy, 4),
+                "per_intent": per_intent,
+            }
+
+        # Smallest k that matches full-example accuracy on each intent's utterances.
+        for intent, baseline in full_per_intent.items():
+            if intent not in full.names:
+                continue  # out-of-scope ("unknown") is not a compressible intent
+            for k in sorted(options["k"]):
+                if report["k"][k]["per_intent"].get(intent, 0.0) >= baseline:
+                    report["suggested_k_per_intent"][intent] = k
+                    break
+            else:
+                report["suggested_k_per_intent"][intent] = 0  # keep every example
+
+        self.stdout.write(json.dumps(report, indent=2))
@@ -0,0 +1,30 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+from api import engine
+
+
+class Command(BaseCommand):
+    help = "Writes the current intent catalog to JSON/YAML for CHATBOT_INTENTS_FILE"
+
+    def add_arguments(self, parser):
+        parser.add_argument("output", help="Target path; .yaml/.yml writes YAML (needs PyYAML)")
+
+    def handle(self, *args, **options):
+        path = Path(options["output"])
+
+        with open(path, "w", encoding="utf-8") as fh:
+            if path.suffix in (".yaml", ".yml"):
+                import yaml
+
+                yaml.safe_dump(engine.INTENTS, fh, allow_unicode=True, sort_keys=False, width=100)
+            else:
+                json.dump(engine.INTENTS, fh, ensure_ascii=False, indent=2)
+                fh.write("\n")
+
+        examples = sum(len(data["examples"]) for data in engine.INTENTS.values())
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {len(engine.INTENTS)} intents ({examples} examples) written to {path}"
+        ))
@@ -0,0 +1,63 @@
+import os
+import signal
+import threading
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from api import engine
+from api.encoders import create_encoder
+from api.inference_server import InferenceServer
+
+
+class Command(BaseCommand):
+    help = "Run the local inference server that owns the encoder (CHATBOT_ENCODER=remote)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--socket", default=settings.CHATBOT_INFERENCE_SOCKET)
+        parser.add_argument("--backend", default=settings.CHATBOT_INFERENCE_ENCODER)
+        parser.add_argument("--threads", type=int, default=settings.CHATBOT_INFERENCE_SERVER_THREADS)
+
+    def handle(self, *args, **options):
+        if options["backend"] == "remote":
+            self.stderr.write("The inference server cannot itself use the remote backend.")
+            return
+
+        if options["threads"] and options["backend"] == "sentence-transformers":
+            try:
+                import torch
+
+                torch.set_num_threads(options["threads"])
+            except ImportError:
+                pass
+
+        encoder = create_encoder(
+            options["backend"],
+            engine.MODEL_NAME,
+            cache_folder=os.environ.get("HF_HOME"),
+            onnx_dir=settings.CHATBOT_ONNX_MODEL_DIR,
+            threads=options["threads"] or None,
+            static_dir=settings.CHATBOT_STATIC_MODEL_DIR,
+        )
+        encoder.encode(["hello"])  # warm-up before accepting connections
+
+        server = InferenceServer(
+            options["socket"],
+            encoder,
+            max_batch=settings.CHATBOT_BATCH_MAX_SIZE,
+            max_wait_ms=settings.CHATBOT_BATCH_MAX_WAIT_MS,
+        )
+        # shutdown() waits for serve_forever() to return, which runs in this
+        # (the signal-handling) thread: call it from another one.
+        signal.signal(
+            signal.SIGTERM,
+            lambda *_: threading.Thread(target=server.shutdown, daemon=True).start(),
+        )
+
+        self.stdout.write(f"✅ Inference server ({options['backend']}) listening on {options['socket']}")
+        try:
+            server.serve_forever()
+        finally:
+            server.server_close()
+            if os.path.exists(options["socket"]):
+                os.unlink(options["socket"])
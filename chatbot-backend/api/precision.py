@@ -0,0 +1,101 @@
+import numpy as np
+
+from .index import IntentIndex, normalize_rows
+
+MATRIX_DTYPES = ("float32", "float16", "int8")
+
+# Rows dequantized per matmul block; bounds the float32 scratch memory.
+BLOCK_ROWS = 4096
+
+
+# ─────────────────────────
+# PCA PROJECTION
+# ─────────────────────────
+def fit_projection(matrix, dim):
+    """
+    (full_dim, dim) projection onto the top right-singular vectors of the
+    matrix. Uncentered, so projected dot products approximate the original
+    cosines and the tuned score threshold keeps its meaning.
+    """
+    _, _, vt = np.linalg.svd(np.asarray(matrix, dtype=np.float32), full_matrices=False)
+    return np.ascontiguousarray(vt[:dim].T)
+
+
+# ─────────────────────────
+# REDUCED INDEX
+# ─────────────────────────
+class ReducedIntentIndex(IntentIndex):
+    """
+    IntentIndex stored as float16 or int8 (symmetric, one scale per row),
+    optionally PCA-projected to fewer dimensions.
+
+    Queries are projected and re-normalized in ``prepare``; rows are
+    dequantized a block at a time while scoring, so the float32 copy of
+    the matrix never exists in memory.
+    """
+
+    def __init__(self, names, matrix, offsets, scales=None, projection=None):
+        super().__init__(names, matrix, offsets)
+        self.scales = scales
+        self.projection = projection
+
+    @property
+    def nbytes(self):
+        extra = 0 if self.scales is None else self.scales.nbytes
+        return self.matrix.nbytes + extra
+
+    def prepare(self, queries):
+        if self.projection is None:
+            return queries
+        return normalize_rows(np.dot(queries, self.projection))
+
+    def _dequantize(self, rows_block, rows):
+        block = rows_block.astype(np.float32)
+        if self.scales is not None:
+            block *= self.scales[rows][:, None]
+        return block
+
+    def similarities(self, queries):
+        queries = np.asarray(queries, dtype=np.float32)
+        out = np.empty(queries.shape[:-1] + (len(self.matrix),), dtype=np.float32)
+
+        for start in range(0, len(self.matrix), BLOCK_ROWS):
+            rows = slice(start, start + BLOCK_ROWS)
+            out[..., rows] = queries @ self._dequantize(self.matrix[rows], rows).T
+
+        return out
+
+    def row_similarities(self, rows, query):
+        return self._dequantize(self.matrix[rows], rows) @ query
+
+    def dense(self):
+        return self._dequantize(self.matrix, slice(None))
+
+
+def reduce_index(index, dtype="float32", dim=0):
+    """
+    Re-stores an IntentIndex at lower precision and/or fewer dimensions.
+    Returns the index unchanged for ("float32", 0).
+    """
+    if dtype not in MATRIX_DTYPES:
+        raise ValueError(f"Unknown matrix dtype {dtype!r}; expected one of {MATRIX_DTYPES}")
+    if dtype == "float32" and not dim:
+        return index
+
+    matrix = index.dense()
+    projection = None
+    if dim and dim < matrix.shape[1]:
+        projection = fit_projection(matrix, dim)
+        matrix = normalize_rows(matrix @ projection)
+
+    scales = None
+    if dtype == "int8":
+        scales = np.maximum(np.abs(matrix).max(axis=1), 1e-12) / 127.0
+        stored = np.clip(np.rint(matrix / scales[:, None]), -127, 127).astype(np.int8)
+        scales = scales.astype(np.float32)
+    elif dtype == "float16":
+        stored = matrix.astype(np.float16)
+    else:
+        stored = matrix
+
+    return ReducedIntentIndex(index.names, stored, index.offsets, scales, projection)
@@ -0,0 +1,77 @@
+import numpy as np
+
+from .ann import spherical_kmeans
+from .index import IntentIndex
+
+PROTOTYPE_METHODS = ("medoids", "means")
+
+
+# ─────────────────────────
+# K-MEDOIDS (cosine)
+# ─────────────────────────
+def kmedoids(vectors, k, iters=10, seed=0):
+    """
+    Row ids of ``k`` medoids under cosine similarity (alternating
+    assign/update with k-means++-style seeding). Medoids are real examples,
+    so a compressed intent stays readable.
+    """
+    rng = np.random.default_rng(seed)
+    n = len(vectors)
+    if k >= n:
+        return np.arange(n)
+
+    sims = vectors @ vectors.T
+
+    medoids = [int(rng.integers(n))]
+    while len(medoids) < k:
+        distance = 1.0 - sims[:, medoids].max(axis=1)
+        distance[medoids] = 0.0
+        total = distance.sum()
+        pick = rng.choice(n, p=distance / total) if total > 0 else rng.integers(n)
+        medoids.append(int(pick))
+    medoids = np.array(medoids)
+
+    for _ in range(iters):
+        assign = np.argmax(sims[:, medoids], axis=1)
+        updated = medoids.copy()
+        for c in range(k):
+            members = np.flatnonzero(assign == c)
+            if len(members):
+                within = sims[np.ix_(members, members)].sum(axis=1)
+                updated[c] = members[np.argmax(within)]
+        if np.array_equal(updated, medoids):
+            break
+        medoids = updated
+
+    return np.unique(medoids)
+
+
+# ─────────────────────────
+# INDEX COMPRESSION
+# ─────────────────────────
+def compress_index(index, k_default, k_per_intent=None, method="medoids", seed=0):
+    """
+    Returns a new IntentIndex with at most k prototypes per intent.
+    ``k_per_intent`` overrides ``k_default`` by intent name; k <= 0 keeps
+    every example of that intent.
+    """
+    if method not in PROTOTYPE_METHODS:
+        raise ValueError(f"Unknown prototype method {method!r}; expected one of {PROTOTYPE_METHODS}")
+
+    k_per_intent = k_per_intent or {}
+    matrix = np.asarray(index.matrix, dtype=np.float32)
+    bounds = np.append(index.offsets, len(matrix))
+    blocks = {}
+
+    for i, name in enumerate(index.names):
+        block = matrix[bounds[i]:bounds[i + 1]]
+        k = int(k_per_intent.get(name, k_default))
+
+        if k <= 0 or k >= len(block):
+            blocks[name] = block
+        elif method == "medoids":
+            blocks[name] = block[kmedoids(block, k, seed=seed)]
+        else:
+            blocks[name] = spherical_kmeans(block, k, seed=seed)
+
+    return IntentIndex.from_embeddings(blocks)
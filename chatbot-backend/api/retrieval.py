@@ -0,0 +1,249 @@
+import json
+import mmap
+import re
+from pathlib import Path
+
+import numpy as np
+
+from .ann import IVFIndex
+
+# Default FAQ / policy sources (markdown), and the built index's files.
+DEFAULT_FAQ_SOURCES = Path(__file__).resolve().parent / "data" / "faq"
+
+VECTORS_FILE = "vectors.npy"
+OFFSETS_FILE = "offsets.npy"
+TEXTS_FILE = "passages.jsonl"
+ANN_FILE = "ivf.npz"
+META_FILE = "meta.json"
+
+
+# ─────────────────────────
+# CHUNKING
+# ─────────────────────────
+def _front_matter(text):
+    """
+    Splits an optional ``---`` block of ``key: value`` lines off a document.
+    """
+    meta = {}
+    if text.startswith("---\n"):
+        head, sep, body = text[4:].partition("\n---\n")
+        if sep:
+            for line in head.splitlines():
+                key, _, value = line.partition(":")
+                if value:
+                    meta[key.strip()] = value.strip()
+            text = body
+    return meta, text
+
+
+def _sections(body):
+    heading, lines = "", []
+    for line in body.splitlines():
+        if line.startswith("## "):
+            yield heading, "\n".join(lines)
+            heading, lines = line[3:].strip(), []
+        else:
+            lines.append(line)
+    yield heading, "\n".join(lines)
+
+
+def chunk_markdown(text, source, max_chars=600):
+    """
+    Passages of a markdown document: one per ``##`` section (and the intro
+    before the first one), split at paragraph boundaries past ``max_chars``.
+    Each is ``{"title", "section", "text", "link"}``; title and link come
+    from the front matter.
+    """
+    meta, body = _front_matter(text)
+    title = meta.get("title") or Path(source).stem.replace("-", " ").title()
+    link = meta.get("link")
+
+    passages = []
+    for section, content in _sections(body):
+        paragraphs = [" ".join(p.split()) for p in re.split(r"\n\s*\n", content)]
+        current = ""
+        for paragraph in filter(None, paragraphs):
+            if current and len(current) + len(paragraph) + 1 > max_chars:
+                passages.append({"title": title, "section": section, "text": current, "link": link})
+                current = ""
+            current = f"{current} {paragraph}" if current else paragraph
+        if current:
+            passages.append({"title": title, "section": section, "text": current, "link": link})
+
+    return passages
+
+
+def load_passages(source=DEFAULT_FAQ_SOURCES, max_chars=600):
+    """
+    Chunks a markdown file, or every ``*.md`` under a directory (sorted, so
+    rebuilds are reproducible).
+    """
+    source = Path(source)
+    files = sorted(source.rglob("*.md")) if source.is_dir() else [source]
+
+    passages = []
+    for path in files:
+        passages.extend(chunk_markdown(path.read_text(encoding="utf-8"), path, max_chars))
+    return passages
+
+
+def embedding_text(passage):
+    """
+    What gets encoded: the section heading (usually the question) carries
+    most of the match, so it leads.
+    """
+    return f"{passage['section']}. {passage['text']}" if passage["section"] else passage["text"]
+
+
+# ─────────────────────────
+# BUILD
+# ─────────────────────────
+def write_passage_index(directory, passages, embeddings, encoder_key, dtype="float16",
+                        ann_min_rows=5000, nlist=None):
+    """
+    Writes an index ``PassageIndex.load`` can memory-map:
+
+    * ``vectors.npy``   (n, dim) L2-normalized embeddings
+    * ``passages.jsonl`` one JSON passage per line, UTF-8
+    * ``offsets.npy``   (n + 1,) int64 byte offsets of each line
+    * ``ivf.npz``       IVF lists, only with ``ann_min_rows`` passages or more
+    * ``meta.json``     encoder key, count and dim, written last
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    vectors = np.asarray(embeddings, dtype=np.float32)
+    if len(vectors) != len(passages):
+        raise ValueError(f"{len(passages)} passages but {len(vectors)} embeddings")
+    vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-9)
+    np.save(directory / VECTORS_FILE, np.ascontiguousarray(vectors, dtype=dtype))
+
+    offsets = np.zeros(len(passages) + 1, dtype=np.int64)
+    with open(directory / TEXTS_FILE, "wb") as fh:
+        for i, passage in enumerate(passages):
+            line = json.dumps(passage, ensure_ascii=False).encode("utf-8") + b"\n"
+            fh.write(line)
+            offsets[i + 1] = offsets[i] + len(line)
+    np.save(directory / OFFSETS_FILE, offsets)
+
+    ann_path = directory / ANN_FILE
+    if len(passages) >= ann_min_rows:
+        ann = IVFIndex.build(vectors, nlist=nlist)
+        np.savez(ann_path, centroids=ann.centroids, list_offsets=ann.list_offsets, list_rows=ann.list_rows)
+    elif ann_path.exists():
+        ann_path.unlink()
+
+    meta = {
+        "encoder_key": encoder_key,
+        "count": len(passages),
+        "dim": int(vectors.shape[1]) if vectors.ndim == 2 else 0,
+        "dtype": dtype,
+        "ann": ann_path.exists(),
+    }
+    with open(directory / META_FILE, "w", encoding="utf-8") as fh:
+        json.dump(meta, fh, indent=2)
+    return meta
+
+
+# ─────────────────────────
+# SEARCH
+# ─────────────────────────
+class PassageIndex:
+    """
+    Read-only passage index over memory-mapped files: vectors and offsets
+    are ``np.load(mmap_mode="r")`` and passage texts are sliced out of an
+    mmap of the JSONL store, so loading costs the same for any corpus size
+    and the OS pages in only what a query touches. A brute-force query
+    streams the vectors in ``chunk_rows`` blocks; with an IVF index it
+    reads only the probed lists. Only the top-k texts are ever decoded.
+    """
+
+    def __init__(self, directory, nprobe=8, chunk_rows=65536):
+        directory = Path(directory)
+        with open(directory / META_FILE, encoding="utf-8") as fh:
+            self.meta = json.load(fh)
+
+        self.directory = directory
+        self.encoder_key = self.meta["encoder_key"]
+        self.nprobe = nprobe
+        self.chunk_rows = chunk_rows
+
+        self.vectors = np.load(directory / VECTORS_FILE, mmap_mode="r")
+        self.offsets = np.load(directory / OFFSETS_FILE, mmap_mode="r")
+
+        self._texts = None
+        if len(self.vectors):
+            with open(directory / TEXTS_FILE, "rb") as fh:
+                self._texts = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+
+        self.ann = None
+        if (directory / ANN_FILE).exists():
+            with np.load(directory / ANN_FILE) as data:
+                self.ann = IVFIndex(data["centroids"], data["list_offsets"], data["list_rows"])
+
+    @classmethod
+    def load(cls, directory, nprobe=8):
+        return cls(directory, nprobe=nprobe)
+
+    def __len__(self):
+        return len(self.vectors)
+
+    def passage(self, row):
+        start, end = int(self.offsets[row]), int(self.offsets[row + 1])
+        return json.loads(self._texts[start:end])
+
+    def _scores(self, query):
+        if self.ann is not None:
+            rows = self.ann.candidates(query, self.nprobe)
+            rows.sort()  # sequential reads through the mmap
+            return rows, np.asarray(self.vectors[rows], dtype=np.float32) @ query
+
+        scores = np.empty(len(self.vectors), dtype=np.float32)
+        for start in range(0, len(self.vectors), self.chunk_rows):
+            block = np.asarray(self.vectors[start:start + self.chunk_rows], dtype=np.float32)
+            scores[start:start + len(block)] = block @ query
+        return None, scores
+
+    def search(self, query, k=3, min_score=None):
+        """
+        Top ``k`` passages for an embedding, best first, each with its
+        ``score``; those below ``min_score`` are dropped.
+        """
+        if not len(self.vectors):
+            return []
+
+        query = np.asarray(query, dtype=np.float32).ravel()
+        query = query / max(float(np.linalg.norm(query)), 1e-9)
+        if query.shape[0] != self.vectors.shape[1]:
+            raise ValueError(
+                f"query has {query.shape[0]} dims, the passage index {self.vectors.shape[1]}"
+            )
+
+        rows, scores = self._scores(query)
+        k = min(k, len(scores))
+        if k <= 0:
+            return []
+
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+
+        results = []
+        for i in top:
+            score = float(scores[i])
+            if min_score is not None and score < min_score:
+                break
+            row = int(i) if rows is None else int(rows[i])
+            results.append({**self.passage(row), "score": round(score, 4)})
+        return results
+
+    def snapshot(self):
+        return {
+            "passages": len(self),
+            "dim": int(self.vectors.shape[1]) if self.vectors.ndim == 2 else 0,
+            "ann": self.ann is not None,
+            "encoder_key": self.encoder_key,
+            "bytes_on_disk": sum(
+                (self.directory / name).stat().st_size
+                for name in (VECTORS_FILE, OFFSETS_FILE, TEXTS_FILE)
+            ),
+        }
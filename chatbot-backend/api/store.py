@@ -0,0 +1,125 @@
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from .ann import IVFIndex
+from .index import IntentIndex
+
+# Bump when the on-disk layout changes so stale files are ignored.
+STORE_VERSION = 1
+
+
+# ─────────────────────────
+# CACHE KEY
+# ─────────────────────────
+def catalog_hash(intents, model_name):
+    """
+    Hash of every intent's examples (in order) plus the encoder name.
+    Any copy change or model swap yields a new key.
+    """
+    payload = json.dumps(
+        {
+            "version": STORE_VERSION,
+            "model": model_name,
+            "intents": [[name, data["examples"]] for name, data in intents.items()],
+        },
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _paths(cache_dir, digest):
+    base = Path(cache_dir) / f"intents-v{STORE_VERSION}-{digest[:16]}"
+    return base.with_suffix(".npy"), base.with_suffix(".json")
+
+
+def _atomic_write(path, write):
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            write(fh)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+# ─────────────────────────
+# LOAD / SAVE
+# ─────────────────────────
+def load_index(cache_dir, digest):
+    """
+    Memory-maps a cached IntentIndex, or returns None on miss/mismatch.
+    """
+    matrix_path, meta_path = _paths(cache_dir, digest)
+
+    try:
+        with open(meta_path, encoding="utf-8") as fh:
+            meta = json.load(fh)
+        if meta.get("hash") != digest:
+            return None
+        matrix = np.load(matrix_path, mmap_mode="r")
+    except (OSError, ValueError):
+        return None
+
+    return IntentIndex(meta["names"], matrix, meta["offsets"])
+
+
+def save_index(cache_dir, digest, index, model_name):
+    """
+    Writes the matrix (.npy) and its metadata (.json) atomically.
+    """
+    Path(cache_dir).mkdir(parents=True, exist_ok=True)
+    matrix_path, meta_path = _paths(cache_dir, digest)
+
+    meta = {
+        "version": STORE_VERSION,
+        "hash": digest,
+        "model": model_name,
+        "names": index.names,
+        "offsets": index.offsets.tolist(),
+        "shape": list(index.matrix.shape),
+    }
+
+    # Matrix first: a meta file only ever points at a complete matrix.
+    _atomic_write(matrix_path, lambda fh: np.save(fh, np.ascontiguousarray(index.matrix)))
+    _atomic_write(meta_path, lambda fh: fh.write(json.dumps(meta).encode("utf-8")))
+
+    return matrix_path
+
+
+# ─────────────────────────
+# ANN INDEX (persisted next to the matrix)
+# ─────────────────────────
+def _ann_path(cache_dir, digest, nlist):
+    matrix_path, _ = _paths(cache_dir, digest)
+    return matrix_path.with_name(f"{matrix_path.stem}.ivf{nlist or 'auto'}.npz")
+
+
+def load_ann(cache_dir, digest, nlist):
+    """
+    Loads a persisted IVFIndex for this matrix, or None.
+    """
+    try:
+        with np.load(_ann_path(cache_dir, digest, nlist)) as data:
+            return IVFIndex(data["centroids"], data["list_offsets"], data["list_rows"])
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def save_ann(cache_dir, digest, nlist, ann):
+    Path(cache_dir).mkdir(parents=True, exist_ok=True)
+    _atomic_write(
+        _ann_path(cache_dir, digest, nlist),
+        lambda fh: np.savez(
+            fh,
+            centroids=ann.centroids,
+            list_offsets=ann.list_offsets,
+            list_rows=ann.list_rows,
+        ),
+    )
@@ -1,3 +1,259 @@
-from django.test import TestCase
+import copy
+import os
+import socket
+import tempfile
+import threading
+import time
+import zlib
 
-# Create your tests here.
+import numpy as np
+from django.test import SimpleTestCase
+
+from . import engine
+from .admission import AdmissionController, Overloaded
+from .cache import QueryCache
+from .catalog import CatalogError, validate_catalog
+from .corpus import load_labeled
+from .encoders import Encoder
+from .index import IntentIndex
+from .inference_server import (
+    InferenceServer,
+    RemoteEncoder,
+    decode_request,
+    decode_response,
+    encode_request,
+    encode_response,
+    recv_frame,
+    send_frame,
+)
+
+
+class StubEncoder(Encoder):
+    """
+    Deterministic stand-in for the model: hashed character trigrams,
+    L2-normalized. Similar strings get similar vectors, with no weights.
+    """
+
+    name = "stub"
+    dim = 64
+
+    def encode(self, texts):
+        single = isinstance(texts, str)
+        texts = [texts] if single else list(texts)
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for i, text in enumerate(texts):
+            text = f"  {text.lower()}  "
+            for j in range(len(text) - 2):
+                out[i, zlib.crc32(text[j:j + 3].encode("utf-8")) % self.dim] += 1
+        out /= np.maximum(np.linalg.norm(out, axis=1, keepdims=True), 1e-9)
+        return out[0] if single else out
+
+
+def legacy_best(query, blocks, threshold):
+    """
+    The per-intent loop IntentIndex replaced: best cosine per intent, the
+    first intent to beat the running best wins.
+    """
+    best_intent, highest_score = "unknown", threshold
+    for intent, block in blocks.items():
+        score = float(np.max(block @ query))
+        if score > highest_score:
+            best_intent, highest_score = intent, score
+    return best_intent
+
+
+# ─────────────────────────
+# INTENT SCORING
+# ─────────────────────────
+class IntentIndexTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        encoder = StubEncoder()
+        cls.blocks = {
+            name: encoder.encode(data["examples"]) for name, data in engine.INTENTS.items()
+        }
+        cls.index = IntentIndex.from_embeddings(cls.blocks)
+        cls.queries = encoder.encode([text for text, _ in load_labeled()])
+
+    def test_matches_legacy_loop(self):
+        for threshold in (0.0, engine.SCORE_THRESHOLD, 0.9):
+            for query in self.queries:
+                intent, _ = self.index.best(query, threshold)
+                self.assertEqual(intent, legacy_best(query, self.blocks, threshold))
+
+    def test_batch_matches_single(self):
+        batch = self.index.best_batch(self.queries, engine.SCORE_THRESHOLD)
+        for query, (intent, score) in zip(self.queries, batch):
+            single_intent, single_score = self.index.best(query, engine.SCORE_THRESHOLD)
+            self.assertAlmostEqual(score, single_score, places=5)
+            if intent != single_intent:
+                # An exact tie, broken by matmul vs matvec rounding.
+                scores = self.index.intent_scores(query)
+                self.assertAlmostEqual(scores[self.index.names.index(intent)], single_score, places=5)
+
+
+# ─────────────────────────
+# QUERY CACHE
+# ─────────────────────────
+class QueryCacheTests(SimpleTestCase):
+    def test_counters(self):
+        cache = QueryCache(max_size=1)
+
+        self.assertEqual(cache.get_or_compute("Hello  there", str.upper), "HELLO THERE")
+        self.assertEqual(cache.get_or_compute("hello there", str.upper), "HELLO THERE")
+        self.assertIsNone(cache.peek("something else"))  # a peek miss is not counted
+        self.assertEqual(cache.peek("HELLO there"), "HELLO THERE")
+        cache.get_or_compute("something else", str.upper)  # evicts "hello there"
+
+        stats = cache.snapshot()
+        self.assertEqual((stats["hits"], stats["misses"], stats["evictions"]), (2, 2, 1))
+        self.assertEqual(stats["hit_rate"], 0.5)
+        self.assertIsNone(cache.lookup("hello there"))
+        self.assertEqual(cache.snapshot()["misses"], 3)
+
+    def test_single_flight(self):
+        cache = QueryCache()
+        release = threading.Event()
+        calls = []
+
+        def compute(key):
+            calls.append(key)
+            release.wait(5)
+            return key.upper()
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(cache.get_or_compute("same", compute)))
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+
+        deadline = time.monotonic() + 5
+        while cache.snapshot()["coalesced"] < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+
+        self.assertEqual(calls, ["same"])
+        self.assertEqual(results, ["SAME"] * 4)
+        stats = cache.snapshot()
+        self.assertEqual((stats["misses"], stats["coalesced"]), (1, 3))
+
+    def test_failure_is_not_cached(self):
+        cache = QueryCache()
+
+        def fail(key):
+            raise RuntimeError("encoder down")
+
+        with self.assertRaises(RuntimeError):
+            cache.get_or_compute("q", fail)
+        self.assertEqual(cache.get_or_compute("q", str.upper), "Q")
+
+
+# ─────────────────────────
+# ADMISSION CONTROL
+# ─────────────────────────
+class AdmissionControllerTests(SimpleTestCase):
+    def test_sheds_when_queue_is_full(self):
+        controller = AdmissionController(concurrency=1, max_queue=1)
+        controller.try_admit()
+        controller.try_admit()
+
+        with self.assertRaises(Overloaded) as shed:
+            controller.try_admit()
+        self.assertEqual(shed.exception.reason, "queue_full")
+
+        controller.release(0.01)
+        controller.try_admit()
+        self.assertEqual(controller.snapshot()["shed"]["queue_full"], 1)
+
+    def test_oversized_batch_is_admitted_only_when_idle(self):
+        controller = AdmissionController(concurrency=1, max_queue=1)
+        controller.try_admit(cost=5)
+        with self.assertRaises(Overloaded):
+            controller.try_admit()
+        controller.release(0.01, cost=5)
+        self.assertEqual(controller.inflight, 0)
+
+    def test_rate_limits_per_client(self):
+        controller = AdmissionController(concurrency=10, max_queue=10, client_rate=0.001, client_burst=2)
+        with controller.admit("a", cost=2):
+            pass
+
+        with self.assertRaises(Overloaded) as shed:
+            controller.try_admit("a")
+        self.assertEqual(shed.exception.reason, "rate_limited")
+        self.assertGreaterEqual(shed.exception.retry_after, 1)
+
+        with controller.admit("b"):
+            pass
+
+    def test_sheds_past_the_slo(self):
+        controller = AdmissionController(concurrency=1, max_queue=10, slo_ms=100, probe_interval=60)
+        controller.try_admit()
+        controller.release(0.5)  # EWMA service time is now far past the SLO
+
+        controller.try_admit()  # nothing in flight ahead of it: never shed
+        controller.try_admit()  # first over-SLO request is the probe
+        with self.assertRaises(Overloaded) as shed:
+            controller.try_admit()
+        self.assertEqual(shed.exception.reason, "slo")
+
+
+# ─────────────────────────
+# INFERENCE SERVER PROTOCOL
+# ─────────────────────────
+class ProtocolTests(SimpleTestCase):
+    def test_request_round_trip(self):
+        texts = ["hello", "", "naïve café ☕", "x" * 10_000]
+        self.assertEqual(decode_request(encode_request(texts)), texts)
+
+    def test_response_round_trip(self):
+        vectors = np.random.default_rng(0).standard_normal((3, 8)).astype(np.float32)
+        np.testing.assert_array_equal(decode_response(encode_response(vectors)), vectors)
+
+    def test_frames_over_a_socket(self):
+        left, right = socket.socketpair()
+        with left, right:
+            payload = encode_request(["one", "two"])
+            send_frame(left, payload)
+            self.assertEqual(recv_frame(right), payload)
+
+    def test_remote_encoder_matches_local(self):
+        encoder = StubEncoder()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "inference.sock")
+            server = InferenceServer(path, encoder)
+            thread = threading.Thread(target=server.serve_forever, daemon=True)
+            thread.start()
+            try:
+                remote = RemoteEncoder(path, "stub", pool_size=1, timeout=5, connect_timeout=5)
+                texts = ["where is my order", "I feel anxious"]
+                np.testing.assert_allclose(remote.encode(texts), encoder.encode(texts), rtol=1e-6)
+                np.testing.assert_allclose(remote.encode(texts[0]), encoder.encode(texts[0]), rtol=1e-6)
+            finally:
+                server.shutdown()
+                server.server_close()
+
+
+# ─────────────────────────
+# CATALOG VALIDATION
+# ─────────────────────────
+class ValidateCatalogTests(SimpleTestCase):
+    def test_accepts_builtin_catalog(self):
+        validate_catalog(engine.INTENTS)
+
+    def test_rejects_catalog_without_crisis(self):
+        intents = copy.deepcopy(engine.INTENTS)
+        del intents["crisis"]
+        with self.assertRaisesMessage(CatalogError, "'crisis' intent is required"):
+            validate_catalog(intents)
+
+    def test_rejects_blank_crisis_response(self):
+        intents = copy.deepcopy(engine.INTENTS)
+        intents["crisis"]["responses"].append("  ")
+        with self.assertRaises(CatalogError):
+            validate_catalog(intents)
@@ -0,0 +1,240 @@
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+
+SEGMENT_GLOB = "transcripts-*.jsonl"
+
+
+def _segment_pid(path):
+    # transcripts-<start>-<pid>-<seq>.jsonl
+    parts = path.stem.split("-")
+    return int(parts[2]) if len(parts) == 4 and parts[2].isdigit() else None
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+# ─────────────────────────
+# TRANSCRIPT LOG (async, bounded, rotating JSONL)
+# ─────────────────────────
+class TranscriptLog:
+    """
+    Appends one JSON line per chat message to rotating segment files
+    without blocking the request.
+
+    ``record(entry)`` only does a non-blocking put on a bounded queue; when
+    it is full the entry is dropped and counted. A writer thread drains up
+    to ``batch_size`` entries at a time, writes them with one ``write`` and
+    flushes at least every ``flush_interval`` seconds. Each process writes
+    its own segments (``transcripts-<start>-<pid>-<seq>.jsonl``), rotated
+    past ``segment_bytes``. Each process keeps its own newest
+    ``max_segments``; segments of exited processes are kept to the same
+    count. A segment another live process may still have open is never
+    deleted.
+    ``close()`` (also run at exit) drains what is queued.
+    """
+
+    def __init__(self, directory, max_queue=10_000, batch_size=256, flush_interval=1.0,
+                 segment_bytes=64 * 1024 * 1024, max_segments=50):
+        self.directory = Path(directory)
+        self.max_queue = max(1, int(max_queue))
+        self.batch_size = max(1, int(batch_size))
+        self.flush_interval = max(0.01, float(flush_interval))
+        self.segment_bytes = segment_bytes
+        self.max_segments = max_segments
+
+        self._queue = queue.Queue(self.max_queue)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self._closed = False
+
+        self._fh = None
+        self._seq = 0
+        self._segment_size = 0
+
+        self.recorded = 0
+        self.dropped = 0
+        self.written = 0
+        self.errors = 0
+        self.segments = 0
+
+    def record(self, entry):
+        """
+        Queues one entry (a JSON-serializable dict). Returns False when it
+        was dropped: queue full, or the log is closed.
+        """
+        if self._closed:
+            self.dropped += 1
+            return False
+
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+        self.recorded += 1
+        return True
+
+    def _ensure_worker(self):
+        # Threads do not survive fork, so gunicorn workers start their own.
+        if self._thread is not None and self._pid == os.getpid():
+            return
+
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid():
+                self._queue = queue.Queue(self.max_queue)
+                self._fh = None
+                self._pid = os.getpid()
+                self._thread = threading.Thread(
+                    target=self._run, name="transcript-writer", daemon=True
+                )
+                self._thread.start()
+
+    # Writer thread ─────────────────────────
+    def _drain(self):
+        batch = []
+        try:
+            batch.append(self._queue.get(timeout=self.flush_interval))
+            while len(batch) < self.batch_size:
+                batch.append(self._queue.get_nowait())
+        except queue.Empty:
+            pass
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._drain()
+            stop = None in batch
+            entries = [entry for entry in batch if entry is not None]
+
+            if entries:
+                try:
+                    self._write(entries)
+                except Exception:
+                    self.errors += 1
+                    self._fh = None  # reopen a fresh segment next time
+
+            if stop:
+                if self._fh is not None:
+                    self._fh.close()
+                    self._fh = None
+                return
+
+    def _write(self, entries):
+        data = "".join(
+            json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n" for entry in entries
+        ).encode("utf-8")
+
+        if self._fh is None or self._segment_size >= self.segment_bytes:
+            self._rotate()
+
+        self._fh.write(data)
+        self._fh.flush()
+        self._segment_size += len(data)
+        self.written += len(entries)
+
+    def _rotate(self):
+        if self._fh is not None:
+            self._fh.close()
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._seq += 1
+        started = time.strftime("%Y%m%dT%H%M%S", time.gmtime())
+        path = self.directory / f"transcripts-{started}-{os.getpid()}-{self._seq:04d}.jsonl"
+        self._fh = open(path, "ab")
+        self._segment_size = 0
+        self.segments += 1
+        self._prune()
+
+    def _prune(self):
+        if not self.max_segments:
+            return
+
+        own, orphaned = [], []
+        for path in self.directory.glob(SEGMENT_GLOB):
+            pid = _segment_pid(path)
+            if pid == os.getpid():
+                own.append(path)
+            elif pid is not None and not _pid_alive(pid):
+                orphaned.append(path)
+
+        # Names start with a UTC timestamp, so name order is age order.
+        for group in (own, orphaned):
+            for old in sorted(group)[:-self.max_segments]:
+                try:
+                    old.unlink()
+                except OSError:
+                    pass
+
+    # Shutdown ─────────────────────────
+    def close(self, timeout=5.0):
+        """
+        Stops accepting entries and waits up to ``timeout`` seconds for the
+        queued ones to be written.
+        """
+        self._closed = True
+        thread = self._thread
+        if thread is None or self._pid != os.getpid() or not thread.is_alive():
+            return
+
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            return
+        thread.join(timeout)
+
+    def snapshot(self):
+        return {
+            "directory": str(self.directory),
+            "queued": self._queue.qsize(),
+            "max_queue": self.max_queue,
+            "recorded": self.recorded,
+            "written": self.written,
+            "dropped": self.dropped,
+            "errors": self.errors,
+            "segments": self.segments,
+        }
+
+
+def read_transcripts(directory, intents=None):
+    """
+    Streams logged entries from every segment, oldest first, optionally
+    only those whose reply intent is in ``intents``. Skips a torn last line
+    and segments pruned after the listing.
+    """
+    for path in sorted(Path(directory).glob(SEGMENT_GLOB)):
+        try:
+            fh = open(path, encoding="utf-8")
+        except FileNotFoundError:
+            continue
+        with fh:
+            for line in fh:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if intents is None or entry.get("intent") in intents:
+                    yield entry
+
+
+def create_transcript_log(directory, **options):
+    """
+    A TranscriptLog that is flushed when the interpreter exits.
+    """
+    log = TranscriptLog(directory, **options)
+    atexit.register(log.close)
+    return log
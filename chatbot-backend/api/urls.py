@@ -1,6 +1,12 @@
 from django.urls import path
-from .views import MindSettlerChat
+from .views import MindSettlerChat, MindSettlerChatBatch, MindSettlerChatStats, ChatbotReadiness, CatalogReload, chat_async, metrics
 
 urlpatterns = [
     path('chat/', MindSettlerChat.as_view(), name='chatbot_api'),
-]
\ No newline at end of file
+    path('chat/async/', chat_async, name='chatbot_async_api'),
+    path('chat/batch/', MindSettlerChatBatch.as_view(), name='chatbot_batch_api'),
+    path('chat/stats/', MindSettlerChatStats.as_view(), name='chatbot_stats'),
+    path('health/ready/', ChatbotReadiness.as_view(), name='chatbot_ready'),
+    path('metrics/', metrics, name='chatbot_metrics'),
+    path('admin/catalog/reload/', CatalogReload.as_view(), name='chatbot_catalog_reload'),
+]
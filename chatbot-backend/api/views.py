@@ -1,38 +1,395 @@
+import asyncio
+import json
+import time
+
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from .engine import get_best_intent, INTENTS
+from . import engine
+from .admission import Overloaded
+from .cache import normalize_query
+from .catalog import CatalogError
+from .engine import classify_batch, get_stats
+from .metrics import CONTENT_TYPE, REGISTRY
+
+MAX_BATCH_MESSAGES = 64
+MAX_TRANSCRIPT_CHARS = 1000
+
+NOT_AN_OBJECT = {"error": "Body must be a JSON object."}
+
+SHED_CRISIS_NOTE = (
+    "If you are in crisis or feel unsafe, please contact your local emergency "
+    "services or a crisis hotline right away."
+)
+
+EMPTY_REPLY = "I'm listening. How can I assist you?"
+
+WARMING_REPLY = {
+    "reply": "I'm just getting ready. Please try again in a few seconds.",
+    "intent": "warming",
+}
+
+
+_request_seconds = REGISTRY.histogram(
+    "chatbot_request_seconds", "Chat view latency.", ["endpoint"],
+)
+_replies_total = REGISTRY.counter(
+    "chatbot_replies_total", "Replies by endpoint and intent (incl. fallback, warming, shed).",
+    ["endpoint", "intent"],
+)
+
+
+def build_reply(intent_key):
+    """
+    Response body for a resolved intent (or the fallback for "unknown", or
+    for an intent a catalog reload just removed).
+    """
+    if intent_key == "warming":
+        return dict(WARMING_REPLY)
+
+    data = engine.INTENTS.get(intent_key)
+    if data is not None:
+        return {
+            "reply": data["responses"][0],   # ✅ FIXED
+            "link": data.get("link"),
+            "intent": intent_key
+        }
+
+    # Fallback
+    return {
+        "reply": (
+            "I'm not quite sure about that. "
+            "Would you like to learn more about us or book your first session?"
+        ),
+        "options": [
+            {"label": "Book Session", "link": "/booking"},
+            {"label": "About Us", "link": "/about"},
+            {"label": "How it Works", "link": "/how-it-works"}
+        ],
+        "intent": "fallback"
+    }
+
+
+def answer(result):
+    """
+    Reply for a resolved message. One that matched no intent is answered
+    from the best FAQ passage, when one scores high enough, before falling
+    back; the other passages are listed as sources.
+    """
+    if result.intent == "unknown":
+        passages = engine.retrieve_passages(result)
+        if passages:
+            best = passages[0]
+            return {
+                "reply": best["text"],
+                "link": best["link"],
+                "intent": "faq",
+                "sources": [
+                    {"title": p["title"], "section": p["section"], "link": p["link"], "score": p["score"]}
+                    for p in passages
+                ],
+            }
+
+    return build_reply(result.intent)
+
+
+def log_transcript(endpoint, user_text, result, body, started):
+    """
+    Queues the message and how it was answered for the transcript log
+    (off the request path; see api.transcripts).
+    """
+    engine.log_transcript({
+        "ts": round(time.time(), 3),
+        "endpoint": endpoint,
+        "text": normalize_query(user_text)[:MAX_TRANSCRIPT_CHARS],
+        "intent": body["intent"],
+        "resolved": result.intent,
+        "tier": result.tier,
+        "score": round(float(result.score), 4),
+        "latency_ms": round((time.perf_counter() - started) * 1000, 3),
+    })
+
+
+def client_id(request):
+    """
+    Token-bucket key: the address our CHATBOT_TRUSTED_PROXIES-th proxy
+    (counting back from the last X-Forwarded-For hop) saw the request
+    come from. Earlier hops are client-supplied and not trusted. The peer
+    address when there are no trusted proxies or too few hops.
+    """
+    proxies = getattr(settings, "CHATBOT_TRUSTED_PROXIES", 1)
+    hops = [h.strip() for h in request.META.get("HTTP_X_FORWARDED_FOR", "").split(",") if h.strip()]
+    if proxies > 0 and len(hops) >= proxies:
+        return hops[-proxies]
+    return request.META.get("REMOTE_ADDR")
+
+
+MAX_SESSION_ID_LENGTH = 128
+
+
+def session_id(request, body):
+    """
+    Conversation key: "session_id" in the body or the X-Chat-Session header.
+    None (stateless) when absent or not a short string.
+    """
+    value = body.get("session_id") or request.META.get("HTTP_X_CHAT_SESSION")
+    if isinstance(value, str) and 0 < len(value) <= MAX_SESSION_ID_LENGTH:
+        return value
+    return None
+
+
+def crisis_resources():
+    """
+    The crisis reply and link, for replies that may have skipped the
+    classifier (a shed message could be one the crisis tier missed).
+    """
+    data = engine.INTENTS.get("crisis") or {}
+    return {
+        "reply": (data.get("responses") or [SHED_CRISIS_NOTE])[0],
+        "link": data.get("link") or "/emergency-resources",
+    }
+
+
+def shed_reply(shed):
+    """
+    (body, status, headers) for a shed request: the fallback reply by
+    default, or a 503 when CHATBOT_SHED_RESPONSE is "503". Both carry the
+    crisis resources, since the message was never classified.
+    """
+    headers = {"Retry-After": str(shed.retry_after)}
+    crisis = crisis_resources()
+
+    if getattr(settings, "CHATBOT_SHED_RESPONSE", "fallback") == "503":
+        body = {
+            "error": "The assistant is busy. Please try again shortly.",
+            "reason": shed.reason,
+            "crisis": crisis,
+        }
+        return body, status.HTTP_503_SERVICE_UNAVAILABLE, headers
+
+    body = build_reply("unknown")
+    body["reply"] = f"{body['reply']} {SHED_CRISIS_NOTE}"
+    body["options"] = [{"label": "Emergency Resources", "link": crisis["link"]}, *body["options"]]
+    body["crisis"] = crisis
+    return body, status.HTTP_200_OK, headers
+
 
 class MindSettlerChat(APIView):
     def post(self, request):
-        user_text = request.data.get("message", "").strip()
+        with _request_seconds.time("chat"):
+            return self._reply(request)
+
+    def _reply(self, request):
+        started = time.perf_counter()
+        if not isinstance(request.data, dict):
+            return Response(NOT_AN_OBJECT, status=status.HTTP_400_BAD_REQUEST)
+        user_text = str(request.data.get("message", "")).strip()
 
         if not user_text:
+            _replies_total.inc("chat", "empty")
             return Response(
-                {"reply": "I'm listening. How can I assist you?"},
+                {"reply": EMPTY_REPLY},
                 status=status.HTTP_200_OK
             )
 
-        intent_key = get_best_intent(user_text)
-
-        if intent_key != "unknown":
-            data = INTENTS[intent_key]
-            return Response({
-                "reply": data["responses"][0],   # ✅ FIXED
-                "link": data.get("link"),
-                "intent": intent_key
-            }, status=status.HTTP_200_OK)
-
-        # Fallback
-        return Response({
-            "reply": (
-                "I'm not quite sure about that. "
-                "Would you like to learn more about us or book your first session?"
-            ),
-            "options": [
-                {"label": "Book Session", "link": "/booking"},
-                {"label": "About Us", "link": "/about"},
-                {"label": "How it Works", "link": "/how-it-works"}
-            ],
-            "intent": "fallback"
-        }, status=status.HTTP_200_OK)
\ No newline at end of file
+        try:
+            result = engine.resolve_query(
+                user_text, client_id(request), session_id(request, request.data)
+            )
+        except Overloaded as shed:
+            _replies_total.inc("chat", "shed")
+            body, code, headers = shed_reply(shed)
+            return Response(body, status=code, headers=headers)
+
+        body = answer(result)
+        _replies_total.inc("chat", body["intent"])
+        log_transcript("chat", user_text, result, body, started)
+        return Response(body, status=status.HTTP_200_OK)
+
+
+async def chat_async(request):
+    """
+    Async twin of MindSettlerChat for ASGI servers. Inference runs on the
+    engine's bounded executor, so the event loop never blocks on encode;
+    requests are admitted before they queue for it.
+    """
+    if request.method != "POST":
+        return JsonResponse({"error": "Method not allowed."}, status=405)
+
+    start = time.perf_counter()
+    try:
+        return await _chat_async_reply(request, start)
+    finally:
+        _request_seconds.observe(time.perf_counter() - start, "chat_async")
+
+
+async def _chat_async_reply(request, started):
+    try:
+        body = json.loads(request.body or b"{}")
+    except ValueError:
+        return JsonResponse({"error": "Invalid JSON."}, status=400)
+    if not isinstance(body, dict):
+        return JsonResponse(NOT_AN_OBJECT, status=400)
+
+    user_text = str(body.get("message", "")).strip()
+
+    if not user_text:
+        _replies_total.inc("chat_async", "empty")
+        return JsonResponse({"reply": EMPTY_REPLY})
+
+    loop = asyncio.get_running_loop()
+    result = engine.resolve_fast(user_text)
+
+    if result is None:
+        if not engine.is_ready():
+            # Lazy mode: load outside the admitted (timed) window.
+            await loop.run_in_executor(engine.get_executor(), engine.ensure_warm)
+        try:
+            with engine.admit(client_id(request)):
+                result = await loop.run_in_executor(
+                    engine.get_executor(), engine.resolve_encoded, user_text
+                )
+        except Overloaded as shed:
+            _replies_total.inc("chat_async", "shed")
+            body, code, headers = shed_reply(shed)
+            return JsonResponse(body, status=code, headers=headers)
+
+    sid = session_id(request, body)
+    if sid:
+        # The conversation store may be the Django cache (a network round
+        # trip), and the rescoring is a matmul: run both off the loop.
+        result = await loop.run_in_executor(
+            engine.get_executor(), engine.contextualize, result, sid
+        )
+    if result.intent == "unknown" and result.embedding is not None:
+        # Passage scoring reads the mmap'd index: keep it off the loop too.
+        body = await loop.run_in_executor(engine.get_executor(), answer, result)
+    else:
+        body = build_reply(result.intent)
+    _replies_total.inc("chat_async", body["intent"])
+    log_transcript("chat_async", user_text, result, body, started)
+    return JsonResponse(body)
+
+
+# csrf_exempt() only wraps async views correctly from Django 5.0 on; like
+# the DRF views, this endpoint takes no cookies, so mark it directly.
+chat_async.csrf_exempt = True
+
+
+class MindSettlerChatBatch(APIView):
+    """
+    Classifies a list of messages with one batched encode.
+    Body: {"messages": ["...", ...]} -> {"results": [...]} in input order.
+    """
+
+    def post(self, request):
+        with _request_seconds.time("chat_batch"):
+            return self._reply(request)
+
+    def _reply(self, request):
+        if not isinstance(request.data, dict):
+            return Response(NOT_AN_OBJECT, status=status.HTTP_400_BAD_REQUEST)
+        messages = request.data.get("messages")
+
+        if not isinstance(messages, list) or not all(isinstance(m, str) for m in messages):
+            return Response(
+                {"error": "'messages' must be a list of strings."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if len(messages) > MAX_BATCH_MESSAGES:
+            return Response(
+                {"error": f"At most {MAX_BATCH_MESSAGES} messages per request."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        texts = [m.strip() for m in messages]
+        non_empty = [t for t in texts if t]
+        try:
+            classified = iter(classify_batch(non_empty, client_id(request)))
+        except Overloaded as shed:
+            _replies_total.inc("chat_batch", "shed", amount=len(non_empty))
+            body, code, headers = shed_reply(shed)
+            if code != status.HTTP_200_OK:
+                return Response(body, status=code, headers=headers)
+            # Lexical answers (crisis included) need no model: keep them.
+            results = []
+            for text in texts:
+                hit = engine.match_lexical(text) if text else None
+                if not text:
+                    results.append({"reply": EMPTY_REPLY, "intent": None, "score": None})
+                elif hit is not None:
+                    results.append({**build_reply(hit.intent), "score": round(hit.score, 4)})
+                else:
+                    results.append({**body, "score": None})
+            return Response({"results": results}, status=code, headers=headers)
+
+        results = []
+        for text in texts:
+            if not text:
+                results.append({"reply": EMPTY_REPLY, "intent": None, "score": None})
+                continue
+
+            intent_key, score = next(classified)
+            body = build_reply(intent_key)
+            _replies_total.inc("chat_batch", body["intent"])
+            results.append({**body, "score": round(score, 4)})
+
+        return Response({"results": results}, status=status.HTTP_200_OK)
+
+
+class MindSettlerChatStats(APIView):
+    """
+    Engine runtime stats (batch sizes, queueing delay, admitted/shed, ...).
+    """
+
+    def get(self, request):
+        return Response(get_stats(), status=status.HTTP_200_OK)
+
+
+class ChatbotReadiness(APIView):
+    """
+    200 once the model is loaded and warm, 503 while cold/loading/failed.
+    Reports model load, embedding build and warm-up times.
+    """
+
+    def get(self, request):
+        body = engine.get_status()
+        code = status.HTTP_200_OK if engine.is_ready() else status.HTTP_503_SERVICE_UNAVAILABLE
+        return Response(body, status=code)
+
+
+def metrics(request):
+    """
+    Prometheus text exposition of this worker's metrics. Requires
+    "Authorization: Bearer <CHATBOT_METRICS_TOKEN>" when that is set.
+    """
+    token = getattr(settings, "CHATBOT_METRICS_TOKEN", "")
+    if token and request.META.get("HTTP_AUTHORIZATION") != f"Bearer {token}":
+        return HttpResponse(status=401)
+    return HttpResponse(REGISTRY.render(), content_type=CONTENT_TYPE)
+
+
+class CatalogReload(APIView):
+    """
+    Reloads the intent catalog file in the worker that receives the call
+    and returns what changed. Other workers follow via the file watcher
+    (CHATBOT_CATALOG_WATCH_S) or SIGHUP. Needs
+    "Authorization: Bearer <CHATBOT_ADMIN_TOKEN>"; disabled when unset.
+    """
+
+    def post(self, request):
+        token = getattr(settings, "CHATBOT_ADMIN_TOKEN", "")
+        if not token:
+            return Response(status=status.HTTP_404_NOT_FOUND)
+        if request.META.get("HTTP_AUTHORIZATION") != f"Bearer {token}":
+            return Response(status=status.HTTP_401_UNAUTHORIZED)
+
+        try:
+            summary = engine.reload_catalog()
+        except (CatalogError, OSError, ValueError) as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(summary, status=status.HTTP_200_OK)
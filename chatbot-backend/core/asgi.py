@@ -14,3 +14,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
 
 application = get_asgi_application()
+
+# Load/warm the chatbot engine per CHATBOT_STARTUP_MODE (eager, background, lazy).
+from api import engine  # noqa: E402
+
+engine.start()
@@ -4,6 +4,7 @@ Production-safe configuration for Render deployment.
 """
 
 from pathlib import Path
+import json
 import os
 
 # ─────────────────────────
@@ -133,4 +134,160 @@ USE_TZ = True
 STATIC_URL = "/static/"
 STATIC_ROOT = BASE_DIR / "staticfiles"
 
-DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
\ No newline at end of file
+DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
+
+# ─────────────────────────
+# LOGGING
+# ─────────────────────────
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "api": {"handlers": ["console"], "level": "INFO"},
+    },
+}
+
+# ─────────────────────────
+# CHATBOT ENGINE
+# ─────────────────────────
+# eager: block boot until warm | background: warm in a thread, serve a
+# "warming" reply meanwhile | lazy: warm on the first request.
+CHATBOT_STARTUP_MODE = os.environ.get("CHATBOT_STARTUP_MODE", "eager")
+# eager/background: seconds between background retries of a failed warm-up.
+CHATBOT_WARMUP_RETRY_S = float(os.environ.get("CHATBOT_WARMUP_RETRY_S", "30"))
+
+# Coalesce concurrent single-message encodes into one forward pass.
+CHATBOT_BATCHING_ENABLED = os.environ.get("CHATBOT_BATCHING_ENABLED", "1") == "1"
+CHATBOT_BATCH_MAX_SIZE = int(os.environ.get("CHATBOT_BATCH_MAX_SIZE", "16"))
+CHATBOT_BATCH_MAX_WAIT_MS = float(os.environ.get("CHATBOT_BATCH_MAX_WAIT_MS", "2"))
+
+# Intent matrix cache, keyed by a hash of INTENTS examples + MODEL_NAME.
+CHATBOT_EMBEDDING_CACHE_DIR = os.environ.get(
+    "CHATBOT_EMBEDDING_CACHE_DIR",
+    str(BASE_DIR / ".embedding_cache"),
+)
+
+# LRU of resolved queries (embedding + intent) keyed by normalized text; 0 disables.
+CHATBOT_QUERY_CACHE_SIZE = int(os.environ.get("CHATBOT_QUERY_CACHE_SIZE", "4096"))
+
+# Encoder backend: "sentence-transformers" (PyTorch), "onnx" (int8 ONNX Runtime,
+# built with `manage.py build_onnx_encoder`), "static" or "remote" (below).
+CHATBOT_ENCODER = os.environ.get("CHATBOT_ENCODER", "sentence-transformers")
+CHATBOT_ONNX_MODEL_DIR = os.environ.get(
+    "CHATBOT_ONNX_MODEL_DIR",
+    str(BASE_DIR / ".onnx_encoder"),
+)
+# "static": distilled per-token embedding table, no transformer at query time
+# (built with `manage.py build_static_encoder`; gets its own intent matrix).
+CHATBOT_STATIC_MODEL_DIR = os.environ.get(
+    "CHATBOT_STATIC_MODEL_DIR",
+    str(BASE_DIR / ".static_encoder"),
+)
+
+# Lexical first tier (exact + char n-gram TF-IDF) before the transformer.
+# Crisis phrases are matched regardless of this flag.
+CHATBOT_LEXICAL_CASCADE = os.environ.get("CHATBOT_LEXICAL_CASCADE", "1") == "1"
+CHATBOT_LEXICAL_TFIDF_THRESHOLD = float(os.environ.get("CHATBOT_LEXICAL_TFIDF_THRESHOLD", "0.8"))
+
+# Approximate (IVF) intent search for large catalogs. nlist=0 picks ~4*sqrt(rows);
+# nprobe trades recall for speed (check with `manage.py eval_ann`).
+CHATBOT_ANN_ENABLED = os.environ.get("CHATBOT_ANN_ENABLED", "0") == "1"
+CHATBOT_ANN_MIN_ROWS = int(os.environ.get("CHATBOT_ANN_MIN_ROWS", "5000"))
+CHATBOT_ANN_NLIST = int(os.environ.get("CHATBOT_ANN_NLIST", "0"))
+CHATBOT_ANN_NPROBE = int(os.environ.get("CHATBOT_ANN_NPROBE", "8"))
+
+# Prototype compression: score against k prototypes per intent instead of every
+# example (0 = off). Per-intent overrides as JSON, e.g. {"crisis": 0, "greetings": 3}.
+# Pick k with `manage.py eval_prototypes`.
+CHATBOT_PROTOTYPES_K = int(os.environ.get("CHATBOT_PROTOTYPES_K", "0"))
+CHATBOT_PROTOTYPES_K_PER_INTENT = json.loads(os.environ.get("CHATBOT_PROTOTYPES_K_PER_INTENT", "{}"))
+CHATBOT_PROTOTYPE_METHOD = os.environ.get("CHATBOT_PROTOTYPE_METHOD", "medoids")
+
+# Reduced intent-matrix storage: float32 | float16 | int8 (per-row scales), and
+# optional PCA projection to CHATBOT_MATRIX_DIM dims (0 = full). Check the
+# accuracy cost with `manage.py eval_precision`.
+CHATBOT_MATRIX_DTYPE = os.environ.get("CHATBOT_MATRIX_DTYPE", "float32")
+CHATBOT_MATRIX_DIM = int(os.environ.get("CHATBOT_MATRIX_DIM", "0"))
+
+# Memory-map encoder weights from the cache dir so forked workers share them.
+CHATBOT_SHARED_WEIGHTS = os.environ.get("CHATBOT_SHARED_WEIGHTS", "1") == "1"
+
+# Inference server mode (CHATBOT_ENCODER=remote): one process owns the model
+# (`manage.py run_inference_server`) and web workers talk to it over a Unix socket.
+CHATBOT_INFERENCE_SOCKET = os.environ.get("CHATBOT_INFERENCE_SOCKET", "/tmp/mindsettler-inference.sock")
+CHATBOT_INFERENCE_ENCODER = os.environ.get("CHATBOT_INFERENCE_ENCODER", "sentence-transformers")
+CHATBOT_INFERENCE_SERVER_THREADS = int(os.environ.get("CHATBOT_INFERENCE_SERVER_THREADS", "0"))
+CHATBOT_INFERENCE_POOL_SIZE = int(os.environ.get("CHATBOT_INFERENCE_POOL_SIZE", "4"))
+CHATBOT_INFERENCE_TIMEOUT = float(os.environ.get("CHATBOT_INFERENCE_TIMEOUT", "30"))
+
+# Async chat view: size of the bounded inference executor per process. Torch
+# intra-op threads (and ONNX Runtime intra_op_num_threads) default to
+# (cpu_count / WEB_CONCURRENCY) / executor size.
+CHATBOT_INFERENCE_WORKERS = int(os.environ.get("CHATBOT_INFERENCE_WORKERS", "2"))
+CHATBOT_TORCH_INTRA_THREADS = int(os.environ.get("CHATBOT_TORCH_INTRA_THREADS", "0"))
+CHATBOT_TORCH_INTER_THREADS = int(os.environ.get("CHATBOT_TORCH_INTER_THREADS", "0"))
+
+# Admission control for model-bound requests (lexical and cached answers are
+# never shed). Budget: CHATBOT_INFERENCE_WORKERS running + MAX_QUEUE waiting;
+# shed when the predicted latency exceeds the SLO (0 = off) or a client's
+# token bucket (RATE req/s, BURST) is empty (RATE 0 = off).
+# Shed requests get the fallback reply ("fallback") or a 503 ("503"), both
+# with Retry-After.
+CHATBOT_ADMISSION_ENABLED = os.environ.get("CHATBOT_ADMISSION_ENABLED", "1") == "1"
+CHATBOT_ADMISSION_MAX_QUEUE = int(os.environ.get("CHATBOT_ADMISSION_MAX_QUEUE", "16"))
+CHATBOT_LATENCY_SLO_MS = float(os.environ.get("CHATBOT_LATENCY_SLO_MS", "2000"))
+CHATBOT_CLIENT_RATE = float(os.environ.get("CHATBOT_CLIENT_RATE", "2"))
+CHATBOT_CLIENT_BURST = int(os.environ.get("CHATBOT_CLIENT_BURST", "10"))
+CHATBOT_SHED_RESPONSE = os.environ.get("CHATBOT_SHED_RESPONSE", "fallback")
+# Reverse proxies in front of the app that append to X-Forwarded-For (Render:
+# 1). The client is the hop that many from the end; 0 = use the peer address.
+CHATBOT_TRUSTED_PROXIES = int(os.environ.get("CHATBOT_TRUSTED_PROXIES", "1"))
+
+# Prometheus text metrics on /api/metrics/ (per worker process). When set,
+# scrapes must send "Authorization: Bearer <token>".
+CHATBOT_METRICS_TOKEN = os.environ.get("CHATBOT_METRICS_TOKEN", "")
+
+# Intent catalog: a JSON/YAML file replacing the built-in engine.INTENTS
+# (bootstrap one with `manage.py export_intents`). Reloads re-encode only new
+# examples: on file change (checked every CATALOG_WATCH_S, 0 = off), on SIGHUP
+# to a worker, or via POST /api/admin/catalog/reload/ with the admin token.
+CHATBOT_INTENTS_FILE = os.environ.get("CHATBOT_INTENTS_FILE", "")
+CHATBOT_CATALOG_WATCH_S = float(os.environ.get("CHATBOT_CATALOG_WATCH_S", "10"))
+CHATBOT_ADMIN_TOKEN = os.environ.get("CHATBOT_ADMIN_TOKEN", "")
+
+# Conversation context: the last TURNS messages per session id ("session_id"
+# in the body or X-Chat-Session) as float16 embeddings. A message that matches
+# nothing alone is rescored biased towards them. "memory" is per process
+# (TTL + LRU, capped at MAX_BYTES); "django-cache" shares turns across workers
+# through CACHES[CACHE_ALIAS] (e.g. Redis). TURNS=0 disables.
+CHATBOT_CONVERSATION_STORE = os.environ.get("CHATBOT_CONVERSATION_STORE", "memory")
+CHATBOT_CONVERSATION_TURNS = int(os.environ.get("CHATBOT_CONVERSATION_TURNS", "4"))
+CHATBOT_CONVERSATION_TTL_S = int(os.environ.get("CHATBOT_CONVERSATION_TTL_S", "1800"))
+CHATBOT_CONVERSATION_MAX_SESSIONS = int(os.environ.get("CHATBOT_CONVERSATION_MAX_SESSIONS", "10000"))
+CHATBOT_CONVERSATION_MAX_BYTES = int(os.environ.get("CHATBOT_CONVERSATION_MAX_BYTES", str(32 * 1024 * 1024)))
+CHATBOT_CONVERSATION_CACHE_ALIAS = os.environ.get("CHATBOT_CONVERSATION_CACHE_ALIAS", "default")
+CHATBOT_CONTEXT_WEIGHT = float(os.environ.get("CHATBOT_CONTEXT_WEIGHT", "0.35"))
+CHATBOT_CONTEXT_DECAY = float(os.environ.get("CHATBOT_CONTEXT_DECAY", "0.5"))
+
+# FAQ retrieval: a message that matches no intent is answered from the best
+# FAQ/policy passage scoring >= MIN_SCORE against its (already computed)
+# embedding. DIR is memory-mapped, built by `manage.py build_faq_index`.
+CHATBOT_FAQ_ENABLED = os.environ.get("CHATBOT_FAQ_ENABLED", "1") == "1"
+CHATBOT_FAQ_DIR = os.environ.get("CHATBOT_FAQ_DIR", str(BASE_DIR / ".faq_index"))
+CHATBOT_FAQ_TOP_K = int(os.environ.get("CHATBOT_FAQ_TOP_K", "3"))
+CHATBOT_FAQ_MIN_SCORE = float(os.environ.get("CHATBOT_FAQ_MIN_SCORE", "0.45"))
+
+# Transcript log: every chat message (normalized text, reply intent, tier,
+# score, latency) queued in memory and appended by a background thread to
+# rotating JSONL segments in DIR, one set per process. Entries are dropped
+# (and counted) when QUEUE is full rather than delaying replies. Off by
+# default: messages can contain personal health information.
+CHATBOT_TRANSCRIPTS_ENABLED = os.environ.get("CHATBOT_TRANSCRIPTS_ENABLED", "0") == "1"
+CHATBOT_TRANSCRIPTS_DIR = os.environ.get("CHATBOT_TRANSCRIPTS_DIR", str(BASE_DIR / ".transcripts"))
+CHATBOT_TRANSCRIPTS_QUEUE = int(os.environ.get("CHATBOT_TRANSCRIPTS_QUEUE", "10000"))
+CHATBOT_TRANSCRIPTS_FLUSH_S = float(os.environ.get("CHATBOT_TRANSCRIPTS_FLUSH_S", "1.0"))
+CHATBOT_TRANSCRIPTS_SEGMENT_MB = int(os.environ.get("CHATBOT_TRANSCRIPTS_SEGMENT_MB", "64"))
+CHATBOT_TRANSCRIPTS_MAX_SEGMENTS = int(os.environ.get("CHATBOT_TRANSCRIPTS_MAX_SEGMENTS", "50"))
@@ -0,0 +1,38 @@
+"""
+Slim serving profile: only what the chat API needs.
+
+No admin, auth, sessions, messages or CSRF middleware, no database
+connection and JSON-only DRF. Select it with
+DJANGO_SETTINGS_MODULE=core.settings_slim (the Docker image's default);
+compare with `manage.py bench_profile`.
+"""
+
+from .settings import *  # noqa: F401,F403
+
+INSTALLED_APPS = [
+    "rest_framework",
+    "corsheaders",
+    "api",
+]
+
+MIDDLEWARE = [
+    "corsheaders.middleware.CorsMiddleware",
+    "django.middleware.common.CommonMiddleware",
+]
+
+ROOT_URLCONF = "core.urls_slim"
+
+# No database: any ORM access fails loudly instead of opening SQLite.
+DATABASES = {}
+
+TEMPLATES = []
+AUTH_PASSWORD_VALIDATORS = []
+USE_I18N = False
+
+REST_FRAMEWORK = {
+    "DEFAULT_RENDERER_CLASSES": ["rest_framework.renderers.JSONRenderer"],
+    "DEFAULT_PARSER_CLASSES": ["rest_framework.parsers.JSONParser"],
+    "DEFAULT_AUTHENTICATION_CLASSES": [],
+    "DEFAULT_PERMISSION_CLASSES": [],
+    "UNAUTHENTICATED_USER": None,
+}
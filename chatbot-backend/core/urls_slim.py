@@ -0,0 +1,9 @@
+"""
+URL configuration for the slim serving profile (core.settings_slim):
+the chat API only.
+"""
+from django.urls import path, include
+
+urlpatterns = [
+    path('api/', include('api.urls')),
+]
@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
 
 application = get_wsgi_application()
+
+# Load/warm the chatbot engine per CHATBOT_STARTUP_MODE (eager, background, lazy).
+from api import engine  # noqa: E402
+
+engine.start()
@@ -0,0 +1,30 @@
+#!/bin/bash
+# Starts gunicorn, and with CHATBOT_ENCODER=remote the inference server next
+# to it. SIGTERM/SIGINT stop gunicorn first (so in-flight requests can still
+# encode), then the inference server. If either process exits on its own the
+# other is stopped too, so the container exits and the platform restarts it.
+set -u
+
+if [ "${CHATBOT_ENCODER:-}" != "remote" ]; then
+  exec gunicorn -c gunicorn.conf.py core.wsgi:application
+fi
+
+python manage.py run_inference_server &
+inference=$!
+gunicorn -c gunicorn.conf.py core.wsgi:application &
+web=$!
+
+stop() {
+  trap '' TERM INT
+  kill -TERM "$web" 2>/dev/null
+  wait "$web" 2>/dev/null
+  kill -TERM "$inference" 2>/dev/null
+  wait "$inference" 2>/dev/null
+}
+
+trap 'stop; exit 0' TERM INT
+
+wait -n "$web" "$inference"
+status=$?
+stop
+exit "$status"
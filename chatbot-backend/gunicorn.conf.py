@@ -0,0 +1,47 @@
+"""
+Gunicorn config for the chatbot (Render-compatible).
+
+The app is preloaded in the master so the model weights and intent matrix
+are loaded once and shared copy-on-write by every worker; the weights are
+also memory-mapped from disk (CHATBOT_SHARED_WEIGHTS), so even respawned
+workers map the same pages. Scale with WEB_CONCURRENCY.
+"""
+
+import gc
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get("WEB_CONCURRENCY", "1"))
+threads = int(os.environ.get("GUNICORN_THREADS", "2"))
+timeout = 120
+preload_app = True
+
+
+def pre_fork(server, worker):
+    # Move everything allocated so far out of the GC's reach: collections in
+    # the children would otherwise touch (and un-share) every object header.
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    # Split the cores between workers instead of each one claiming all of them.
+    from api import engine
+
+    engine.configure_torch_threads()
+
+
+def post_worker_init(worker):
+    # After gunicorn installed the worker's own signal handlers: SIGHUP to a
+    # worker reloads the intent catalog, and a worker forked from a master
+    # with a stale catalog (e.g. after `kill -HUP <master>`) catches up.
+    from api import engine
+
+    engine.install_reload_signal()
+    engine.check_catalog(force=True)
+
+
+def worker_exit(server, worker):
+    # Write out queued transcript entries before the worker goes away.
+    from api import engine
+
+    engine.close_transcripts()